@@ -1,5 +1,9 @@
 # app.py
+import hashlib
+import io
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import numpy as np
@@ -8,7 +12,36 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-from scripts.analise_crescimento import calcular_crescimento
+from scripts.analise_clientes import calcular_rfm, estado_de_vendas, matriz_coortes, resumir_segmentos
+from scripts.analise_crescimento import crescimento_periodos, crescimento_por_membro
+from scripts.consultas_sql import (
+    COLUNA_DATA,
+    DUCKDB_DISPONIVEL,
+    conectar,
+    consultar_compras_clientes,
+    consultar_crescimento,
+    consultar_crescimento_por_membro,
+    consultar_intervalo_datas,
+    consultar_kpis,
+    consultar_membros,
+    consultar_pareto,
+    consultar_registros,
+    consultar_yoy,
+    esquema,
+    impressao_modelo,
+)
+from scripts.esquema_vendas import (
+    compactar_tipos,
+    converter_datas,
+    ler_vendas_csv,
+    ler_vendas_csv_em_blocos,
+    relatorio_memoria,
+)
+from scripts.filtros_vendas import COLUNAS_FILTRO, aplicar_filtros, criar_indice, intervalo_datas, opcoes_filtro
+from scripts.metricas_vendas import compute_kpis, compute_pareto, compute_yoy, safe_to_numeric
+from scripts.modelo_estrela import ATRIBUTOS_DIMENSAO, carregar_modelo_estrela, existe_modelo_estrela
+from scripts.perfil import marcar, novo_perfil, tabela_perfil
+from scripts.previsao_vendas import HORIZONTE_PADRAO, prever_series
 
 
 # =========================
@@ -18,6 +51,25 @@ APP_TITLE = "Análise de Vendas - Samuel Maia"
 APP_ICON = "📈"
 LAYOUT = "wide"
 
+# Cache das análises (compartilhado entre sessões): validade e nº máximo de entradas
+CACHE_TTL_SEGUNDOS = 60 * 60
+CACHE_MAX_ENTRADAS = 32
+
+# Uploads até este tamanho são lidos de uma vez (pyarrow); acima, em blocos com progresso
+LIMITE_UPLOAD_DIRETO_MB = 32
+
+# Uploads lidos mantidos no cache de cada sessão
+MAX_UPLOADS_SESSAO = 3
+
+# Pastas com o modelo estrela gerado pelo processador
+PASTAS_MODELO = ["dados_processados", "dados"]
+
+# Atributos de dimensão anexados às transações por padrão (DATA é sempre incluída)
+ATRIBUTOS_PADRAO = ("PRODUCTLINE", "COUNTRY")
+
+# Nome da série do total na previsão (ao lado dos membros da dimensão)
+SERIE_TOTAL = "Total geral"
+
 
 # =========================
 # FUNÇÕES UTILITÁRIAS
@@ -30,14 +82,11 @@ def format_currency(value: float, symbol: str = "$") -> str:
         return "N/A"
 
 
-def safe_to_datetime(series: pd.Series) -> pd.Series:
-    """Converte para datetime com coerção segura."""
-    return pd.to_datetime(series, errors="coerce")
-
-
-def safe_to_numeric(series: pd.Series) -> pd.Series:
-    """Converte para numérico com coerção segura."""
-    return pd.to_numeric(series, errors="coerce")
+def impressao_digital(df: pd.DataFrame) -> str:
+    """Impressão digital do conteúdo do dataset (chave dos caches de análise)."""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    colunas = "|".join(f"{c}:{t}" for c, t in df.dtypes.astype(str).items())
+    return hashlib.sha1(hashes.tobytes() + colunas.encode()).hexdigest()
 
 
 def month_name_pt(month_num: int) -> str:
@@ -56,7 +105,8 @@ def detect_date_columns(columns: list[str]) -> list[str]:
 def detect_value_columns(df: pd.DataFrame) -> list[str]:
     """Sugere colunas numéricas de valor (vendas/receita)."""
     cols = df.columns.tolist()
-    by_name = [c for c in cols if any(t in c.lower() for t in ["sales", "venda", "price", "total", "valor", "receita"])]
+    # Ordem das dicas = prioridade (SALES antes de PRICEEACH, que vem antes na fato)
+    by_name = [c for t in ["sales", "venda", "valor", "receita", "total", "price"] for c in cols if t in c.lower()]
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     # Prioriza sugestão por nome e depois numéricas
     merged = list(dict.fromkeys(by_name + numeric_cols))
@@ -76,7 +126,7 @@ def suggest_dimension_columns(df: pd.DataFrame) -> list[str]:
     return merged
 
 
-@st.cache_data
+@st.cache_resource(show_spinner=False)
 def criar_dados_exemplo():
     """Cria dados de exemplo realistas para fallback."""
     np.random.seed(42)
@@ -102,64 +152,231 @@ def criar_dados_exemplo():
     return df
 
 
-@st.cache_data
-def carregar_dados():
-    """Carrega dados locais se existirem; caso contrário, usa dados de exemplo."""
-    possiveis_caminhos = [
-        "dados_processados/fato_vendas.csv",
-        "dados/fato_vendas.csv",
-        "./dados_processados/fato_vendas.csv",
-        "./dados/fato_vendas.csv",
-    ]
-    for caminho in possiveis_caminhos:
-        if os.path.exists(caminho):
-            df = pd.read_csv(caminho)
-            return df, True, caminho
+@st.cache_resource(show_spinner=False)
+def carregar_dados(fonte: str = "cubo", atributos: tuple = ATRIBUTOS_PADRAO):
+    """
+    Carrega dados locais se existirem; caso contrário, usa dados de exemplo.
+    fonte="cubo": cubo agregado (mês x dimensões), muito menor que as transações
+    e suficiente para todos os KPIs e gráficos do dashboard.
+    fonte="estrela": transações da fato com só os `atributos` de dimensão pedidos.
+    """
+    if fonte == "cubo":
+        possiveis_cubos = [
+            "dados_processados/parquet/cubo_vendas.parquet",
+            "dados_processados/cubo_vendas.csv",
+        ]
+        for caminho in possiveis_cubos:
+            if os.path.exists(caminho):
+                try:
+                    if caminho.endswith(".parquet"):
+                        df = compactar_tipos(pd.read_parquet(caminho))
+                    else:
+                        df, _ = ler_vendas_csv(caminho, encoding="utf-8")
+                    return df, True, caminho, impressao_digital(df)
+                except ImportError:
+                    # Sem engine Parquet (pyarrow) instalada: tenta o próximo formato
+                    continue
+
+    # Transações: fato + atributos de dimensão resolvidos por ID (sem merges)
+    for pasta in PASTAS_MODELO:
+        if existe_modelo_estrela(pasta):
+            df = carregar_modelo_estrela(pasta, ("DATA",) + tuple(a for a in atributos if a != "DATA"))
+            return df, True, pasta, impressao_digital(df)
+
+    df = criar_dados_exemplo()
+    return df, False, None, impressao_digital(df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def banco_sql(pasta: str, impressao: str) -> dict:
+    """Banco DuckDB sobre os arquivos do modelo, compartilhado por todas as sessões (um por versão dos arquivos)."""
+    return conectar(pasta)
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def resumo_sql(pasta: str, impressao: str) -> tuple[pd.DataFrame, int]:
+    """Colunas do modelo (DataFrame vazio, só o esquema) e total de transações, sem carregar linhas."""
+    banco = banco_sql(pasta, impressao)
+    return esquema(banco), consultar_registros(banco)
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def opcoes_filtro_sql(pasta: str, impressao: str) -> tuple:
+    """Intervalo de datas e membros de cada coluna de filtro, consultados no modelo."""
+    banco = banco_sql(pasta, impressao)
+    existentes = {c for colunas in banco["colunas"].values() for c in colunas}
+    membros = {c: consultar_membros(banco, c) for c in COLUNAS_FILTRO if c in existentes}
+    return consultar_intervalo_datas(banco), membros
+
+
+@st.cache_resource(show_spinner=False)
+def executor_uploads() -> ThreadPoolExecutor:
+    """Threads compartilhadas que leem os uploads fora da thread do script."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload")
+
+
+def ler_upload(conteudo: bytes, estado: dict):
+    """
+    Lê o CSV enviado (roda na thread de upload e só escreve em `estado`).
+    Arquivos pequenos: leitura única com a engine pyarrow (multi-thread).
+    Arquivos grandes: leitura em blocos, publicando o progresso.
+    """
+    origem = io.BytesIO(conteudo)
+    df = None
+    if len(conteudo) <= LIMITE_UPLOAD_DIRETO_MB * 1024 ** 2:
+        try:
+            df, _ = ler_vendas_csv(origem, encoding="ISO-8859-1", engine="pyarrow")
+        except (ImportError, ValueError):
+            # Sem pyarrow ou CSV fora do padrão aceito por ela: parser em blocos
+            origem.seek(0)
+    if df is None:
+        df, _ = ler_vendas_csv_em_blocos(
+            origem,
+            progresso=lambda fracao: estado.update(progresso=fracao),
+            encoding="ISO-8859-1",
+        )
+    estado["progresso"] = 1.0
+    return df, impressao_digital(df)
+
+
+def obter_upload(arquivo) -> tuple[pd.DataFrame, str]:
+    """
+    Lê o upload em segundo plano com barra de progresso. O resultado fica no cache
+    da sessão (st.session_state), pela impressão SHA-1 do arquivo: reruns e
+    reenvios do mesmo arquivo reutilizam a leitura na hora.
+    """
+    uploads = st.session_state.setdefault("uploads", {})
+    hash_por_id = st.session_state.setdefault("uploads_hash", {})
+
+    chave = hash_por_id.get(arquivo.file_id)
+    if chave is None:
+        chave = hash_por_id[arquivo.file_id] = hashlib.sha1(arquivo.getbuffer()).hexdigest()
+
+    item = uploads.get(chave)
+    if item is None:
+        estado = {"progresso": 0.0}
+        futuro = executor_uploads().submit(ler_upload, arquivo.getvalue(), estado)
+        item = uploads[chave] = {"estado": estado, "futuro": futuro}
+        # Mantém só os uploads mais recentes da sessão
+        while len(uploads) > MAX_UPLOADS_SESSAO:
+            uploads.pop(next(iter(uploads)))
+
+    futuro = item["futuro"]
+    if not futuro.done():
+        barra = st.progress(0.0, text=f"📥 Lendo {arquivo.name}...")
+        while not futuro.done():
+            fracao = item["estado"]["progresso"]
+            barra.progress(fracao, text=f"📥 Lendo {arquivo.name}... {fracao:.0%}")
+            time.sleep(0.1)
+        barra.empty()
+
+    try:
+        return futuro.result()
+    except Exception as e:
+        uploads.pop(chave, None)
+        st.error(f"❌ Erro ao ler {arquivo.name}: {e}")
+        st.stop()
+
 
-    return criar_dados_exemplo(), False, None
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_memoria(_df: pd.DataFrame, impressao: str) -> dict:
+    """Memória do dataset com tipos compactos x leitura sem esquema."""
+    return relatorio_memoria(_df)
 
 
-def compute_yoy(df: pd.DataFrame, date_col: str, value_col: str, freq: str = "ME") -> pd.DataFrame:
+def barra_filtros(coluna_data: str, intervalo, opcoes: dict) -> dict:
     """
-    Calcula YoY (Year-over-Year) com agregação mensal por padrão.
-    Retorna dataframe com colunas: periodo, total, yoy_abs, yoy_pct.
+    Filtros da barra lateral. Retorna só os ativos:
+    {coluna_data: (início, fim), coluna: [membros]} (vazio = sem filtro).
     """
-    tmp = df[[date_col, value_col]].copy()
-    tmp[date_col] = safe_to_datetime(tmp[date_col])
-    tmp[value_col] = safe_to_numeric(tmp[value_col])
-    tmp = tmp.dropna(subset=[date_col, value_col])
-
-    # Agregação mensal (month-end). (Evita 'M' deprecation)
-    agg = (
-        tmp.set_index(date_col)
-        .resample(freq)[value_col]
-        .sum()
-        .reset_index()
-        .rename(columns={value_col: "total"})
+    filtros = {}
+    if intervalo is not None:
+        minimo, maximo = intervalo[0].date(), intervalo[1].date()
+        datas = st.date_input("📆 Período", value=(minimo, maximo), min_value=minimo, max_value=maximo)
+        # Enquanto o intervalo é escolhido, o widget devolve só a data inicial
+        if isinstance(datas, (tuple, list)) and len(datas) == 2 and tuple(datas) != (minimo, maximo):
+            filtros[coluna_data] = (datas[0], datas[1])
+
+    for coluna, membros in opcoes.items():
+        escolhidos = st.multiselect(coluna, membros, default=[], placeholder="Todos")
+        if escolhidos:
+            filtros[coluna] = escolhidos
+    return filtros
+
+
+def build_heatmap_chart(matriz: pd.DataFrame, metrica: str, top_n: int = 15) -> go.Figure:
+    """Mapa de calor membro × período (membros de maior total primeiro)."""
+    plot_df = matriz.iloc[:, :top_n].T
+    if metrica == "totais":
+        escala = dict(color_continuous_scale="Blues")
+    else:
+        # Escala divergente centrada em 0; extremos (base pequena) não dominam as cores
+        valores = np.abs(plot_df.to_numpy()[np.isfinite(plot_df.to_numpy())])
+        limite = float(np.percentile(valores, 95)) if len(valores) else 100.0
+        escala = dict(color_continuous_scale="RdYlGn", range_color=[-limite, limite])
+
+    fig = px.imshow(
+        plot_df,
+        x=plot_df.columns,
+        y=plot_df.index.astype(str),
+        aspect="auto",
+        template="plotly_white",
+        labels=dict(x="Período", y=plot_df.index.name, color="Total" if metrica == "totais" else "%"),
+        **escala,
     )
-    agg["yoy_abs"] = agg["total"] - agg["total"].shift(12)
-    agg["yoy_pct"] = (agg["total"] / agg["total"].shift(12) - 1) * 100
-    return agg
-
-
-def compute_pareto(df: pd.DataFrame, dim_col: str, value_col: str) -> pd.DataFrame:
-    """Calcula Pareto (valor por dimensão + % acumulado)."""
-    tmp = df[[dim_col, value_col]].copy()
-    tmp[value_col] = safe_to_numeric(tmp[value_col])
-    tmp = tmp.dropna(subset=[dim_col, value_col])
-
-    pareto = (
-        tmp.groupby(dim_col)[value_col]
-        .sum()
-        .sort_values(ascending=False)
-        .reset_index()
-        .rename(columns={value_col: "total"})
+    fig.update_layout(height=max(320, 26 * len(plot_df) + 120), margin=dict(l=30, r=30, t=30, b=30))
+    return fig
+
+
+def build_cohort_chart(matriz: pd.DataFrame, metrica: str) -> go.Figure:
+    """Triângulo de coortes: mês da primeira compra × meses desde ela."""
+    plot_df = matriz.copy()
+    plot_df.index = plot_df.index.strftime("%Y-%m")
+    percentual = metrica == "retencao_%"
+    # O mês 0 é sempre 100%: fora da escala de cores, para não apagar o resto do triângulo
+    limite = plot_df.iloc[:, 1:].max().max() if percentual and plot_df.shape[1] > 1 else None
+    fig = px.imshow(
+        plot_df,
+        x=[str(c) for c in plot_df.columns],
+        y=plot_df.index,
+        aspect="auto",
+        template="plotly_white",
+        color_continuous_scale="Blues",
+        range_color=[0, limite] if pd.notna(limite) and limite else None,
+        text_auto=".0f",
+        labels=dict(x="Meses desde a 1ª compra", y="Coorte", color="% da coorte" if percentual else "Clientes"),
     )
-    total_all = pareto["total"].sum()
-    pareto["share_pct"] = (pareto["total"] / total_all) * 100 if total_all else 0
-    pareto["cum_share_pct"] = pareto["share_pct"].cumsum()
-    pareto["rank"] = np.arange(1, len(pareto) + 1)
-    return pareto
+    fig.update_layout(height=max(320, 24 * len(plot_df) + 120), margin=dict(l=30, r=30, t=30, b=30))
+    return fig
+
+
+def build_forecast_chart(previsao: dict, serie: str) -> go.Figure:
+    """Histórico mensal + previsão com faixa de confiança."""
+    historico = previsao["historico"][serie]
+    futuro = previsao["previsao"][serie]
+    inferior, superior = previsao["inferior"][serie], previsao["superior"][serie]
+    # A previsão parte do último mês do histórico (linha contínua)
+    ponte = pd.concat([historico.iloc[-1:], futuro])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=historico.index, y=historico, mode="lines+markers", name="Histórico"))
+    fig.add_trace(go.Scatter(
+        x=list(superior.index) + list(inferior.index[::-1]),
+        y=list(superior) + list(inferior[::-1]),
+        fill="toself", fillcolor="rgba(255, 75, 75, 0.15)", line=dict(width=0),
+        hoverinfo="skip", name=f"Intervalo {previsao['nivel_confianca']:.0%}",
+    ))
+    fig.add_trace(go.Scatter(x=ponte.index, y=ponte, mode="lines+markers", name="Previsão",
+                             line=dict(dash="dash", color="#FF4B4B")))
+    fig.update_layout(
+        template="plotly_white",
+        height=420,
+        xaxis_title="Mês",
+        yaxis_title="Total Mensal",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=30, r=30, t=30, b=30),
+    )
+    return fig
 
 
 def build_pareto_chart(pareto_df: pd.DataFrame, dim_col: str, top_n: int = 15) -> go.Figure:
@@ -200,6 +417,115 @@ def build_pareto_chart(pareto_df: pd.DataFrame, dim_col: str, top_n: int = 15) -
     return fig
 
 
+# =========================
+# CACHE DAS ANÁLISES
+# =========================
+# Chave: impressão digital do dataset + mapeamento de colunas + parâmetros.
+# O DataFrame (_df) não entra no hash; a impressão digital já identifica o conteúdo.
+# Os datasets (cache_resource) são compartilhados e nunca alterados: as funções de
+# análise só leem colunas, sem copiar o DataFrame inteiro.
+@st.cache_resource(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def indice_filtros(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str) -> dict:
+    """Índice dos filtros (ordem por data + posições por categoria), uma vez por dataset/mapeamento."""
+    return criar_indice(_df, coluna_data)
+
+
+@st.cache_resource(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def preparar_analise(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str):
+    """
+    Monta uma vez por dataset/mapeamento o frame normalizado (data e valor tipados, sem nulos).
+    Retorna (frame, valores de data não reconhecidos).
+    """
+    datas, datas_invalidas = converter_datas(_df[coluna_data])
+    valores = safe_to_numeric(_df[coluna_valor])
+
+    # Demais colunas entram como referência às originais (sem cópia)
+    colunas = {c: _df[c] for c in _df.columns}
+    colunas[coluna_data] = datas
+    colunas[coluna_valor] = valores
+    base = pd.DataFrame(colunas, copy=False)
+
+    validas = datas.notna() & valores.notna()
+    return (base if validas.all() else base[validas]), datas_invalidas
+
+
+#
+# Com fonte_sql (pasta do modelo estrela), as análises viram consultas agregadas no
+# DuckDB e _df é só o esquema; a impressão digital é a dos arquivos do modelo.
+# `filtros` entra na chave: no pandas, _df já chega filtrado; no SQL, vira o WHERE.
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_crescimento(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str, periodo: str,
+                         fonte_sql: str | None = None, filtros: dict | None = None) -> dict:
+    # API pura: tabela + estatísticas, sem imprimir nem formatar texto
+    if fonte_sql:
+        return consultar_crescimento(banco_sql(fonte_sql, impressao), coluna_valor, [periodo], filtros)[periodo]
+    return crescimento_periodos(_df, coluna_data=coluna_data, coluna_valor=coluna_valor, periodos=[periodo])[periodo]
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_crescimento_membros(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str,
+                                 dim_col: str, periodo: str, fonte_sql: str | None = None,
+                                 filtros: dict | None = None) -> dict:
+    # Matrizes período × membro (totais, crescimento e YoY) em uma passada
+    if fonte_sql:
+        return consultar_crescimento_por_membro(banco_sql(fonte_sql, impressao), dim_col, coluna_valor, periodo, filtros)
+    return crescimento_por_membro(_df, dim_col, coluna_data=coluna_data, coluna_valor=coluna_valor, periodo=periodo)
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_previsao(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str, dim_col: str,
+                      fonte_sql: str | None = None, filtros: dict | None = None) -> dict:
+    # Séries mensais do total e de cada membro, projetadas juntas (em lote)
+    total = analisar_crescimento(_df, impressao, coluna_data, coluna_valor, "M", fonte_sql, filtros)["tabela"]
+    total = total.set_index(total.columns[0])["total_vendas"]
+    membros = analisar_crescimento_membros(_df, impressao, coluna_data, coluna_valor, dim_col, "M", fonte_sql, filtros)
+    series = pd.concat([total.rename(SERIE_TOTAL), membros["totais"].reindex(total.index, fill_value=0)], axis=1)
+    return {"historico": series, **prever_series(series, processos=None)}
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_clientes(_df: pd.DataFrame, impressao: str, coluna_data: str, coluna_valor: str,
+                      fonte_sql: str | None = None, filtros: dict | None = None) -> dict:
+    # RFM e coortes sobre chaves inteiras de cliente (no modo SQL, a partir dos pedidos somados no DuckDB)
+    if fonte_sql:
+        compras = consultar_compras_clientes(banco_sql(fonte_sql, impressao), coluna_valor, filtros)
+        estado, rotulos = estado_de_vendas(compras, COLUNA_DATA, coluna_valor, "CUSTOMER_ID")
+    else:
+        estado, rotulos = estado_de_vendas(_df, coluna_data, coluna_valor)
+    rfm = calcular_rfm(estado, rotulos=rotulos)
+    return {
+        "rfm": rfm,
+        "segmentos": resumir_segmentos(rfm),
+        "coortes": matriz_coortes(estado),
+        "ocasiao": estado["ocasiao"],
+    }
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_yoy(_df: pd.DataFrame, impressao: str, date_col: str, value_col: str, freq: str = "ME",
+                 fonte_sql: str | None = None, filtros: dict | None = None) -> pd.DataFrame:
+    if fonte_sql:
+        return consultar_yoy(banco_sql(fonte_sql, impressao), value_col, freq=freq, filtros=filtros)
+    return compute_yoy(_df, date_col, value_col, freq=freq)
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_pareto(_df: pd.DataFrame, impressao: str, dim_col: str, value_col: str,
+                    fonte_sql: str | None = None, filtros: dict | None = None) -> pd.DataFrame:
+    # Tabela completa: o slider de Top N só recorta o resultado em cache
+    if fonte_sql:
+        return consultar_pareto(banco_sql(fonte_sql, impressao), dim_col, value_col, filtros)
+    return compute_pareto(_df, dim_col, value_col)
+
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def analisar_kpis(_df: pd.DataFrame, impressao: str, date_col: str, value_col: str,
+                  fonte_sql: str | None = None, filtros: dict | None = None) -> dict:
+    if fonte_sql:
+        return consultar_kpis(banco_sql(fonte_sql, impressao), value_col, filtros)
+    return compute_kpis(_df, date_col, value_col)
+
+
 # =========================
 # CONFIG STREAMLIT
 # =========================
@@ -239,6 +565,10 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Tempo por seção desta execução (painel oculto: abrir o app com ?debug=1)
+perfil_execucao = novo_perfil()
+modo_debug = st.query_params.get("debug") == "1"
+
 # =========================
 # SIDEBAR
 # =========================
@@ -251,25 +581,73 @@ with st.sidebar:
         help="Faça upload do seu arquivo de vendas",
     )
 
+    # Pasta do modelo estrela quando as análises rodam como consultas SQL (DuckDB)
+    fonte_sql = None
+
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file, encoding="ISO-8859-1")
+        df, impressao = obter_upload(uploaded_file)
         dados_reais = True
         origem = uploaded_file.name
         st.success(f"✅ Arquivo carregado: {uploaded_file.name}")
     else:
-        df, dados_reais, origem = carregar_dados()
+        fonte, atributos = "cubo", ATRIBUTOS_PADRAO
+        pastas_modelo = [p for p in PASTAS_MODELO if existe_modelo_estrela(p)]
+        if pastas_modelo:
+            opcoes_fonte = ["Cubo agregado", "Transações (modelo estrela)"]
+            if DUCKDB_DISPONIVEL:
+                opcoes_fonte.append("Consultas SQL (DuckDB)")
+            escolha = st.radio(
+                "🗂️ Fonte local",
+                opcoes_fonte,
+                index=0,
+                help="O cubo é mais leve; as transações trazem só os atributos escolhidos das dimensões; "
+                     "no SQL, cada análise é uma consulta nos arquivos e nada é carregado na sessão",
+            )
+            if escolha == "Transações (modelo estrela)":
+                fonte = "estrela"
+                atributos = tuple(st.multiselect(
+                    "Atributos das dimensões",
+                    [a for a in ATRIBUTOS_DIMENSAO if a != "DATA"],
+                    default=list(ATRIBUTOS_PADRAO),
+                ))
+            elif escolha == "Consultas SQL (DuckDB)":
+                fonte_sql = pastas_modelo[0]
+        if fonte_sql:
+            impressao = impressao_modelo(fonte_sql)
+            df, registros_sql = resumo_sql(fonte_sql, impressao)
+            dados_reais, origem = True, f"{fonte_sql} (SQL)"
+        else:
+            df, dados_reais, origem, impressao = carregar_dados(fonte, atributos)
         if dados_reais and origem:
             st.success(f"✅ Dados locais carregados: {origem}")
         else:
             st.info("ℹ️ Usando dados de exemplo (simulados)")
 
+    marcar(perfil_execucao, "Carregamento dos dados", len(df))
+
     st.markdown("---")
     st.markdown("### 📋 Sobre os dados")
     c1, c2 = st.columns(2)
     with c1:
-        st.metric("Registros", f"{len(df):,}")
+        # Cubo agregado: cada linha resume N_LINHAS transações; no SQL, contagem na consulta
+        if fonte_sql:
+            registros = registros_sql
+        else:
+            registros = int(df["N_LINHAS"].sum()) if "N_LINHAS" in df.columns else len(df)
+        st.metric("Registros", f"{registros:,}")
     with c2:
         st.metric("Colunas", len(df.columns))
+    if "N_LINHAS" in df.columns:
+        st.caption(f"Cubo agregado: {len(df):,} linhas (mês × dimensões)")
+
+    if fonte_sql:
+        st.caption("Memória: nenhuma transação carregada (consultas direto nos arquivos)")
+    else:
+        memoria = analisar_memoria(df, impressao)
+        st.caption(
+            f"Memória: {memoria['depois_mb']:.2f} MB "
+            f"(sem esquema: {memoria['antes_mb']:.2f} MB, -{memoria['reducao_%']:.0f}%)"
+        )
 
     tipo_dados = "**Dados Reais**" if dados_reais else "**Dados de Exemplo**"
     st.markdown(f"Tipo: {tipo_dados}")
@@ -280,7 +658,11 @@ with st.sidebar:
     colunas = df.columns.tolist()
 
     # Data
-    data_options = detect_date_columns(colunas) or colunas
+    if fonte_sql:
+        # As consultas agregam pela data da dim_tempo
+        data_options = [c for c in colunas if pd.api.types.is_datetime64_any_dtype(df[c])]
+    else:
+        data_options = detect_date_columns(colunas) or colunas
     coluna_data = st.selectbox("📅 Coluna de data", data_options, index=0)
 
     # Valor
@@ -310,58 +692,90 @@ with st.sidebar:
         top_n_pareto = 15
         st.info("ℹ️ Nenhuma coluna categórica encontrada para Pareto/Top 3.")
 
+    marcar(perfil_execucao, "Barra lateral")
 
 # =========================
 # MAIN
 # =========================
 try:
-    df_analise = df.copy()
+    # Frame normalizado (data/valor tipados), compartilhado e somente leitura;
+    # no SQL não há frame: as consultas já tratam tipos e nulos
+    if fonte_sql:
+        df_analise, datas_invalidas = df, []
+    else:
+        df_analise, datas_invalidas = preparar_analise(df, impressao, coluna_data, coluna_valor)
+    if len(datas_invalidas):
+        exemplos = ", ".join(str(v) for v in pd.unique(datas_invalidas.to_numpy())[:5])
+        st.warning(
+            f"⚠️ {len(datas_invalidas):,} linhas com data não reconhecida em '{coluna_data}' "
+            f"ficaram fora da análise (ex.: {exemplos})"
+        )
+
+    marcar(perfil_execucao, "Preparação (data/valor)", len(df_analise))
 
-    # Converte data/valor
-    df_analise[coluna_data] = safe_to_datetime(df_analise[coluna_data])
-    df_analise[coluna_valor] = safe_to_numeric(df_analise[coluna_valor])
+    # Filtros: índice montado uma vez por dataset/mapeamento (ordem por data +
+    # posições por categoria); cada combinação é uma busca binária + interseção
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### 🔎 Filtros")
+        if fonte_sql:
+            intervalo, opcoes = opcoes_filtro_sql(fonte_sql, impressao)
+        else:
+            indice = indice_filtros(df_analise, impressao, coluna_data, coluna_valor)
+            intervalo, opcoes = intervalo_datas(indice), opcoes_filtro(indice)
+        filtros = barra_filtros(coluna_data, intervalo, opcoes) or None
+
+        if filtros and not fonte_sql:
+            inicio, fim = filtros.get(coluna_data, (None, None))
+            selecao = {c: v for c, v in filtros.items() if c != coluna_data}
+            df_analise = aplicar_filtros(df_analise, indice, inicio, fim, selecao)
+            st.caption(f"{len(df_analise):,} linhas após os filtros")
+
+    kpis = analisar_kpis(df_analise, impressao, coluna_data, coluna_valor, fonte_sql=fonte_sql, filtros=filtros)
+    if kpis["mes_pico"] is None:
+        st.warning("⚠️ Nenhuma venda com os filtros selecionados.")
+        st.stop()
 
-    df_analise = df_analise.dropna(subset=[coluna_data, coluna_valor])
+    marcar(perfil_execucao, "Filtros", len(df_analise))
 
     # Crescimento (usa sua função existente)
     with st.spinner("🔄 Calculando análise de crescimento..."):
-        resultado = calcular_crescimento(
+        crescimento = analisar_crescimento(
             df_analise,
+            impressao,
             coluna_data=coluna_data,
             coluna_valor=coluna_valor,
             periodo=periodo_map[periodo],
+            fonte_sql=fonte_sql,
+            filtros=filtros,
         )
+    resultado = crescimento["tabela"]
+    estatisticas = crescimento["estatisticas"]
 
     st.success("✅ Análise concluída!")
+    marcar(perfil_execucao, "Crescimento", len(resultado))
 
     # =========================
     # MÉTRICAS EXECUTIVAS
     # =========================
     st.markdown("## 🧾 Métricas Executivas")
 
-    receita_total = df_analise[coluna_valor].sum()
+    receita_total = kpis["receita_total"]
 
-    mes_pico_num = (
-        df_analise.groupby(df_analise[coluna_data].dt.month)[coluna_valor]
-        .sum()
-        .idxmax()
-    )
-    mes_pico = f"{month_name_pt(int(mes_pico_num))} ({int(mes_pico_num)})"
+    mes_pico_num = kpis["mes_pico"]
+    mes_pico = f"{month_name_pt(mes_pico_num)} ({mes_pico_num})" if mes_pico_num is not None else "N/A"
 
     top3_share = None
     top3_labels = None
 
     if dim_concentracao and dim_concentracao in df_analise.columns:
-        df_tmp = df_analise.dropna(subset=[dim_concentracao])
-        if len(df_tmp) > 0:
-            top3 = (
-                df_tmp.groupby(dim_concentracao)[coluna_valor]
-                .sum()
-                .sort_values(ascending=False)
-                .head(3)
-            )
-            top3_share = (top3.sum() / receita_total) * 100 if receita_total else 0
-            top3_labels = ", ".join([str(x) for x in top3.index.tolist()])
+        # Top 3 = início do ranking de Pareto (mesma tabela em cache)
+        top3 = analisar_pareto(
+            df_analise, impressao, dim_concentracao, coluna_valor, fonte_sql=fonte_sql, filtros=filtros
+        ).head(3)
+        if len(top3) > 0:
+            top3_share = (top3["total"].sum() / receita_total) * 100 if receita_total else 0
+            top3_labels = ", ".join([str(x) for x in top3[dim_concentracao].tolist()])
 
     k1, k2, k3 = st.columns(3)
     with k1:
@@ -379,6 +793,8 @@ try:
 
     st.markdown("---")
 
+    marcar(perfil_execucao, "Métricas executivas")
+
     # =========================
     # MÉTRICAS DE CRESCIMENTO (já existente)
     # =========================
@@ -387,7 +803,7 @@ try:
     c1, c2, c3, c4 = st.columns(4)
 
     with c1:
-        crescimento_medio = resultado["crescimento_%"].mean()
+        crescimento_medio = estatisticas["medio"]
         delta = (
             resultado["crescimento_%"].iloc[-1] - resultado["crescimento_%"].iloc[-2]
             if len(resultado) > 1
@@ -395,7 +811,7 @@ try:
         )
         st.metric(
             "Crescimento Médio",
-            f"{crescimento_medio:.1f}%" if not pd.isna(crescimento_medio) else "N/A",
+            f"{crescimento_medio:.1f}%" if crescimento_medio is not None else "N/A",
             delta=f"{delta:.1f} pp" if not pd.isna(delta) else None,
         )
 
@@ -404,33 +820,27 @@ try:
         st.metric("Último Período", f"${ultimo_valor:,.0f}")
 
     with c3:
-        melhor_cresc = resultado["crescimento_%"].max()
-        melhor_periodo = (
-            resultado.loc[resultado["crescimento_%"].idxmax(), coluna_data]
-            if not pd.isna(melhor_cresc)
-            else "N/A"
-        )
+        melhor_cresc = estatisticas["maximo"]
+        melhor_periodo = estatisticas["melhor_periodo"]
         st.metric(
             "Melhor Período",
-            f"{melhor_cresc:.1f}%" if not pd.isna(melhor_cresc) else "N/A",
-            delta=f"em {melhor_periodo}" if melhor_periodo != "N/A" else None,
+            f"{melhor_cresc:.1f}%" if melhor_cresc is not None else "N/A",
+            delta=f"em {melhor_periodo:%Y-%m-%d}" if melhor_periodo is not None else None,
         )
 
     with c4:
-        pior_cresc = resultado["crescimento_%"].min()
-        pior_periodo = (
-            resultado.loc[resultado["crescimento_%"].idxmin(), coluna_data]
-            if not pd.isna(pior_cresc)
-            else "N/A"
-        )
+        pior_cresc = estatisticas["minimo"]
+        pior_periodo = estatisticas["pior_periodo"]
         st.metric(
             "Pior Período",
-            f"{pior_cresc:.1f}%" if not pd.isna(pior_cresc) else "N/A",
-            delta=f"em {pior_periodo}" if pior_periodo != "N/A" else None,
+            f"{pior_cresc:.1f}%" if pior_cresc is not None else "N/A",
+            delta=f"em {pior_periodo:%Y-%m-%d}" if pior_periodo is not None else None,
         )
 
     st.markdown("---")
 
+    marcar(perfil_execucao, "Métricas de crescimento")
+
     # =========================
     # GRÁFICOS PRINCIPAIS
     # =========================
@@ -473,13 +883,17 @@ try:
 
     st.markdown("---")
 
+    marcar(perfil_execucao, "Gráficos principais")
+
     # =========================
     # PARETO AUTOMÁTICO
     # =========================
     st.markdown("## 🧩 Concentração de Receita (Pareto)")
 
     if dim_concentracao and dim_concentracao in df_analise.columns:
-        pareto_df = compute_pareto(df_analise, dim_concentracao, coluna_valor)
+        pareto_df = analisar_pareto(
+            df_analise, impressao, dim_concentracao, coluna_valor, fonte_sql=fonte_sql, filtros=filtros
+        )
         fig_pareto = build_pareto_chart(pareto_df, dim_concentracao, top_n=top_n_pareto)
         st.plotly_chart(fig_pareto, use_container_width=True)
 
@@ -494,12 +908,16 @@ try:
 
     st.markdown("---")
 
+    marcar(perfil_execucao, "Pareto")
+
     # =========================
     # YOY (Year-over-Year)
     # =========================
     st.markdown("## 📅 Comparação YoY (Year-over-Year)")
 
-    yoy_df = compute_yoy(df_analise, coluna_data, coluna_valor, freq="ME")  # mensal
+    yoy_df = analisar_yoy(
+        df_analise, impressao, coluna_data, coluna_valor, freq="ME", fonte_sql=fonte_sql, filtros=filtros
+    )  # mensal
     yoy_df_display = yoy_df.copy()
 
     # Cards YoY
@@ -543,10 +961,112 @@ try:
 
     st.markdown("---")
 
+    marcar(perfil_execucao, "YoY")
+
+    # =========================
+    # CRESCIMENTO POR MEMBRO (mapa de calor)
+    # =========================
+    st.markdown("## 🔥 Crescimento por Membro")
+
+    if dim_options:
+        h1, h2, h3 = st.columns([2, 3, 2])
+        with h1:
+            dim_membros = st.selectbox(
+                "Dimensão",
+                dim_options,
+                index=dim_options.index(dim_concentracao) if dim_concentracao in dim_options else 0,
+                key="dim_membros",
+            )
+        with h2:
+            metricas_mapa = {
+                "Crescimento vs período anterior": "crescimento_%",
+                "YoY (mesmo período do ano anterior)": "yoy_%",
+                "Totais": "totais",
+            }
+            metrica_mapa = metricas_mapa[st.radio("Métrica", list(metricas_mapa), horizontal=True)]
+        with h3:
+            top_n_mapa = st.slider("Membros no mapa", min_value=5, max_value=50, value=15, step=1)
+
+        membros = analisar_crescimento_membros(
+            df_analise, impressao, coluna_data, coluna_valor, dim_membros, periodo_map[periodo],
+            fonte_sql=fonte_sql, filtros=filtros,
+        )
+        matriz = membros[metrica_mapa]
+        if matriz.shape[1]:
+            st.plotly_chart(build_heatmap_chart(matriz, metrica_mapa, top_n=top_n_mapa), use_container_width=True)
+            st.caption(
+                f"{matriz.shape[1]:,} membros de **{dim_membros}** × {matriz.shape[0]:,} períodos "
+                f"({membros['nome'].lower()}); mostrando os {min(top_n_mapa, matriz.shape[1])} de maior total"
+            )
+        else:
+            st.info("ℹ️ Sem valores para a dimensão escolhida.")
+    else:
+        st.info("ℹ️ Selecione uma dimensão categórica no menu lateral para gerar o mapa de calor.")
+
+    st.markdown("---")
+
+    marcar(perfil_execucao, "Crescimento por membro")
+
+    # =========================
+    # PREVISÃO (próximo trimestre)
+    # =========================
+    st.markdown("## 🔮 Previsão (próximo trimestre)")
+
+    dims_previsao = [c for c in ["PRODUCTLINE", "COUNTRY"] if c in df_analise.columns] or dim_options
+    previsao = None
+    if dims_previsao:
+        p1, p2 = st.columns(2)
+        with p1:
+            dim_previsao = st.selectbox("Projetar por", dims_previsao, index=0, key="dim_previsao")
+        try:
+            previsao = analisar_previsao(
+                df_analise, impressao, coluna_data, coluna_valor, dim_previsao, fonte_sql=fonte_sql, filtros=filtros,
+            )
+        except ValueError as e:
+            st.info(f"ℹ️ Previsão indisponível: {e}")
+    else:
+        st.info("ℹ️ Selecione uma dimensão categórica no menu lateral para gerar a previsão.")
+
+    if previsao is not None:
+        with p2:
+            serie = st.selectbox("Série", list(previsao["historico"].columns), index=0, key="serie_previsao")
+
+        st.plotly_chart(build_forecast_chart(previsao, serie), use_container_width=True)
+        st.caption(
+            f"Modelo: {previsao['modelo']} (ajustado em lote para {previsao['historico'].shape[1]:,} séries); "
+            f"faixa de {previsao['nivel_confianca']:.0%} de confiança"
+        )
+
+        with st.expander(f"📋 Projeção por {dim_previsao} (próximos {HORIZONTE_PADRAO} meses)"):
+            ultimos = previsao["historico"].iloc[-HORIZONTE_PADRAO:].sum()
+            projecao = pd.DataFrame({
+                "Série": previsao["historico"].columns,
+                "Últimos meses": ultimos.to_numpy(),
+                "Previsão": previsao["previsao"].sum().to_numpy(),
+                "Mínimo": previsao["inferior"].sum().to_numpy(),
+                "Máximo": previsao["superior"].sum().to_numpy(),
+            })
+            base = projecao["Últimos meses"].where(projecao["Últimos meses"] > 0)
+            projecao["Variação %"] = (projecao["Previsão"] / base - 1) * 100
+            moeda = st.column_config.NumberColumn(format="$%.0f")
+            st.dataframe(
+                projecao,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Últimos meses": moeda, "Previsão": moeda, "Mínimo": moeda, "Máximo": moeda,
+                    "Variação %": st.column_config.NumberColumn(format="%.1f%%"),
+                },
+            )
+
+    st.markdown("---")
+
+    marcar(perfil_execucao, "Previsão")
+
     # =========================
     # TABS: DETALHES / ESTATÍSTICAS / SOBRE
     # =========================
-    tab1, tab2, tab3 = st.tabs(["📋 Dados Detalhados", "📊 Estatísticas", "ℹ️ Sobre"])
+    tab1, tab2, tab_clientes, tab3 = st.tabs(["📋 Dados Detalhados", "📊 Estatísticas", "👥 Clientes", "ℹ️ Sobre"])
 
     with tab1:
         st.markdown("### Tabela de Resultados (Crescimento)")
@@ -561,9 +1081,14 @@ try:
             "crescimento_%": "Crescimento",
         })
 
-        st.dataframe(tabela, use_container_width=True, hide_index=True)
+        st.dataframe(
+            tabela,
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Período": st.column_config.DateColumn(format="YYYY-MM-DD")},
+        )
 
-        csv = resultado.to_csv(index=False)
+        csv = resultado.to_csv(index=False, date_format="%Y-%m-%d")
         st.download_button(
             label="📥 Download CSV (crescimento)",
             data=csv,
@@ -602,6 +1127,77 @@ try:
             bottom3 = resultado.nsmallest(3, "crescimento_%")[[coluna_data, "total_vendas", "crescimento_%"]]
             st.dataframe(bottom3, use_container_width=True, hide_index=True)
 
+    with tab_clientes:
+        try:
+            clientes = analisar_clientes(
+                df_analise, impressao, coluna_data, coluna_valor, fonte_sql=fonte_sql, filtros=filtros,
+            )
+        except ValueError as e:
+            clientes = None
+            st.info(f"ℹ️ Análise de clientes indisponível: {e}")
+
+        if clientes is not None and len(clientes["rfm"]):
+            rfm = clientes["rfm"]
+            if clientes["ocasiao"] == "pedido":
+                ocasiao = "pedidos"
+            else:
+                ocasiao = "meses com compra" if coluna_data == "DATA_MES" else "dias com compra"
+
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Clientes", f"{len(rfm):,}")
+            c2.metric("Recência mediana", f"{rfm['RECENCIA_DIAS'].median():.0f} dias")
+            c3.metric(f"Frequência média ({ocasiao})", f"{rfm['FREQUENCIA'].mean():.1f}")
+            c4.metric("Receita por cliente", format_currency(rfm["VALOR"].mean(), "$"))
+
+            st.markdown("### Segmentos RFM")
+            segmentos = clientes["segmentos"]
+            fig = px.bar(
+                segmentos, x="SEGMENTO", y="receita", text="clientes", template="plotly_white",
+                labels={"SEGMENTO": "Segmento", "receita": "Receita", "clientes": "Clientes"},
+            )
+            fig.update_traces(texttemplate="%{text} clientes", textposition="outside", marker_color="#FF4B4B")
+            fig.update_layout(height=380, margin=dict(l=30, r=30, t=30, b=30))
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(
+                segmentos.rename(columns={
+                    "SEGMENTO": "Segmento", "clientes": "Clientes", "recencia_media": "Recência média (dias)",
+                    "frequencia_media": "Frequência média", "receita": "Receita", "receita_%": "Receita %",
+                }),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Recência média (dias)": st.column_config.NumberColumn(format="%.0f"),
+                    "Frequência média": st.column_config.NumberColumn(format="%.1f"),
+                    "Receita": st.column_config.NumberColumn(format="$%.0f"),
+                    "Receita %": st.column_config.NumberColumn(format="%.1f%%"),
+                },
+            )
+
+            st.markdown("### Retenção por Coorte (mês da 1ª compra)")
+            metrica_coorte = st.radio(
+                "Métrica", ["retencao_%", "clientes"], horizontal=True, key="metrica_coorte",
+                format_func={"retencao_%": "Retenção %", "clientes": "Clientes ativos"}.get,
+            )
+            st.plotly_chart(build_cohort_chart(clientes["coortes"][metrica_coorte], metrica_coorte),
+                            use_container_width=True)
+            st.caption(
+                f"Frequência = {ocasiao}; recência contada até o dia seguinte à última compra da base "
+                f"(última: {rfm['ULTIMA_COMPRA'].max():%Y-%m-%d}). Escores R, F e M de 1 a 5 por quintil."
+            )
+
+            with st.expander("📋 Clientes (RFM)"):
+                st.dataframe(
+                    rfm.sort_values("VALOR", ascending=False).reset_index(),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "ULTIMA_COMPRA": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                        "VALOR": st.column_config.NumberColumn(format="$%.2f"),
+                    },
+                )
+        elif clientes is not None:
+            st.info("ℹ️ Nenhum cliente com compra no período/filtros selecionados.")
+
     with tab3:
         st.markdown("### Sobre este Dashboard")
 
@@ -609,10 +1205,14 @@ try:
             f"""
 **Funcionalidades principais:**
 - 📤 Upload de CSV com seleção dinâmica de colunas
+- 🔎 Filtros por período, país, linha de produto, tamanho do pedido e status
 - 📈 Crescimento periódico (mensal/trimestral/anual)
 - 🧾 Métricas executivas (Receita Total, Pico Sazonal, Concentração Top 3)
 - 🧩 Pareto automático (concentração de receita)
 - 📅 Comparação YoY (mensal)
+- 🔥 Mapa de calor do crescimento por membro (produto, país, cliente...)
+- 🔮 Previsão do próximo trimestre (total, linha de produto, país) com faixa de confiança
+- 👥 Clientes: segmentos RFM e retenção por coorte de primeira compra
 - 📋 Exportação de resultados
 
 **Dica de uso:**
@@ -633,6 +1233,13 @@ except Exception as e:
     st.error(f"❌ Erro na análise: {str(e)}")
     st.exception(e)
 
+marcar(perfil_execucao, "Detalhes e estatísticas")
+if modo_debug:
+    with st.sidebar.expander("🩺 Debug: tempo por seção (esta execução)", expanded=True):
+        tempos = tabela_perfil(perfil_execucao)
+        st.dataframe(tempos, hide_index=True, use_container_width=True)
+        st.caption(f"Total: {tempos['tempo_s'].sum():.3f} s")
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,347 @@
+# scripts/analise_clientes.py
+"""
+👥 ANÁLISE DE CLIENTES (RFM E COORTES)
+Recência, frequência e valor por cliente e retenção das coortes de primeira
+compra, calculados com bincount e ordenações sobre chaves inteiras (cliente,
+dia, mês, pedido), sem laço por cliente. O estado acumulado recebe lotes
+novos da fato sem reprocessar o histórico
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Executado como script (python scripts/analise_clientes.py), só a pasta
+# scripts/ está no path: a raiz entra para importar os módulos como scripts.*
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from scripts.modelo_estrela import carregar_modelo_estrela, existe_modelo_estrela  # noqa: E402
+
+
+# Colunas reconhecidas como cliente e como nº do pedido (em ordem de preferência)
+COLUNAS_CLIENTE = ['CUSTOMER_ID', 'CUSTOMERNAME', 'CLIENTE']
+COLUNAS_PEDIDO = ['ORDERNUMBER']
+
+# Nº de faixas dos escores R, F e M (1 = pior, 5 = melhor)
+QUANTIS_RFM = 5
+
+# Segmento por escore de recência (linhas, R = 1..5) e de frequência (colunas, F = 1..5)
+SEGMENTOS_RFM = [
+    ['Perdidos', 'Perdidos', 'Em risco', 'Em risco', 'Não pode perder'],
+    ['Hibernando', 'Hibernando', 'Em risco', 'Em risco', 'Não pode perder'],
+    ['Quase dormindo', 'Quase dormindo', 'Precisam de atenção', 'Leais', 'Leais'],
+    ['Promissores', 'Potenciais leais', 'Potenciais leais', 'Leais', 'Leais'],
+    ['Novos', 'Potenciais leais', 'Potenciais leais', 'Campeões', 'Campeões'],
+]
+
+# Chaves compostas (cliente << 32 | código): dias e meses contados a partir de 1900
+BITS_CODIGO = 32
+MASCARA_CODIGO = (1 << BITS_CODIGO) - 1
+DIA_INICIAL = np.datetime64('1900-01-01', 'D')
+MES_INICIAL = np.datetime64('1900-01', 'M')
+
+# Marcadores de "sem compra" nos vetores de primeira/última compra
+SEM_PRIMEIRA = np.iinfo(np.int64).max
+SEM_ULTIMA = np.iinfo(np.int64).min
+
+# Estado gravado pelo processador na pasta de saída (atualizado a cada carga)
+ARQUIVO_ESTADO_CLIENTES = 'estado_clientes.npz'
+
+
+def novo_estado_clientes():
+    """
+    Estado vazio. Vetores indexados pelo ID do cliente:
+    - 'primeira_compra' / 'ultima_compra': dia (desde 1900) da primeira e da última compra;
+    - 'valor': soma das vendas.
+    Conjuntos de chaves (ordenadas, únicas), que tornam as cargas incrementais exatas:
+    - 'compras': cliente × ocasião de compra (pedido, ou dia se não houver nº do pedido);
+    - 'ativos': cliente × mês com compra (base das coortes).
+    """
+    return {
+        'primeira_compra': np.empty(0, dtype=np.int64),
+        'ultima_compra': np.empty(0, dtype=np.int64),
+        'valor': np.empty(0, dtype=np.float64),
+        'compras': np.empty(0, dtype=np.int64),
+        'ativos': np.empty(0, dtype=np.int64),
+        'ocasiao': '',
+    }
+
+
+def crescer(vetor, tamanho, preenchimento):
+    """Cópia do vetor com `tamanho` posições (as novas recebem o preenchimento)"""
+    novo = np.full(tamanho, preenchimento, dtype=vetor.dtype)
+    novo[:len(vetor)] = vetor
+    return novo
+
+
+def chaves_compostas(clientes, codigos):
+    """Chave inteira única por par (cliente, código)"""
+    if len(codigos) and (codigos.min() < 0 or codigos.max() >= 1 << BITS_CODIGO):
+        raise ValueError(f"Códigos de pedido/data fora do intervalo 0..2^{BITS_CODIGO}")
+    return (clientes << BITS_CODIGO) | codigos
+
+
+def chaves_unicas(chaves):
+    """Chaves ordenadas e sem repetição (ordenação + descarte de vizinhos iguais)"""
+    chaves = np.sort(chaves)
+    if len(chaves) < 2:
+        return chaves
+    return chaves[np.r_[True, chaves[1:] != chaves[:-1]]]
+
+
+def unir_chaves(existentes, novas):
+    """
+    União ordenada e sem repetição: só o lote é ordenado; as chaves que ainda
+    não existem são localizadas no histórico (searchsorted) e inseridas numa
+    única cópia, sem reordenar o histórico.
+    """
+    novas = chaves_unicas(novas)
+    posicoes = np.searchsorted(existentes, novas)
+    conhecidas = posicoes < len(existentes)
+    conhecidas[conhecidas] = existentes[posicoes[conhecidas]] == novas[conhecidas]
+    if conhecidas.all():
+        return existentes
+    return np.insert(existentes, posicoes[~conhecidas], novas[~conhecidas])
+
+
+def acumular_clientes(estado, clientes, datas, valores, pedidos=None):
+    """
+    Acrescenta um lote de vendas ao estado (devolve um estado novo; o anterior não muda).
+    clientes: IDs inteiros (≥ 0); datas; valores; pedidos: nº do pedido (opcional).
+    Linhas sem cliente ou sem data são ignoradas. Um pedido repetido em lotes
+    diferentes conta uma vez só: os lotes podem cortar pedidos ao meio.
+    """
+    ocasiao = 'dia' if pedidos is None else 'pedido'
+    if estado['ocasiao'] and estado['ocasiao'] != ocasiao:
+        raise ValueError(f"O estado conta compras por {estado['ocasiao']}; o lote, por {ocasiao}")
+
+    clientes = pd.to_numeric(pd.Series(clientes), errors='coerce').to_numpy(dtype=np.float64)
+    dias = pd.to_datetime(pd.Series(datas)).to_numpy().astype('datetime64[D]')
+    validas = (clientes >= 0) & ~np.isnat(dias)
+    clientes = clientes[validas].astype(np.int64)
+    dias = dias[validas]
+    valores = np.nan_to_num(np.asarray(valores, dtype=np.float64)[validas])
+
+    tamanho = max(len(estado['valor']), int(clientes.max()) + 1 if len(clientes) else 0)
+    novo = {
+        'primeira_compra': crescer(estado['primeira_compra'], tamanho, SEM_PRIMEIRA),
+        'ultima_compra': crescer(estado['ultima_compra'], tamanho, SEM_ULTIMA),
+        'valor': crescer(estado['valor'], tamanho, 0.0),
+        'ocasiao': ocasiao,
+    }
+    novo['valor'] += np.bincount(clientes, weights=valores, minlength=tamanho)
+
+    # Chaves cliente × dia ordenadas: em cada cliente, a 1ª chave tem a menor data; a última, a maior
+    por_dia = np.sort(chaves_compostas(clientes, (dias - DIA_INICIAL).astype(np.int64)))
+    c, d = por_dia >> BITS_CODIGO, por_dia & MASCARA_CODIGO
+    inicio = np.flatnonzero(np.r_[True, c[1:] != c[:-1]]) if len(c) else np.empty(0, dtype=np.int64)
+    fim = np.r_[inicio[1:], len(c)] - 1
+    ids = c[inicio]
+    novo['primeira_compra'][ids] = np.minimum(novo['primeira_compra'][ids], d[inicio])
+    novo['ultima_compra'][ids] = np.maximum(novo['ultima_compra'][ids], d[fim])
+
+    if pedidos is None:
+        compras = por_dia
+    else:
+        compras = chaves_compostas(clientes, np.asarray(pedidos, dtype=np.int64)[validas])
+    meses = (dias.astype('datetime64[M]') - MES_INICIAL).astype(np.int64)
+    novo['compras'] = unir_chaves(estado['compras'], compras)
+    novo['ativos'] = unir_chaves(estado['ativos'], chaves_compostas(clientes, meses))
+    return novo
+
+
+def estado_de_vendas(df, coluna_data, coluna_valor, coluna_cliente=None, coluna_pedido=None):
+    """
+    Estado a partir de um DataFrame de vendas. Sem coluna informada, usa a
+    primeira de COLUNAS_CLIENTE / COLUNAS_PEDIDO presente (pedido só se inteiro).
+    Clientes que não são IDs inteiros (nomes) viram códigos.
+    Retorna (estado, rótulos): rótulos[código] = nome do cliente, ou None para IDs.
+    """
+    coluna_cliente = coluna_cliente or next((c for c in COLUNAS_CLIENTE if c in df.columns), None)
+    if coluna_cliente is None:
+        raise ValueError(f"Nenhuma coluna de cliente encontrada (esperado: {', '.join(COLUNAS_CLIENTE)})")
+    if coluna_pedido is None:
+        coluna_pedido = next(
+            (c for c in COLUNAS_PEDIDO if c in df.columns and pd.api.types.is_integer_dtype(df[c])), None
+        )
+
+    serie = df[coluna_cliente]
+    if pd.api.types.is_integer_dtype(serie):
+        clientes, rotulos = serie.to_numpy(), None
+    elif isinstance(serie.dtype, pd.CategoricalDtype):
+        clientes, rotulos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        clientes, rotulos = pd.factorize(serie)
+
+    pedidos = df[coluna_pedido].to_numpy() if coluna_pedido else None
+    estado = acumular_clientes(novo_estado_clientes(), clientes, df[coluna_data], df[coluna_valor], pedidos)
+    return estado, rotulos
+
+
+def estado_do_modelo_estrela(pasta):
+    """
+    Estado recalculado a partir do modelo estrela salvo pelo processador (fato
+    com a data da dim_tempo), para quando o estado acumulado não existe.
+    Retorna None se a pasta não tiver o modelo.
+    """
+    if not existe_modelo_estrela(pasta):
+        return None
+    df = carregar_modelo_estrela(pasta, ('DATA',), colunas_fato=['ORDERNUMBER', 'DATE_ID', 'CUSTOMER_ID', 'SALES'])
+    estado, _ = estado_de_vendas(df, 'DATA', 'SALES', 'CUSTOMER_ID', 'ORDERNUMBER')
+    return estado
+
+
+def frequencias(estado):
+    """Compras (pedidos ou dias) por cliente"""
+    return np.bincount(estado['compras'] >> BITS_CODIGO, minlength=len(estado['valor']))
+
+
+def escores(valores, quantis=QUANTIS_RFM):
+    """Faixa 1..quantis pela posição de cada valor (empates na mesma faixa; maior = melhor)"""
+    if not len(valores):
+        return np.empty(0, dtype=np.int8)
+    posicao = np.searchsorted(np.sort(valores), valores, side='right') / len(valores)
+    return np.clip(np.ceil(posicao * quantis), 1, quantis).astype(np.int8)
+
+
+def calcular_rfm(estado, data_referencia=None, rotulos=None, quantis=QUANTIS_RFM):
+    """
+    Tabela RFM: uma linha por cliente com compra. Recência em dias até a data
+    de referência (padrão: dia seguinte à última compra da base); escores R, F e
+    M de 1 a `quantis` e o segmento pela grade SEGMENTOS_RFM (recência × frequência).
+    """
+    clientes = np.flatnonzero(estado['ultima_compra'] != SEM_ULTIMA)
+    ultima = estado['ultima_compra'][clientes]
+    if data_referencia is None:
+        referencia = int(ultima.max()) + 1 if len(ultima) else 0
+    else:
+        referencia = int((np.datetime64(pd.Timestamp(data_referencia).date(), 'D') - DIA_INICIAL).astype(np.int64))
+
+    recencia = referencia - ultima
+    frequencia = frequencias(estado)[clientes]
+    valor = estado['valor'][clientes]
+    r, f, m = escores(-recencia, quantis), escores(frequencia, quantis), escores(valor, quantis)
+
+    grade = np.array(SEGMENTOS_RFM, dtype=object)
+    linhas = (r.astype(np.int64) - 1) * len(SEGMENTOS_RFM) // quantis
+    colunas = (f.astype(np.int64) - 1) * len(SEGMENTOS_RFM[0]) // quantis
+    segmentos = pd.Categorical(grade[linhas, colunas], categories=list(dict.fromkeys(grade.ravel())))
+
+    indice = pd.Index(clientes if rotulos is None else np.asarray(rotulos)[clientes], name='CLIENTE')
+    return pd.DataFrame({
+        'ULTIMA_COMPRA': DIA_INICIAL + ultima,
+        'RECENCIA_DIAS': recencia,
+        'FREQUENCIA': frequencia,
+        'VALOR': valor,
+        'R': r,
+        'F': f,
+        'M': m,
+        'SEGMENTO': segmentos,
+    }, index=indice)
+
+
+def resumir_segmentos(rfm):
+    """Clientes, médias de recência/frequência e receita de cada segmento (maior receita primeiro)"""
+    resumo = rfm.groupby('SEGMENTO', observed=True).agg(
+        clientes=('VALOR', 'size'),
+        recencia_media=('RECENCIA_DIAS', 'mean'),
+        frequencia_media=('FREQUENCIA', 'mean'),
+        receita=('VALOR', 'sum'),
+    )
+    total = resumo['receita'].sum()
+    resumo['receita_%'] = (resumo['receita'] / total * 100).round(2) if total else np.nan
+    return resumo.sort_values('receita', ascending=False).reset_index()
+
+
+def matriz_coortes(estado):
+    """
+    Triângulo de coortes: linhas = mês da primeira compra; colunas = meses desde
+    ela (0, 1, 2...). 'clientes' conta os clientes da coorte com compra naquele
+    mês; 'retencao_%' divide pelo tamanho da coorte (mês 0). Meses ainda não
+    observados (depois da última compra da base) ficam vazios.
+    """
+    clientes = estado['ativos'] >> BITS_CODIGO
+    meses = estado['ativos'] & MASCARA_CODIGO
+    primeira = estado['primeira_compra'][clientes].astype('timedelta64[D]') + DIA_INICIAL
+    coorte_cliente = (primeira.astype('datetime64[M]') - MES_INICIAL).astype(np.int64)
+    idade = meses - coorte_cliente
+
+    coortes, codigos = np.unique(coorte_cliente, return_inverse=True)
+    n_idades = int(idade.max()) + 1 if len(idade) else 0
+    contagem = np.bincount(codigos * n_idades + idade, minlength=len(coortes) * n_idades)
+    contagem = contagem.reshape(len(coortes), n_idades).astype(np.float64)
+
+    # Triângulo: a coorte de cada mês só tem (último mês - mês da coorte) meses observados
+    ultimo_mes = int(meses.max()) if len(meses) else 0
+    contagem[np.arange(n_idades)[None, :] > (ultimo_mes - coortes)[:, None]] = np.nan
+
+    indice = pd.DatetimeIndex(MES_INICIAL + coortes, name='COORTE')
+    colunas = pd.RangeIndex(n_idades, name='MESES_DESDE_1A_COMPRA')
+    totais = pd.DataFrame(contagem, index=indice, columns=colunas)
+    tamanho = totais[0] if n_idades else pd.Series(dtype=np.float64)
+    return {
+        'clientes': totais,
+        'retencao_%': (totais.div(tamanho, axis=0) * 100).round(2),
+        'tamanho': tamanho.astype(np.int64),
+    }
+
+
+def salvar_estado_clientes(estado, caminho):
+    """Grava o estado em .npz (só arrays NumPy, sem pickle)"""
+    np.savez_compressed(caminho, **{c: v for c, v in estado.items() if c != 'ocasiao'},
+                        ocasiao=np.array(estado['ocasiao']))
+    return caminho
+
+
+def carregar_estado_clientes(caminho):
+    """Lê o estado gravado por salvar_estado_clientes (None se o arquivo não existir)"""
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        estado = {c: arquivo[c] for c in arquivo.files}
+    estado['ocasiao'] = str(estado['ocasiao'])
+    return estado
+
+
+def ler_argumentos():
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="RFM e coortes de clientes a partir do estado do processador")
+    parser.add_argument('--pasta', default='dados_processados',
+                        help=f"Pasta com {ARQUIVO_ESTADO_CLIENTES} ou o modelo estrela (padrão: dados_processados)")
+    parser.add_argument('--data-referencia', help="Data de referência da recência (padrão: dia após a última compra)")
+    parser.add_argument('--meses', type=int, default=12, help="Meses de retenção exibidos (padrão: 12)")
+    return parser.parse_args()
+
+
+def main():
+    args = ler_argumentos()
+    caminho = os.path.join(args.pasta, ARQUIVO_ESTADO_CLIENTES)
+    estado = carregar_estado_clientes(caminho)
+    if estado is None:
+        estado = estado_do_modelo_estrela(args.pasta)
+        if estado is None:
+            print(f"❌ {caminho} não encontrado: rode o processador (scripts/processador_powerbi.py) antes")
+            return 1
+        print(f"⚠️ {caminho} não encontrado: estado recalculado da fato_vendas em {args.pasta}")
+
+    rfm = calcular_rfm(estado, args.data_referencia)
+    print("=" * 70)
+    print(f"👥 CLIENTES: {len(rfm):,} com compra (frequência por {estado['ocasiao']})")
+    print("=" * 70)
+    print("\n🏷️ SEGMENTOS RFM:")
+    print(resumir_segmentos(rfm).round(1).to_string(index=False))
+
+    coortes = matriz_coortes(estado)
+    retencao = coortes['retencao_%'].iloc[:, :args.meses + 1]
+    retencao.index = retencao.index.strftime('%Y-%m')
+    print("\n📆 RETENÇÃO POR COORTE (% dos clientes da coorte):")
+    print(retencao.to_string(na_rep=''))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,128 @@
 # scripts/analise_crescimento.py
+import numpy as np
 import pandas as pd
 import os
+import sys
+import io
 import glob
+import argparse
+import contextlib
+import logging
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pandas.tseries.frequencies import to_offset
+
+# Executado como script (python scripts/analise_crescimento.py), só a pasta
+# scripts/ está no path: a raiz entra para importar os módulos como scripts.*
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from scripts.esquema_vendas import converter_datas  # noqa: E402
+
+
+# Períodos suportados: código -> (frequência Pandas 2.0+, nome, período de origem da consolidação)
+PERIODOS = {
+    'D': ('D', 'Diário', 'D'),
+    'S': ('W-SUN', 'Semanal', 'D'),
+    'M': ('ME', 'Mensal', 'D'),  # Month End (antes era 'M')
+    'T': ('QE', 'Trimestral', 'M'),  # Quarter End (antes era 'Q')
+    'A': ('YE', 'Anual', 'M'),  # Year End (antes era 'A')
+}
+
+# Períodos em um ano (deslocamento do YoY em cada período)
+PERIODOS_POR_ANO = {'D': 365, 'S': 52, 'M': 12, 'T': 4, 'A': 1}
+
+
+# Padrões de nomes que indicam tabelas de vendas/fatos
+PADROES_VENDAS = [
+    'fato_vendas*.csv',
+    'vendas*.csv',
+    'sales*.csv',
+    'orders*.csv',
+    'pedidos*.csv',
+    '*venda*.csv',
+    '*sales*.csv'
+]
+
+# Extensões aceitas como partições de um dataset
+EXTENSOES_PARTICAO = ('.csv', '.parquet')
+
+# Formatos de saída do modo em lote
+FORMATOS_SAIDA = ('csv', 'parquet', 'json')
+
+# Relatórios (tabelas, estatísticas e avisos) saem por logging; quem chama escolhe o nível
+logger = logging.getLogger(__name__)
+
+
+def encontrar_arquivos_vendas():
+    """
+    Procura especificamente por arquivos de vendas/fatos, não dimensões.
+    Retorna todos os arquivos do primeiro padrão encontrado (partições do dataset).
+    """
+    # Primeiro, procurar na pasta dados_processados; se não encontrar, na pasta dados
+    for pasta in ['dados_processados', 'dados']:
+        for padrao in PADROES_VENDAS:
+            arquivos = sorted(glob.glob(os.path.join(pasta, padrao)))
+            if arquivos:
+                if len(arquivos) == 1:
+                    logger.info("📁 Arquivo de vendas encontrado: %s", arquivos[0])
+                else:
+                    logger.info("📁 %d arquivos de vendas encontrados (%s em %s/)", len(arquivos), padrao, pasta)
+                return arquivos
+
+    return []
 
 
 def encontrar_arquivo_vendas():
     """
     Procura especificamente por arquivos de vendas/fatos, não dimensões.
     """
-    # Padrões de nomes que indicam tabelas de vendas/fatos
-    padroes_vendas = [
-        'fato_vendas*.csv',
-        'vendas*.csv',
-        'sales*.csv',
-        'orders*.csv',
-        'pedidos*.csv',
-        '*venda*.csv',
-        '*sales*.csv'
-    ]
-
-    # Primeiro, procurar na pasta dados_processados
-    for padrao in padroes_vendas:
-        caminho_completo = os.path.join('dados_processados', padrao)
-        arquivos = glob.glob(caminho_completo)
-        if arquivos:
-            print(f"📁 Arquivo de vendas encontrado: {arquivos[0]}")
-            return arquivos[0]
-
-    # Se não encontrar, procurar na pasta dados
-    for padrao in padroes_vendas:
-        caminho_completo = os.path.join('dados', padrao)
-        arquivos = glob.glob(caminho_completo)
-        if arquivos:
-            print(f"📁 Arquivo de vendas encontrado: {arquivos[0]}")
-            return arquivos[0]
-
-    return None
+    arquivos = encontrar_arquivos_vendas()
+    return arquivos[0] if arquivos else None
 
 
-def calcular_crescimento(dados, coluna_data=None, coluna_valor=None, periodo='M'):
+def listar_particoes(origem):
     """
-    Calcula o crescimento percentual das vendas entre períodos consecutivos.
-    Suporta Pandas versão 2.0+ com nova sintaxe de frequências.
+    Lista as partições de um dataset: pasta (todos os .csv/.parquet dentro dela),
+    padrão glob (ex.: 'dados/sales_2023_*.csv'), arquivo único ou lista de caminhos.
     """
-    # Se as colunas não foram especificadas, tentar identificar automaticamente
+    if isinstance(origem, (list, tuple)):
+        return [c for item in origem for c in listar_particoes(item)]
+    if os.path.isdir(origem):
+        arquivos = [os.path.join(origem, nome) for nome in sorted(os.listdir(origem))]
+        return [c for c in arquivos if c.lower().endswith(EXTENSOES_PARTICAO)]
+    if glob.has_magic(origem):
+        return sorted(glob.glob(origem))
+    return [origem]
+
+
+def ler_particao(caminho, colunas=None, nrows=None):
+    """Lê uma partição (CSV ou Parquet), só com as colunas pedidas"""
+    if caminho.lower().endswith('.parquet'):
+        df = pd.read_parquet(caminho, columns=colunas)
+        return df if nrows is None else df.head(nrows)
+    try:
+        return pd.read_csv(caminho, usecols=colunas, nrows=nrows)
+    except UnicodeDecodeError:
+        # Exportações de vendas costumam vir em latin-1
+        return pd.read_csv(caminho, usecols=colunas, nrows=nrows, encoding='latin-1')
+
+
+def validar_periodos(periodos):
+    """Valida os códigos de período e os ordena do menor para o maior grão"""
+    periodos = [p.upper() for p in periodos]
+    invalidos = [p for p in periodos if p not in PERIODOS]
+    if invalidos:
+        raise ValueError("Período deve ser 'D' (diário), 'S' (semanal), 'M' (mensal), "
+                         "'T' (trimestral) ou 'A' (anual)")
+    # Ordenar do menor para o maior grão, para que cada um reaproveite o anterior
+    return sorted(dict.fromkeys(periodos), key=list(PERIODOS).index)
+
+
+def identificar_colunas(dados, coluna_data=None, coluna_valor=None):
+    """Identifica automaticamente as colunas de data e de valor que não foram especificadas"""
     if coluna_data is None:
         # Procurar colunas de data - especificamente DATE_ID no seu caso
         colunas_data = [col for col in dados.columns if any(
@@ -60,7 +139,7 @@ def calcular_crescimento(dados, coluna_data=None, coluna_valor=None, periodo='M'
             coluna_data = colunas_data[0]
 
         if coluna_data:
-            print(f"📅 Coluna de data identificada: {coluna_data}")
+            logger.info("📅 Coluna de data identificada: %s", coluna_data)
         else:
             raise ValueError("Não foi possível identificar uma coluna de data")
 
@@ -72,101 +151,391 @@ def calcular_crescimento(dados, coluna_data=None, coluna_valor=None, periodo='M'
 
         if colunas_valor:
             coluna_valor = colunas_valor[0]
-            print(f"💰 Coluna de valor identificada: {coluna_valor}")
+            logger.info("💰 Coluna de valor identificada: %s", coluna_valor)
         else:
             # Se não encontrar, pode ser uma coluna numérica
-            colunas_numericas = dados.select_dtypes(include=['float64', 'int64']).columns
+            colunas_numericas = dados.select_dtypes(include='number').columns
             if len(colunas_numericas) > 0:
                 coluna_valor = colunas_numericas[0]
-                print(f"💰 Usando coluna numérica: {coluna_valor}")
+                logger.info("💰 Usando coluna numérica: %s", coluna_valor)
             else:
                 raise ValueError("Não foi possível identificar uma coluna de valor")
 
-    # Converter data - para seu caso específico, DATE_ID parece ser numérico
-    print(f"\n🔄 Processando dados...")
-
-    # Verificar o tipo da coluna de data
-    if dados[coluna_data].dtype in ['int64', 'float64']:
-        # Se for numérico, pode ser um ID - precisamos de uma data real
-        print(f"⚠️ A coluna {coluna_data} é numérica. Precisamos de uma coluna de data real.")
-        print("📋 Colunas disponíveis para data:")
-        colunas_reais = [col for col in dados.columns if 'date' in col.lower() or 'data' in col.lower()]
-        if colunas_reais:
-            coluna_data = colunas_reais[0]
-            print(f"✅ Usando coluna: {coluna_data}")
-        else:
-            # Se não houver coluna de data, criar uma sequência de datas baseada no índice
-            print("⚠️ Nenhuma coluna de data encontrada. Criando datas sequenciais...")
-            dados['DATA_ANALISE'] = pd.date_range(start='2003-01-01', periods=len(dados), freq='D')
-            coluna_data = 'DATA_ANALISE'
-
-    # Garantir que a coluna de data seja datetime
-    dados[coluna_data] = pd.to_datetime(dados[coluna_data], errors='coerce')
-
-    # Remover linhas com data inválida
-    dados_limpos = dados.dropna(subset=[coluna_data])
-    if len(dados_limpos) < len(dados):
-        print(f"⚠️ {len(dados) - len(dados_limpos)} linhas com data inválida foram removidas")
-
-    # Mapeamento de períodos para nova sintaxe do Pandas (versão 2.0+)
-    freq_map = {
-        'M': 'ME',  # Month End (antes era 'M')
-        'MS': 'MS',  # Month Start (mantém)
-        'T': 'QE',  # Quarter End (antes era 'Q')
-        'QS': 'QS',  # Quarter Start (mantém)
-        'A': 'YE',  # Year End (antes era 'A')
-        'AS': 'YS'  # Year Start (antes era 'AS')
+    return coluna_data, coluna_valor
+
+
+def colunas_data_reais(dados):
+    """Colunas cujo nome indica uma data de verdade (não um ID numérico como DATE_ID)"""
+    return [col for col in dados.columns
+            if ('date' in col.lower() or 'data' in col.lower())
+            and not pd.api.types.is_numeric_dtype(dados[col])]
+
+
+def carregar_datas_dim_tempo(caminho):
+    """
+    Datas da dim_tempo do modelo estrela ao lado de um arquivo da fato
+    (fato_vendas.csv ou uma parte em parquet/fato_vendas/): série DATE_ID -> DATA.
+    Retorna None se não houver dim_tempo.
+    """
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    for base in (pasta, os.path.dirname(pasta)):
+        for nome in ('dim_tempo.csv', 'dim_tempo.parquet'):
+            candidato = os.path.join(base, nome)
+            if os.path.exists(candidato):
+                dim = ler_particao(candidato, ['DATE_ID', 'DATA'])
+                datas = pd.Series(pd.to_datetime(dim['DATA'], errors='coerce').to_numpy(),
+                                  index=dim['DATE_ID'].to_numpy())
+                datas.index.name = 'DATE_ID'
+                return datas
+    return None
+
+
+def escolher_datas(dados, coluna_data, datas_por_id=None):
+    """
+    Decide de onde vêm as datas quando a coluna de data é numérica (ex.: DATE_ID).
+    Retorna (coluna, modo):
+    - 'coluna': a própria coluna, ou outra coluna de data real do dataset;
+    - 'dim_tempo': os IDs da coluna são convertidos pela dim_tempo (datas_por_id);
+    - 'sequencial': sem data real, datas sequenciais pela ordem das linhas.
+    """
+    if not pd.api.types.is_numeric_dtype(dados[coluna_data]):
+        return coluna_data, 'coluna'
+    colunas_reais = colunas_data_reais(dados)
+    if colunas_reais:
+        logger.warning("⚠️ A coluna %s é numérica. Usando coluna: %s", coluna_data, colunas_reais[0])
+        return colunas_reais[0], 'coluna'
+    if datas_por_id is not None and coluna_data == datas_por_id.index.name:
+        logger.warning("⚠️ A coluna %s é numérica. Datas obtidas da dim_tempo (%s -> DATA)",
+                       coluna_data, coluna_data)
+        return coluna_data, 'dim_tempo'
+    logger.warning("⚠️ A coluna %s é numérica e não há coluna de data. Criando datas sequenciais...", coluna_data)
+    return coluna_data, 'sequencial'
+
+
+def datas_da_dim_tempo(ids, datas_por_id):
+    """Converte uma coluna de IDs de data nas datas da dim_tempo (IDs desconhecidos viram NaT)"""
+    return pd.Series(datas_por_id.reindex(ids.to_numpy()).to_numpy(), index=ids.index, name='DATA')
+
+
+def converter_coluna_datas(datas):
+    """
+    Datas em texto -> datetime pelo caminho rápido do carregamento
+    (converter_datas: formato detectado, só valores distintos), registrando
+    no log os valores que não puderam ser convertidos.
+    """
+    datas, falhas = converter_datas(datas)
+    if len(falhas):
+        exemplos = ", ".join(repr(v) for v in pd.unique(falhas.to_numpy())[:3])
+        logger.warning("⚠️ %d linhas com data não reconhecida na coluna %s (ex.: %s)",
+                       len(falhas), datas.name, exemplos)
+    return datas
+
+
+def agregar_diario(datas, valores):
+    """
+    Soma os valores por dia (o menor grão da análise), ignorando datas inválidas.
+    Retorna (série diária, nº de linhas com data inválida).
+    """
+    # Garantir que a coluna de data seja datetime (sem alterar o DataFrame recebido)
+    datas = converter_coluna_datas(datas)
+
+    validas = datas.notna()
+    invalidas = len(datas) - int(validas.sum())
+    if invalidas:
+        datas = datas[validas]
+        valores = valores[validas]
+
+    diario = valores.groupby(datas.dt.normalize().to_numpy()).sum()
+    return diario, invalidas
+
+
+def estatisticas_crescimento(tabela, coluna_data):
+    """
+    Estatísticas do crescimento de um período (ignorando o NaN do primeiro):
+    média, mínimo, máximo e os períodos do melhor e do pior crescimento.
+    Sem crescimento válido (um período só), os valores são None.
+    """
+    crescimento = tabela['crescimento_%'].dropna()
+    if crescimento.empty:
+        return {'medio': None, 'minimo': None, 'maximo': None,
+                'melhor_periodo': None, 'pior_periodo': None}
+    return {
+        'medio': float(crescimento.mean()),
+        'minimo': float(crescimento.min()),
+        'maximo': float(crescimento.max()),
+        'melhor_periodo': tabela.at[crescimento.idxmax(), coluna_data],
+        'pior_periodo': tabela.at[crescimento.idxmin(), coluna_data],
     }
 
-    # Agrupar por período com a nova sintaxe
-    if periodo.upper() == 'M':
-        freq = freq_map['M']
-        vendas_periodo = dados_limpos.resample(freq, on=coluna_data)[coluna_valor].sum().reset_index()
-        vendas_periodo.columns = [coluna_data, 'total_vendas']
-        periodo_nome = 'Mensal'
-    elif periodo.upper() == 'T':
-        freq = freq_map['T']
-        vendas_periodo = dados_limpos.resample(freq, on=coluna_data)[coluna_valor].sum().reset_index()
-        vendas_periodo.columns = [coluna_data, 'total_vendas']
-        periodo_nome = 'Trimestral'
-    elif periodo.upper() == 'A':
-        freq = freq_map['A']
-        vendas_periodo = dados_limpos.resample(freq, on=coluna_data)[coluna_valor].sum().reset_index()
+
+def crescimento_do_diario(diario, coluna_data, coluna_valor, periodos, linhas_invalidas=0):
+    """
+    Monta os resultados de crescimento a partir do agregado diário, consolidando
+    cada período a partir do seu período de origem (dia -> mês -> trimestre -> ano).
+    Não imprime nem formata nada: as datas da tabela continuam datetime.
+    """
+    diario.index.name = coluna_data
+    agregados = {}
+
+    def agregar(codigo):
+        # Consolida o período a partir do seu período de origem (já agregado)
+        if codigo not in agregados:
+            freq, _, origem = PERIODOS[codigo]
+            base = diario if origem == 'D' else agregar(origem)
+            agregados[codigo] = base.resample(freq).sum()
+        return agregados[codigo]
+
+    resultados = {}
+    for periodo in periodos:
+        vendas_periodo = agregar(periodo).reset_index()
         vendas_periodo.columns = [coluna_data, 'total_vendas']
-        periodo_nome = 'Anual'
+
+        # Calcular crescimento
+        vendas_periodo['crescimento_%'] = (vendas_periodo['total_vendas'].pct_change() * 100).round(2)
+
+        resultados[periodo] = {
+            'periodo': periodo,
+            'nome': PERIODOS[periodo][1],
+            'coluna_data': coluna_data,
+            'coluna_valor': coluna_valor,
+            'tabela': vendas_periodo,
+            'estatisticas': estatisticas_crescimento(vendas_periodo, coluna_data),
+            'linhas_invalidas': linhas_invalidas,
+        }
+
+    return resultados
+
+
+def crescimento_periodos(dados, coluna_data=None, coluna_valor=None, periodos=('M', 'T', 'A'),
+                         datas_por_id=None):
+    """
+    Calcula o crescimento de vários períodos de uma vez, sem imprimir nada.
+    Os dados são agregados uma única vez por dia e os períodos maiores são
+    consolidados a partir do agregado menor (dia -> mês -> trimestre -> ano),
+    sem reprocessar as linhas originais.
+    datas_por_id: datas da dim_tempo (ver carregar_datas_dim_tempo), usadas
+    quando a fato só tem DATE_ID.
+    Retorna {periodo: resultado}; cada resultado é um dicionário com a tabela
+    ('tabela'), as estatísticas ('estatisticas') e as colunas usadas.
+    """
+    periodos = validar_periodos(periodos)
+
+    # Se as colunas não foram especificadas, tentar identificar automaticamente
+    coluna_data, coluna_valor = identificar_colunas(dados, coluna_data, coluna_valor)
+
+    # Coluna de data numérica (DATE_ID, por exemplo): outra coluna de data, dim_tempo ou sequência
+    coluna_data, modo = escolher_datas(dados, coluna_data, datas_por_id)
+    if modo == 'dim_tempo':
+        datas = datas_da_dim_tempo(dados[coluna_data], datas_por_id)
+        coluna_data = 'DATA'
+    elif modo == 'sequencial':
+        coluna_data = 'DATA_ANALISE'
+        datas = pd.Series(pd.date_range(start='2003-01-01', periods=len(dados), freq='D'),
+                          index=dados.index, name=coluna_data)
     else:
-        raise ValueError("Período deve ser 'M' (mensal), 'T' (trimestral) ou 'A' (anual)")
+        datas = dados[coluna_data]
 
-    # Calcular crescimento
-    vendas_periodo['crescimento_%'] = vendas_periodo['total_vendas'].pct_change() * 100
-    vendas_periodo['crescimento_%'] = vendas_periodo['crescimento_%'].round(2)
+    # Agregar uma única vez no menor grão (dia); os períodos maiores saem deste agregado
+    diario, invalidas = agregar_diario(datas, dados[coluna_valor])
+    if invalidas:
+        logger.warning("⚠️ %d linhas com data inválida foram removidas", invalidas)
 
-    # Formatar data para exibição
-    vendas_periodo[coluna_data] = vendas_periodo[coluna_data].dt.strftime('%Y-%m-%d')
+    return crescimento_do_diario(diario, coluna_data, coluna_valor, periodos, invalidas)
 
-    print(f"\n📊 Análise de Crescimento {periodo_nome}")
-    print("-" * 60)
-    print(vendas_periodo.to_string(index=False))
 
-    # Estatísticas (ignorando NaN do primeiro período)
-    crescimento_valido = vendas_periodo['crescimento_%'].dropna()
-    if len(crescimento_valido) > 0:
-        crescimento_medio = crescimento_valido.mean()
-        crescimento_min = crescimento_valido.min()
-        crescimento_max = crescimento_valido.max()
+def agregar_particao(caminho, coluna_data, coluna_valor, datas_por_id=None):
+    """Lê uma partição (só as duas colunas) e devolve seus totais diários"""
+    df = ler_particao(caminho, [coluna_data, coluna_valor])
+    datas = df[coluna_data] if datas_por_id is None else datas_da_dim_tempo(df[coluna_data], datas_por_id)
+    return agregar_diario(datas, df[coluna_valor])
 
-        print(f"\n📈 Crescimento médio: {crescimento_medio:.2f}%")
-        print(f"📉 Menor crescimento: {crescimento_min:.2f}%")
-        print(f"📊 Maior crescimento: {crescimento_max:.2f}%")
 
-        # Períodos com melhor e pior desempenho
-        melhor_periodo = vendas_periodo.loc[crescimento_valido.idxmax(), coluna_data]
-        pior_periodo = vendas_periodo.loc[crescimento_valido.idxmin(), coluna_data]
+def crescimento_particionado(origem, coluna_data=None, coluna_valor=None,
+                             periodos=('M', 'T', 'A'), processos=None):
+    """
+    Calcula o crescimento de um dataset dividido em vários arquivos
+    (pasta, padrão glob ou lista de caminhos), sem imprimir nada.
+    Cada partição é lida em paralelo (pool de processos) e reduzida a totais
+    diários; os totais são somados e consolidados nos períodos pedidos.
+    O resultado é o mesmo de crescimento_periodos sobre o arquivo único (com a
+    dim_tempo ao lado da fato, quando a fato só tem DATE_ID).
+    """
+    periodos = validar_periodos(periodos)
+    arquivos = listar_particoes(origem)
+    if not arquivos:
+        raise ValueError(f"Nenhuma partição encontrada em: {origem}")
+    if len(arquivos) > 1:
+        logger.info("🧩 Dataset particionado: %d arquivo(s)", len(arquivos))
+
+    # Colunas identificadas por uma amostra da primeira partição
+    amostra = ler_particao(arquivos[0], nrows=1000)
+    coluna_data, coluna_valor = identificar_colunas(amostra, coluna_data, coluna_valor)
+    datas_por_id = None
+    if pd.api.types.is_numeric_dtype(amostra[coluna_data]) and not colunas_data_reais(amostra):
+        datas_por_id = carregar_datas_dim_tempo(arquivos[0])
+        if datas_por_id is None or coluna_data != datas_por_id.index.name:
+            # Sem data real: as datas sequenciais dependem da ordem global das linhas
+            dados = pd.concat([ler_particao(c, [coluna_data, coluna_valor]) for c in arquivos], ignore_index=True)
+            return crescimento_periodos(dados, coluna_data, coluna_valor, periodos)
+    coluna_data, modo = escolher_datas(amostra, coluna_data, datas_por_id)
+
+    n_processos = min(processos or os.cpu_count() or 1, len(arquivos))
+    if n_processos > 1:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            parciais = list(executor.map(agregar_particao, arquivos, repeat(coluna_data),
+                                         repeat(coluna_valor), repeat(datas_por_id)))
+    else:
+        parciais = [agregar_particao(c, coluna_data, coluna_valor, datas_por_id) for c in arquivos]
+    if modo == 'dim_tempo':
+        coluna_data = 'DATA'
 
-        print(f"🏆 Melhor período: {melhor_periodo} ({crescimento_max:.2f}%)")
-        print(f"📉 Pior período: {pior_periodo} ({crescimento_min:.2f}%)")
+    invalidas = sum(n for _, n in parciais)
+    if invalidas:
+        logger.warning("⚠️ %d linhas com data inválida foram removidas", invalidas)
 
-    return vendas_periodo
+    # Dias presentes em mais de uma partição são somados
+    diario = pd.concat([d for d, _ in parciais]).groupby(level=0).sum()
+    return crescimento_do_diario(diario, coluna_data, coluna_valor, periodos, invalidas)
+
+
+def variacao_percentual(matriz, deslocamento):
+    """
+    Variação % de cada linha contra a linha `deslocamento` posições antes
+    (NaN nas primeiras linhas e quando a base é zero), arredondada a 2 casas.
+    """
+    variacao = np.full(matriz.shape, np.nan)
+    if deslocamento < len(matriz):
+        base, atual = matriz[:-deslocamento], matriz[deslocamento:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variacao[deslocamento:] = np.where(base != 0, (atual / base - 1) * 100, np.nan)
+    return np.round(variacao, 2)
+
+
+def crescimento_por_membro(dados, coluna_membro, coluna_data=None, coluna_valor=None, periodo='M'):
+    """
+    Crescimento de cada membro de uma dimensão (ex.: PRODUCTLINE, COUNTRY,
+    PRODUCTCODE) de uma vez: matrizes período × membro de totais, crescimento
+    sobre o período anterior e YoY (mesmo período do ano anterior).
+    Membros e períodos viram códigos inteiros e os totais saem de um único
+    bincount — sem loop nem resample por membro. Períodos sem venda valem 0
+    (como no resample do total); crescimento sobre base zero fica NaN.
+    Colunas ordenadas pelo total do membro, do maior para o menor.
+    """
+    periodo = validar_periodos([periodo])[0]
+    coluna_data, coluna_valor = identificar_colunas(dados, coluna_data, coluna_valor)
+
+    datas = converter_coluna_datas(dados[coluna_data])
+    valores = pd.to_numeric(dados[coluna_valor], errors='coerce')
+    membros = dados[coluna_membro]
+    validas = (datas.notna() & valores.notna() & membros.notna()).to_numpy()
+
+    # Fim do período de cada dia distinto (a conversão roda só nos valores únicos)
+    freq = PERIODOS[periodo][0]
+    codigos_dia, dias = pd.factorize(datas[validas].dt.normalize())
+    fins = pd.DatetimeIndex(dias) + to_offset(freq) * 0
+    grade = pd.date_range(fins.min(), fins.max(), freq=freq, name=coluna_data) if len(fins) else \
+        pd.DatetimeIndex([], name=coluna_data)
+    codigos_periodo = grade.get_indexer(fins)[codigos_dia]
+
+    if isinstance(membros.dtype, pd.CategoricalDtype):
+        codigos_membro, nomes = membros.cat.codes.to_numpy()[validas], membros.cat.categories
+    else:
+        codigos_membro, nomes = pd.factorize(membros[validas].to_numpy())
+    n_membros = len(nomes)
+
+    # Totais período × membro em uma passada (chave combinada período * n + membro)
+    totais = np.bincount(
+        codigos_periodo * n_membros + codigos_membro,
+        weights=valores.to_numpy()[validas],
+        minlength=len(grade) * n_membros,
+    ).reshape(len(grade), n_membros)
+
+    # Colunas do maior para o menor membro (o mapa de calor mostra os N primeiros)
+    ordem = np.argsort(-totais.sum(axis=0), kind='stable')
+    totais = totais[:, ordem]
+    colunas = pd.Index(np.asarray(nomes)[ordem], name=coluna_membro)
+
+    def quadro(matriz):
+        return pd.DataFrame(matriz, index=grade, columns=colunas)
+
+    return {
+        'periodo': periodo,
+        'nome': PERIODOS[periodo][1],
+        'coluna_data': coluna_data,
+        'coluna_valor': coluna_valor,
+        'coluna_membro': coluna_membro,
+        'totais': quadro(totais),
+        'crescimento_%': quadro(variacao_percentual(totais, 1)),
+        'yoy_%': quadro(variacao_percentual(totais, PERIODOS_POR_ANO[periodo])),
+    }
+
+
+def formatar_tabela(resultado):
+    """Tabela de crescimento com as datas em texto (AAAA-MM-DD), para exibir ou exportar"""
+    tabela = resultado['tabela'].copy()
+    coluna_data = resultado['coluna_data']
+    tabela[coluna_data] = tabela[coluna_data].dt.strftime('%Y-%m-%d')
+    return tabela
+
+
+def relatar_crescimento(resultado, nivel=logging.INFO):
+    """
+    Registra a tabela de crescimento e suas estatísticas no log, no nível pedido.
+    Se o nível estiver desligado, nada é formatado.
+    """
+    if not logger.isEnabledFor(nivel):
+        return
+    tabela = formatar_tabela(resultado)
+    logger.log(nivel, "\n📊 Análise de Crescimento %s\n%s\n%s",
+               resultado['nome'], "-" * 60, tabela.to_string(index=False))
+
+    estatisticas = resultado['estatisticas']
+    if estatisticas['medio'] is None:
+        return
+    logger.log(
+        nivel,
+        "\n📈 Crescimento médio: %.2f%%\n📉 Menor crescimento: %.2f%%\n📊 Maior crescimento: %.2f%%"
+        "\n🏆 Melhor período: %s (%.2f%%)\n📉 Pior período: %s (%.2f%%)",
+        estatisticas['medio'], estatisticas['minimo'], estatisticas['maximo'],
+        f"{estatisticas['melhor_periodo']:%Y-%m-%d}", estatisticas['maximo'],
+        f"{estatisticas['pior_periodo']:%Y-%m-%d}", estatisticas['minimo'],
+    )
+
+
+def calcular_crescimento_periodos(dados, coluna_data=None, coluna_valor=None, periodos=('M', 'T', 'A'),
+                                  datas_por_id=None):
+    """
+    Calcula o crescimento de vários períodos (ver crescimento_periodos), registra
+    cada tabela no log e retorna {periodo: tabela de crescimento} com datas em texto.
+    """
+    resultados = crescimento_periodos(dados, coluna_data, coluna_valor, periodos, datas_por_id)
+    for resultado in resultados.values():
+        relatar_crescimento(resultado)
+    return {periodo: formatar_tabela(r) for periodo, r in resultados.items()}
+
+
+def calcular_crescimento_particionado(origem, coluna_data=None, coluna_valor=None,
+                                      periodos=('M', 'T', 'A'), processos=None):
+    """
+    Crescimento de um dataset particionado (ver crescimento_particionado), com as
+    tabelas registradas no log; retorna {periodo: tabela} com datas em texto.
+    """
+    resultados = crescimento_particionado(origem, coluna_data, coluna_valor, periodos, processos)
+    for resultado in resultados.values():
+        relatar_crescimento(resultado)
+    return {periodo: formatar_tabela(r) for periodo, r in resultados.items()}
+
+
+def calcular_crescimento(dados, coluna_data=None, coluna_valor=None, periodo='M'):
+    """
+    Calcula o crescimento percentual das vendas entre períodos consecutivos.
+    Suporta Pandas versão 2.0+ com nova sintaxe de frequências.
+    Para uso como biblioteca sem log nem texto, prefira crescimento_periodos.
+    """
+    resultados = calcular_crescimento_periodos(
+        dados, coluna_data=coluna_data, coluna_valor=coluna_valor, periodos=[periodo]
+    )
+    return resultados[periodo.upper()]
 
 
 def analisar_estrutura_dados(df):
@@ -195,21 +564,164 @@ def analisar_estrutura_dados(df):
                 print(f"   • {col} (ex: {amostra})")
 
 
-def main():
+def nome_dataset(origem):
+    """Nome curto de um dataset para os arquivos de saída (arquivo, pasta ou padrão glob)"""
+    if isinstance(origem, (list, tuple)):
+        origem = origem[0] if len(origem) == 1 else os.path.dirname(origem[0]) or 'vendas'
+    nome = os.path.splitext(os.path.basename(os.path.normpath(origem)))[0]
+    nome = nome.replace('*', '').replace('?', '').strip('_-. ')
+    return nome or 'vendas'
+
+
+def salvar_crescimento(tabela, caminho, formato):
+    """Grava uma tabela de crescimento em CSV, Parquet ou JSON"""
+    if formato == 'parquet':
+        tabela.to_parquet(caminho, index=False)
+    elif formato == 'json':
+        tabela.to_json(caminho, orient='records', indent=2, force_ascii=False)
+    else:
+        tabela.to_csv(caminho, index=False)
+    return caminho
+
+
+@contextlib.contextmanager
+def capturar_log(nivel=logging.INFO):
+    """Direciona o log deste módulo para um buffer de texto (o relatório de um dataset)"""
+    buffer = io.StringIO()
+    manipulador = logging.StreamHandler(buffer)
+    manipulador.setFormatter(logging.Formatter('%(message)s'))
+    nivel_anterior, propagar = logger.level, logger.propagate
+    logger.addHandler(manipulador)
+    logger.setLevel(nivel)
+    logger.propagate = False
+    try:
+        yield buffer
+    finally:
+        logger.removeHandler(manipulador)
+        logger.setLevel(nivel_anterior)
+        logger.propagate = propagar
+
+
+def processar_dataset(origem, coluna_data=None, coluna_valor=None, periodos=('M', 'T', 'A'),
+                      formato='csv', saida=None, processos=1, nivel_log=logging.INFO):
+    """
+    Calcula o crescimento de um dataset (arquivo, pasta ou padrão glob) e grava
+    uma tabela por período. Roda num processo do pool do modo em lote: o log é
+    capturado e devolvido como relatório, para não misturar datasets no terminal.
+    """
+    resultado = {'origem': origem, 'arquivos': [], 'erro': None}
+    with capturar_log(nivel_log) as relatorio:
+        try:
+            resultados = crescimento_particionado(
+                origem, coluna_data=coluna_data, coluna_valor=coluna_valor,
+                periodos=periodos, processos=processos,
+            )
+            for item in resultados.values():
+                relatar_crescimento(item)
+            if saida:
+                os.makedirs(saida, exist_ok=True)
+                nome = nome_dataset(origem)
+                for periodo, item in resultados.items():
+                    sufixo = unicodedata.normalize('NFKD', item['nome'].lower())
+                    sufixo = sufixo.encode('ascii', 'ignore').decode()
+                    caminho = os.path.join(saida, f"crescimento_{nome}_{sufixo}.{formato}")
+                    resultado['arquivos'].append(salvar_crescimento(formatar_tabela(item), caminho, formato))
+        except Exception as e:
+            resultado['erro'] = f"{type(e).__name__}: {e}"
+    resultado['relatorio'] = relatorio.getvalue()
+    return resultado
+
+
+def ler_argumentos(argv=None):
+    """Lê as opções de linha de comando do modo em lote"""
+    parser = argparse.ArgumentParser(
+        description="Crescimento de vendas por período. Sem argumentos (em um terminal), abre o menu interativo."
+    )
+    parser.add_argument('entradas', nargs='*',
+                        help="Arquivos, pastas ou padrões glob (cada um é um dataset; pasta/glob = partições). "
+                             "Padrão: o dataset de vendas encontrado em dados_processados/ ou dados/")
+    parser.add_argument('--coluna-data', help="Coluna de data (padrão: identificada automaticamente)")
+    parser.add_argument('--coluna-valor', help="Coluna de valor (padrão: identificada automaticamente)")
+    parser.add_argument('--periodos', nargs='+', default=['M', 'T', 'A'], type=str.upper,
+                        choices=list(PERIODOS), help="Períodos: D S M T A (padrão: M T A)")
+    parser.add_argument('--formato', choices=FORMATOS_SAIDA, default='csv', help="Formato de saída (padrão: csv)")
+    parser.add_argument('--saida', help="Pasta onde gravar as tabelas (sem ela, só exibe no terminal)")
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1,
+                        help="Processos em paralelo: datasets (ou partições, se houver um só) ao mesmo tempo")
+    parser.add_argument('--nivel-log', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO', type=str.upper,
+                        help="Nível do relatório: INFO mostra as tabelas; WARNING, só avisos (padrão: INFO)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="Não exibe as tabelas; só avisos e erros (o mesmo que --nivel-log WARNING)")
+    args = parser.parse_args(argv)
+    if args.quiet and not args.saida:
+        parser.error("--quiet exige --saida (senão nenhum resultado é produzido)")
+    if args.processos < 1:
+        parser.error("--processos deve ser pelo menos 1")
+    if args.quiet:
+        args.nivel_log = 'WARNING'
+    return args
+
+
+def executar_lote(args):
+    """
+    Modo em lote (sem input()): cada entrada é um dataset independente e os
+    datasets são processados em paralelo num pool de processos.
+    Retorna o código de saída (1 se algum dataset falhou).
+    """
+    entradas = args.entradas
+    if not entradas:
+        arquivos = encontrar_arquivos_vendas()
+        if not arquivos:
+            print("❌ Não foi possível encontrar dados de vendas em dados_processados/ ou dados/", file=sys.stderr)
+            return 1
+        entradas = [arquivos]
+
+    opcoes = dict(coluna_data=args.coluna_data, coluna_valor=args.coluna_valor, periodos=args.periodos,
+                  formato=args.formato, saida=args.saida, nivel_log=logging.getLevelName(args.nivel_log))
+
+    if len(entradas) == 1:
+        # Um só dataset: o paralelismo vai para as partições
+        resultados = [processar_dataset(entradas[0], processos=args.processos, **opcoes)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.processos, len(entradas))) as executor:
+            futuros = [executor.submit(processar_dataset, origem, processos=1, **opcoes) for origem in entradas]
+            resultados = [f.result() for f in futuros]
+
+    falhas = 0
+    for resultado in resultados:
+        print(resultado['relatorio'], end='')
+        for caminho in resultado['arquivos']:
+            logger.info("💾 Salvo: %s", caminho)
+        if resultado['erro']:
+            falhas += 1
+            print(f"❌ {resultado['origem']}: {resultado['erro']}", file=sys.stderr)
+
+    if len(resultados) > 1:
+        logger.info("\n✅ %d de %d dataset(s) processados", len(resultados) - falhas, len(resultados))
+    return 1 if falhas else 0
+
+
+def menu_interativo():
     print("🚀 Iniciando análise de crescimento de vendas...")
 
-    # Carregar dados de vendas
-    caminho_vendas = encontrar_arquivo_vendas()
+    # Carregar dados de vendas (um arquivo ou várias partições do mesmo dataset)
+    arquivos = encontrar_arquivos_vendas()
 
-    if not caminho_vendas:
+    if not arquivos:
         print("\n❌ Não foi possível encontrar dados de vendas.")
         print("Por favor, verifique se existe um arquivo de vendas nas pastas:")
         print("  - dados_processados/")
         print("  - dados/")
         return
 
-    print(f"📥 Carregando dados de: {caminho_vendas}")
-    df = pd.read_csv(caminho_vendas)
+    caminho_vendas = arquivos[0]
+    if len(arquivos) > 1:
+        # A estrutura é analisada pela primeira partição; o cálculo usa todas
+        print(f"📥 Analisando estrutura pela partição: {caminho_vendas}")
+        df = ler_particao(caminho_vendas)
+    else:
+        print(f"📥 Carregando dados de: {caminho_vendas}")
+        df = pd.read_csv(caminho_vendas)
 
     # Analisar estrutura dos dados
     analisar_estrutura_dados(df)
@@ -224,6 +736,8 @@ def main():
 
     opcao = input("\nEscolha uma opção (1-5): ").strip()
 
+    col_data = col_valor = None
+    opcoes_periodos = {'1': ['M'], '2': ['T'], '3': ['A'], '4': ['M', 'T', 'A'], '5': ['M', 'T', 'A']}
     if opcao == '5':
         print("\n📝 Configuração customizada:")
         print(f"Colunas disponíveis: {list(df.columns)}")
@@ -231,27 +745,29 @@ def main():
         col_valor = input("Nome da coluna de valor: ").strip()
 
         print("\n" + "=" * 60)
-        calcular_crescimento(df, coluna_data=col_data, coluna_valor=col_valor, periodo='M')
-        print("\n" + "=" * 60)
-        calcular_crescimento(df, coluna_data=col_data, coluna_valor=col_valor, periodo='T')
-        print("\n" + "=" * 60)
-        calcular_crescimento(df, coluna_data=col_data, coluna_valor=col_valor, periodo='A')
-    elif opcao == '4':
-        calcular_crescimento(df, periodo='M')
-        print("\n" + "=" * 60)
-        calcular_crescimento(df, periodo='T')
-        print("\n" + "=" * 60)
-        calcular_crescimento(df, periodo='A')
-    elif opcao == '1':
-        calcular_crescimento(df, periodo='M')
-    elif opcao == '2':
-        calcular_crescimento(df, periodo='T')
-    elif opcao == '3':
-        calcular_crescimento(df, periodo='A')
-    else:
+    elif opcao not in opcoes_periodos:
         print("Opção inválida. Executando análise mensal...")
-        calcular_crescimento(df, periodo='M')
+    periodos = opcoes_periodos.get(opcao, ['M'])
+
+    if len(arquivos) > 1:
+        calcular_crescimento_particionado(arquivos, coluna_data=col_data, coluna_valor=col_valor, periodos=periodos)
+    else:
+        # Mesma resolução de DATE_ID -> DATA do modo em lote (crescimento_particionado)
+        calcular_crescimento_periodos(df, coluna_data=col_data, coluna_valor=col_valor, periodos=periodos,
+                                      datas_por_id=carregar_datas_dim_tempo(caminho_vendas))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Sem argumentos num terminal: menu interativo; com argumentos (ou em cron): lote
+    if not argv and sys.stdin.isatty():
+        logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+        menu_interativo()
+        return 0
+    args = ler_argumentos(argv)
+    logging.basicConfig(level=args.nivel_log, format='%(message)s', stream=sys.stdout)
+    return executar_lote(args)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
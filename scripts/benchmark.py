@@ -0,0 +1,251 @@
+# scripts/benchmark.py
+"""
+⏱️ BENCHMARK DO PIPELINE DE VENDAS
+Gera vendas sintéticas em várias escalas (10⁴ a 10⁸ linhas) e mede tempo e
+pico de memória (RSS) de cada etapa: processador, crescimento, YoY, Pareto
+e carregamento do dashboard. O resultado vai para um JSON, para comparar versões.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Executado como script (python scripts/benchmark.py), só a pasta scripts/ está
+# no path: a raiz entra para importar os módulos como scripts.* (como no app.py)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import scripts.processador_powerbi as processador  # noqa: E402
+from scripts.analise_crescimento import crescimento_periodos  # noqa: E402
+from scripts.esquema_vendas import ler_vendas_csv  # noqa: E402
+from scripts.gerador_vendas import cardinalidades, gerar_csv_vendas  # noqa: E402
+from scripts.metricas_vendas import compute_pareto, compute_yoy  # noqa: E402
+from scripts.modelo_estrela import carregar_modelo_estrela  # noqa: E402
+from scripts.perfil import rss_atual_mb, rss_pico_processo_mb  # noqa: E402
+
+
+ESCALAS_PADRAO = [10_000, 100_000, 1_000_000]
+
+# Acima deste tamanho o processador roda no modo streaming (o lote não caberia na memória)
+LIMITE_LOTE = 2_000_000
+
+# Colunas que o dashboard lê de um upload para as análises medidas
+COLUNAS_ANALISE = ['ORDERDATE', 'SALES', 'PRODUCTLINE', 'CUSTOMERNAME', 'COUNTRY']
+
+# Intervalo entre leituras do RSS durante uma etapa (segundos)
+INTERVALO_RSS = 0.01
+
+PASTA_RESULTADOS = os.path.join(RAIZ, 'resultados_benchmark')
+
+
+@contextlib.contextmanager
+def medir(etapas, nome, linhas=None):
+    """
+    Mede uma etapa: tempo de parede e pico de RSS (amostrado numa thread).
+    A saída impressa pela etapa é descartada, para não poluir o relatório.
+    """
+    inicio_rss = rss_atual_mb()
+    pico = [inicio_rss]
+    parar = threading.Event()
+
+    def amostrar():
+        while not parar.wait(INTERVALO_RSS):
+            pico[0] = max(pico[0], rss_atual_mb())
+
+    amostrador = threading.Thread(target=amostrar, daemon=True)
+    amostrador.start()
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        parar.set()
+        amostrador.join()
+        final_rss = rss_atual_mb()
+        etapas.append({
+            'etapa': nome,
+            'linhas': linhas,
+            'tempo_s': round(duracao, 4),
+            'rss_inicio_mb': round(inicio_rss, 1),
+            'rss_pico_mb': round(max(pico[0], final_rss), 1),
+            'rss_final_mb': round(final_rss, 1),
+        })
+        print(f"   {nome:<32} {duracao:>9.3f} s   pico {max(pico[0], final_rss):>9.1f} MB")
+
+
+def executar_escala(linhas, pasta, semente=42, manter_arquivos=False):
+    """Gera os dados de uma escala e mede todas as etapas (roda num processo próprio)"""
+    print(f"\n📏 {linhas:,} linhas")
+    etapas = []
+    caminho = os.path.join(pasta, f'vendas_{linhas}.csv')
+    saida = os.path.join(pasta, f'saida_{linhas}')
+
+    with medir(etapas, 'gerador.csv', linhas):
+        gerar_csv_vendas(caminho, linhas, semente)
+
+    # 1. Processador Power BI
+    if linhas <= LIMITE_LOTE:
+        modo = 'lote'
+        with medir(etapas, 'processador.carregar', linhas):
+            df = processador.carregar_dados_seguro(caminho)
+        with medir(etapas, 'processador.corrigir_tipos', linhas):
+            df_corrigido = processador.corrigir_tipos_dados(df)
+        del df
+        with medir(etapas, 'processador.modelo_estrela', linhas):
+            fato, produtos, clientes, tempo = processador.criar_modelo_estrela(df_corrigido)
+        with medir(etapas, 'processador.cubo', linhas):
+            cubo = processador.criar_cubo_vendas(df_corrigido, fato['CUSTOMER_ID'])
+        with medir(etapas, 'processador.salvar', linhas):
+            processador.salvar_arquivos(fato, produtos, clientes, tempo, saida, cubo=cubo)
+        del df_corrigido, fato, produtos, clientes, tempo, cubo
+    else:
+        modo = 'streaming'
+        with medir(etapas, 'processador.streaming', linhas):
+            processador.processar_em_blocos(caminho, saida)
+
+    # 2. Carregamento do dashboard (upload, modelo estrela e cubo)
+    with medir(etapas, 'app.ler_upload', linhas):
+        vendas, _ = ler_vendas_csv(caminho, colunas=COLUNAS_ANALISE)
+    with medir(etapas, 'app.modelo_estrela', linhas):
+        carregar_modelo_estrela(saida)
+    with medir(etapas, 'app.cubo', linhas):
+        ler_vendas_csv(os.path.join(saida, 'cubo_vendas.csv'), encoding='utf-8')
+
+    # 3. Análises
+    for periodo in ['M', 'T', 'A']:
+        with medir(etapas, f'crescimento.{periodo}', linhas):
+            crescimento_periodos(vendas, coluna_data='ORDERDATE', coluna_valor='SALES', periodos=[periodo])
+    with medir(etapas, 'compute_yoy', linhas):
+        compute_yoy(vendas, 'ORDERDATE', 'SALES')
+    for dimensao in ['PRODUCTLINE', 'CUSTOMERNAME']:
+        with medir(etapas, f'compute_pareto.{dimensao}', linhas):
+            compute_pareto(vendas, dimensao, 'SALES')
+
+    if not manter_arquivos:
+        os.remove(caminho)
+        shutil.rmtree(saida, ignore_errors=True)
+
+    return {
+        'linhas': linhas,
+        'modo_processador': modo,
+        'cardinalidades': cardinalidades(linhas),
+        'rss_pico_processo_mb': round(rss_pico_processo_mb(), 1),
+        'etapas': etapas,
+    }
+
+
+def versao_codigo():
+    """Commit atual do repositório (quando houver git)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ambiente():
+    """Versões e máquina, para comparar resultados entre execuções"""
+    try:
+        import pyarrow
+        versao_pyarrow = pyarrow.__version__
+    except ImportError:
+        versao_pyarrow = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': versao_codigo(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': versao_pyarrow,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def comparar(atual, anterior):
+    """Mostra a variação de tempo de cada etapa em relação a um benchmark anterior"""
+    tempos = {
+        (escala['linhas'], e['etapa']): e['tempo_s']
+        for escala in anterior['escalas'] for e in escala['etapas']
+    }
+    print(f"\n🔍 Comparação com {anterior['ambiente'].get('commit') or anterior['ambiente']['data']}:")
+    for escala in atual['escalas']:
+        for etapa in escala['etapas']:
+            antes = tempos.get((escala['linhas'], etapa['etapa']))
+            if antes:
+                variacao = (etapa['tempo_s'] / antes - 1) * 100
+                alerta = " ⚠️" if variacao > 20 else ""
+                print(f"   {escala['linhas']:>12,}  {etapa['etapa']:<32} {variacao:+7.1f}%{alerta}")
+
+
+def ler_argumentos():
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de vendas com dados sintéticos")
+    parser.add_argument('--linhas', type=int, nargs='+', default=ESCALAS_PADRAO,
+                        help="Escalas a medir (padrão: 10000 100000 1000000; até 10⁸)")
+    parser.add_argument('--saida', help="JSON de resultado (padrão: resultados_benchmark/benchmark_<data>.json)")
+    parser.add_argument('--pasta-trabalho', help="Pasta para os CSVs gerados (padrão: pasta temporária)")
+    parser.add_argument('--semente', type=int, default=42, help="Semente do gerador (padrão: 42)")
+    parser.add_argument('--manter-arquivos', action='store_true', help="Não apaga os CSVs e saídas gerados")
+    parser.add_argument('--comparar', help="JSON de um benchmark anterior para comparar os tempos")
+    return parser.parse_args()
+
+
+def main():
+    args = ler_argumentos()
+
+    print("=" * 70)
+    print("⏱️ BENCHMARK DO PIPELINE DE VENDAS")
+    print("=" * 70)
+
+    pasta = args.pasta_trabalho or tempfile.mkdtemp(prefix='benchmark_vendas_')
+    os.makedirs(pasta, exist_ok=True)
+
+    # Um processo novo por escala: o pico de memória de uma não contamina a outra
+    contexto = multiprocessing.get_context('spawn')
+    escalas = []
+    try:
+        for linhas in args.linhas:
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                escalas.append(executor.submit(
+                    executar_escala, linhas, pasta, args.semente, args.manter_arquivos
+                ).result())
+    finally:
+        if not args.pasta_trabalho and not args.manter_arquivos:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    resultado = {'ambiente': ambiente(), 'escalas': escalas}
+
+    caminho = args.saida or os.path.join(
+        PASTA_RESULTADOS, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultado salvo em: {caminho}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
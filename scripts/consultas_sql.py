@@ -0,0 +1,253 @@
+# scripts/consultas_sql.py
+"""
+🦆 CONSULTAS SQL NO MODELO ESTRELA
+Backend opcional do dashboard (DuckDB: embutido, sem servidor). As agregações
+rodam direto sobre os arquivos da fato e das dimensões, com os filtros aplicados
+na consulta, e só os resultados pequenos voltam para o pandas — no mesmo
+formato das funções de metricas_vendas e analise_crescimento
+"""
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from scripts.analise_crescimento import crescimento_do_diario, crescimento_por_membro, validar_periodos
+from scripts.metricas_vendas import completar_pareto, yoy_de_totais
+
+try:
+    import duckdb
+    DUCKDB_DISPONIVEL = True
+except ImportError:
+    duckdb = None
+    DUCKDB_DISPONIVEL = False
+
+
+# Dimensões do modelo estrela: nome -> chave na fato
+DIMENSOES = {
+    'dim_tempo': 'DATE_ID',
+    'dim_produtos': 'PRODUCT_ID',
+    'dim_clientes': 'CUSTOMER_ID',
+}
+
+# Coluna de data das consultas (vem de dim_tempo)
+COLUNA_DATA = 'DATA'
+
+
+def texto_sql(valor):
+    """Literal de texto SQL (aspas simples escapadas)"""
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def identificador_sql(nome):
+    """Identificador SQL entre aspas duplas"""
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+def arquivos_modelo(pasta):
+    """Arquivos de onde cada tabela do modelo é lida: Parquet quando existir, senão CSV"""
+    arquivos = {}
+    for nome in ['fato_vendas', *DIMENSOES]:
+        if nome == 'fato_vendas':
+            partes = sorted(glob.glob(os.path.join(pasta, 'parquet', 'fato_vendas', '*.parquet')))
+        else:
+            partes = glob.glob(os.path.join(pasta, 'parquet', f'{nome}.parquet'))
+        arquivos[nome] = partes or [os.path.join(pasta, f'{nome}.csv')]
+    return arquivos
+
+
+def impressao_modelo(pasta):
+    """Impressão digital dos arquivos do modelo (caminho, tamanho e data): muda a cada reprocessamento"""
+    assinatura = hashlib.sha1()
+    for partes in arquivos_modelo(pasta).values():
+        for caminho in partes:
+            info = os.stat(caminho)
+            assinatura.update(f"{caminho}|{info.st_size}|{info.st_mtime_ns}".encode())
+    return assinatura.hexdigest()
+
+
+def conectar(pasta='dados_processados'):
+    """
+    Abre um banco DuckDB em memória com uma view por tabela do modelo, lendo
+    os arquivos no momento de cada consulta (nada é carregado na conexão).
+    Retorna um dicionário com a conexão e as colunas de cada tabela.
+    """
+    if not DUCKDB_DISPONIVEL:
+        raise ImportError("Instale o duckdb para usar o backend SQL (pip install duckdb)")
+
+    conexao = duckdb.connect(database=':memory:')
+    colunas = {}
+    for nome, partes in arquivos_modelo(pasta).items():
+        lista = '[' + ', '.join(texto_sql(c) for c in partes) + ']'
+        if partes[0].endswith('.parquet'):
+            origem = f"read_parquet({lista})"
+        else:
+            origem = f"read_csv_auto({lista}, header=true)"
+        conexao.execute(f"CREATE VIEW {nome} AS SELECT * FROM {origem}")
+        colunas[nome] = [linha[0] for linha in conexao.execute(f"DESCRIBE {nome}").fetchall()]
+
+    return {'pasta': pasta, 'conexao': conexao, 'colunas': colunas}
+
+
+def tabela_da_coluna(banco, coluna):
+    """Tabela do modelo que contém a coluna (a fato tem prioridade)"""
+    for nome in ['fato_vendas', *DIMENSOES]:
+        if coluna in banco['colunas'][nome]:
+            return nome
+    raise ValueError(f"Coluna desconhecida no modelo estrela: {coluna}")
+
+
+def relacao(banco, colunas):
+    """Cláusula FROM com a fato e só as dimensões que têm alguma das colunas pedidas"""
+    dimensoes = {tabela_da_coluna(banco, c) for c in colunas} - {'fato_vendas'}
+    juncoes = [
+        f"LEFT JOIN {nome} USING ({DIMENSOES[nome]})"
+        for nome in DIMENSOES if nome in dimensoes
+    ]
+    return ' '.join(['FROM fato_vendas', *juncoes])
+
+
+def montar_filtro(filtros):
+    """
+    Cláusula WHERE e parâmetros a partir de {coluna: valores}:
+    uma tupla (início, fim) filtra um intervalo de datas (inclusivo);
+    uma lista filtra os membros da coluna.
+    """
+    condicoes, parametros = [], []
+    for coluna, valores in (filtros or {}).items():
+        nome = identificador_sql(coluna)
+        if isinstance(valores, tuple):
+            inicio, fim = valores
+            condicoes.append(f"CAST({nome} AS DATE) BETWEEN ? AND ?")
+            parametros += [pd.Timestamp(inicio).date(), pd.Timestamp(fim).date()]
+        else:
+            valores = list(valores)
+            if not valores:
+                condicoes.append("FALSE")
+                continue
+            condicoes.append(f"CAST({nome} AS VARCHAR) IN ({', '.join('?' * len(valores))})")
+            parametros += [str(v) for v in valores]
+    return (' WHERE ' + ' AND '.join(condicoes) if condicoes else ''), parametros
+
+
+def consultar(banco, selecao, colunas, filtros=None, condicoes=(), sufixo=''):
+    """
+    Executa SELECT <selecao> sobre a fato + dimensões necessárias, com os filtros
+    empurrados para a consulta. Usa um cursor próprio (seguro entre sessões/threads).
+    """
+    colunas = set(colunas) | set(filtros or {})
+    where, parametros = montar_filtro(filtros)
+    if condicoes:
+        where += (' AND ' if where else ' WHERE ') + ' AND '.join(condicoes)
+    sql = f"SELECT {selecao} {relacao(banco, colunas)}{where} {sufixo}"
+    return banco['conexao'].cursor().execute(sql, parametros).df()
+
+
+def esquema(banco):
+    """DataFrame vazio com as colunas (e tipos) da fato + dimensões, sem ler linhas"""
+    colunas = [c for nome in ['fato_vendas', *DIMENSOES] for c in banco['colunas'][nome]]
+    unicas = list(dict.fromkeys(colunas))
+    return consultar(banco, ', '.join(identificador_sql(c) for c in unicas), unicas, sufixo='LIMIT 0')
+
+
+def consultar_registros(banco, filtros=None):
+    """Quantidade de transações (após os filtros)"""
+    return int(consultar(banco, 'COUNT(*) AS n', [], filtros).iloc[0, 0])
+
+
+def consultar_intervalo_datas(banco):
+    """Primeira e última data com vendas (None se não houver)"""
+    data = identificador_sql(COLUNA_DATA)
+    inicio, fim = consultar(banco, f"MIN({data}), MAX({data})", [COLUNA_DATA]).iloc[0]
+    if pd.isna(inicio):
+        return None
+    return pd.Timestamp(inicio), pd.Timestamp(fim)
+
+
+def consultar_membros(banco, coluna):
+    """Membros distintos (não nulos) de uma coluna, em ordem — opções dos filtros"""
+    nome = identificador_sql(coluna)
+    membros = consultar(banco, f"DISTINCT {nome}", [coluna], condicoes=[f"{nome} IS NOT NULL"], sufixo='ORDER BY 1')
+    return membros.iloc[:, 0].tolist()
+
+
+def totais_diarios(banco, coluna_valor, filtros=None):
+    """Soma do valor por dia (a agregação pesada roda no DuckDB)"""
+    valor, data = identificador_sql(coluna_valor), identificador_sql(COLUNA_DATA)
+    diario = consultar(
+        banco, f"CAST({data} AS DATE) AS dia, SUM({valor}) AS total",
+        [COLUNA_DATA, coluna_valor], filtros,
+        condicoes=[f"{data} IS NOT NULL", f"{valor} IS NOT NULL"],
+        sufixo='GROUP BY 1 ORDER BY 1',
+    )
+    return pd.Series(diario['total'].to_numpy(), index=pd.DatetimeIndex(diario['dia'], name=COLUNA_DATA))
+
+
+def consultar_crescimento(banco, coluna_valor, periodos=('M', 'T', 'A'), filtros=None):
+    """Crescimento por período (mesmo resultado de crescimento_periodos), a partir dos totais diários"""
+    periodos = validar_periodos(periodos)
+    diario = totais_diarios(banco, coluna_valor, filtros)
+    return crescimento_do_diario(diario, COLUNA_DATA, coluna_valor, periodos)
+
+
+def consultar_crescimento_por_membro(banco, dim_col, coluna_valor, periodo='M', filtros=None):
+    """
+    Matrizes período × membro (mesmo resultado de crescimento_por_membro):
+    o DuckDB soma por dia e membro; as matrizes saem desse resultado pequeno.
+    """
+    dim, valor, data = identificador_sql(dim_col), identificador_sql(coluna_valor), identificador_sql(COLUNA_DATA)
+    diario = consultar(
+        banco, f"CAST({data} AS DATE) AS {data}, {dim}, SUM({valor}) AS {valor}",
+        [COLUNA_DATA, dim_col, coluna_valor], filtros,
+        condicoes=[f"{data} IS NOT NULL", f"{dim} IS NOT NULL", f"{valor} IS NOT NULL"],
+        sufixo='GROUP BY 1, 2',
+    )
+    diario[COLUNA_DATA] = pd.to_datetime(diario[COLUNA_DATA])
+    return crescimento_por_membro(diario, dim_col, COLUNA_DATA, coluna_valor, periodo)
+
+
+def consultar_compras_clientes(banco, coluna_valor, filtros=None):
+    """
+    Vendas por cliente, pedido e dia (entrada de estado_de_vendas): o DuckDB
+    soma as linhas de cada pedido e só os pedidos voltam para o pandas
+    """
+    chaves = ['CUSTOMER_ID'] + (['ORDERNUMBER'] if 'ORDERNUMBER' in banco['colunas']['fato_vendas'] else [])
+    valor, data = identificador_sql(coluna_valor), identificador_sql(COLUNA_DATA)
+    compras = consultar(
+        banco, f"{', '.join(chaves)}, CAST({data} AS DATE) AS {data}, SUM({valor}) AS {valor}",
+        [*chaves, COLUNA_DATA, coluna_valor], filtros,
+        condicoes=['CUSTOMER_ID IS NOT NULL', f"{data} IS NOT NULL"],
+        sufixo=f'GROUP BY {", ".join(str(i) for i in range(1, len(chaves) + 2))}',
+    )
+    compras[COLUNA_DATA] = pd.to_datetime(compras[COLUNA_DATA])
+    return compras
+
+
+def consultar_yoy(banco, coluna_valor, freq='ME', filtros=None):
+    """YoY (mesmo formato de compute_yoy), a partir dos totais diários"""
+    return yoy_de_totais(totais_diarios(banco, coluna_valor, filtros), freq)
+
+
+def consultar_pareto(banco, dim_col, coluna_valor, filtros=None):
+    """Pareto (mesmo formato de compute_pareto): total por membro, do maior para o menor"""
+    dim, valor = identificador_sql(dim_col), identificador_sql(coluna_valor)
+    pareto = consultar(
+        banco, f"{dim}, SUM({valor}) AS total", [dim_col, coluna_valor], filtros,
+        condicoes=[f"{dim} IS NOT NULL"],
+        sufixo=f'GROUP BY 1 HAVING SUM({valor}) IS NOT NULL ORDER BY total DESC',
+    )
+    return completar_pareto(pareto)
+
+
+def consultar_kpis(banco, coluna_valor, filtros=None):
+    """KPIs executivos (mesmo formato de compute_kpis): receita total e mês de pico"""
+    valor, data = identificador_sql(coluna_valor), identificador_sql(COLUNA_DATA)
+    por_mes = consultar(
+        banco, f"month({data}) AS mes, SUM({valor}) AS total", [COLUNA_DATA, coluna_valor], filtros,
+        condicoes=[f"{data} IS NOT NULL", f"{valor} IS NOT NULL"],
+        sufixo='GROUP BY 1 ORDER BY total DESC, mes',
+    )
+    return {
+        'receita_total': float(por_mes['total'].sum()),
+        'mes_pico': int(por_mes['mes'].iloc[0]) if len(por_mes) else None,
+    }
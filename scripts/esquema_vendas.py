@@ -0,0 +1,205 @@
+# scripts/esquema_vendas.py
+"""
+📐 ESQUEMA DOS DADOS DE VENDAS
+Tipos compactos por coluna para carregar vendas usando menos memória
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# Texto de baixa cardinalidade -> category (já na leitura do CSV)
+COLUNAS_CATEGORICAS = [
+    'STATUS', 'PRODUCTLINE', 'PRODUCTCODE', 'CUSTOMERNAME', 'CITY', 'STATE',
+    'COUNTRY', 'TERRITORY', 'DEALSIZE', 'MES_NOME', 'DIA_SEMANA',
+]
+
+# Colunas de data -> datetime64
+COLUNAS_DATA = ['ORDERDATE', 'DATA', 'DATA_MES']
+
+# Texto fora do esquema vira category quando tem até esta fração de valores distintos
+LIMITE_CARDINALIDADE = 0.5
+
+# Formatos de data testados (na ordem) numa amostra dos valores distintos
+FORMATOS_DATA = [
+    '%m/%d/%Y %H:%M',     # 2/24/2003 0:00 (sales_data_sample.csv)
+    '%m/%d/%Y',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+]
+
+# Valores distintos usados para detectar o formato das datas
+AMOSTRA_FORMATO_DATA = 500
+
+# Linhas por bloco na leitura com progresso
+TAMANHO_BLOCO_LEITURA = 100_000
+
+
+def uso_memoria(df):
+    """Memória ocupada pelo DataFrame, em bytes"""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def memoria_sem_esquema(df, amostra=10_000):
+    """
+    Estima a memória do mesmo DataFrame lido com pd.read_csv puro:
+    números em 64 bits e texto no tipo padrão de string do pandas instalado
+    (medido em uma amostra das linhas e extrapolado).
+    """
+    total = 0
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            parte = pd.Series(serie.iloc[:amostra].tolist())
+            if len(parte):
+                total += int(parte.memory_usage(index=False, deep=True) * len(serie) / len(parte))
+        elif pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+            total += 8 * len(serie)
+        else:
+            total += int(serie.memory_usage(index=False, deep=True))
+    return total
+
+
+def detectar_formato_data(valores, amostra=AMOSTRA_FORMATO_DATA):
+    """
+    Formato de FORMATOS_DATA que converte mais valores da amostra (no empate,
+    vale a ordem da lista); None se nenhum converter nada.
+    """
+    amostra = pd.Index(valores[:amostra]).dropna()
+    melhor, convertidos_melhor = None, 0
+    for formato in FORMATOS_DATA:
+        convertidos = int(pd.to_datetime(amostra, format=formato, errors='coerce').notna().sum())
+        if convertidos > convertidos_melhor:
+            melhor, convertidos_melhor = formato, convertidos
+            if convertidos == len(amostra):
+                break
+    return melhor
+
+
+def converter_datas(serie, formato=None):
+    """
+    Converte texto em datetime64 analisando só os valores distintos: pedidos
+    repetem muito as datas, então cada data é convertida uma vez e o resultado
+    é espalhado de volta pelas linhas. O formato é detectado numa amostra
+    (inferência elemento a elemento só quando nenhum formato conhecido serve).
+    Retorna (datas, valores originais que não puderam ser convertidos).
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, serie.iloc[:0]
+
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    if formato is None:
+        formato = detectar_formato_data(unicos)
+    if formato is not None:
+        convertidos = pd.to_datetime(unicos, format=formato, errors='coerce')
+    else:
+        convertidos = pd.to_datetime(unicos, errors='coerce')
+
+    datas = pd.Series(
+        convertidos.take(codigos, allow_fill=True, fill_value=pd.NaT),
+        index=serie.index, name=serie.name,
+    )
+    # Código -1 = valor ausente na origem (não conta como falha de conversão)
+    falhas = serie[(codigos >= 0) & datas.isna().to_numpy()]
+    return datas, falhas
+
+
+def compactar_tipos(df):
+    """
+    Converte para os tipos compactos do esquema, sem perder informação:
+    - texto de baixa cardinalidade -> category
+    - colunas de data -> datetime64
+    - inteiros -> int32 quando cabem
+    - decimais -> float32 apenas quando a conversão é exata
+    Retorna um novo DataFrame (o original não é alterado).
+    """
+    conversoes = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if col in COLUNAS_DATA:
+            if not pd.api.types.is_datetime64_any_dtype(serie):
+                conversoes[col], _ = converter_datas(serie)
+        elif pd.api.types.is_integer_dtype(serie) and serie.dtype.itemsize > 4:
+            info = np.iinfo('int32')
+            if len(serie) == 0 or (serie.min() >= info.min and serie.max() <= info.max):
+                conversoes[col] = serie.astype('int32')
+        elif pd.api.types.is_float_dtype(serie) and serie.dtype.itemsize > 4:
+            reduzida = serie.astype('float32')
+            if np.array_equal(reduzida.astype('float64').to_numpy(), serie.to_numpy(), equal_nan=True):
+                conversoes[col] = reduzida
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            if col in COLUNAS_CATEGORICAS or serie.nunique() <= LIMITE_CARDINALIDADE * len(serie):
+                conversoes[col] = serie.astype('category')
+
+    return df.assign(**conversoes) if conversoes else df
+
+
+def ler_vendas_csv(origem, colunas=None, encoding='ISO-8859-1', engine=None):
+    """
+    Lê um CSV de vendas já com o esquema compacto.
+    `colunas` limita a leitura (usecols); texto conhecido é lido direto como category.
+    `engine` é repassado ao pd.read_csv (ex.: 'pyarrow', leitura multi-thread).
+    Retorna (DataFrame, relatório de memória).
+    """
+    if colunas is not None:
+        colunas = list(colunas)
+    tipos = {c: 'category' for c in COLUNAS_CATEGORICAS if colunas is None or c in colunas}
+
+    df = pd.read_csv(origem, encoding=encoding, usecols=colunas, dtype=tipos, engine=engine)
+    df = compactar_tipos(df)
+    return df, relatorio_memoria(df)
+
+
+def concatenar_blocos(blocos):
+    """Concatena blocos compactos mantendo category (união das categorias de cada bloco)"""
+    if not blocos:
+        return pd.DataFrame()
+
+    colunas = {}
+    for col in blocos[0].columns:
+        partes = [b[col] for b in blocos]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in partes):
+            colunas[col] = union_categoricals(partes)
+        else:
+            colunas[col] = pd.concat(partes, ignore_index=True)
+    return pd.DataFrame(colunas)
+
+
+def ler_vendas_csv_em_blocos(origem, progresso=None, tamanho_bloco=TAMANHO_BLOCO_LEITURA,
+                             encoding='ISO-8859-1'):
+    """
+    Lê um CSV de vendas em blocos, avisando o progresso (0 a 1) a cada bloco.
+    `origem` é um arquivo binário com seek/tell (ex.: io.BytesIO); o progresso é
+    a fração de bytes já consumida pelo parser.
+    Retorna (DataFrame com o esquema compacto, relatório de memória).
+    """
+    origem.seek(0, 2)
+    tamanho_total = origem.tell() or 1
+    origem.seek(0)
+
+    # Cada bloco é compactado ao ser lido: o texto bruto nunca fica todo em memória
+    blocos = []
+    for bloco in pd.read_csv(origem, encoding=encoding, chunksize=tamanho_bloco):
+        blocos.append(compactar_tipos(bloco))
+        if progresso is not None:
+            progresso(min(origem.tell() / tamanho_total, 1.0))
+
+    df = compactar_tipos(concatenar_blocos(blocos))
+    if progresso is not None:
+        progresso(1.0)
+    return df, relatorio_memoria(df)
+
+
+def relatorio_memoria(df):
+    """Memória (MB) do DataFrame compacto e a estimativa sem o esquema"""
+    antes = memoria_sem_esquema(df)
+    depois = uso_memoria(df)
+    return {
+        'antes_mb': antes / 1024 ** 2,
+        'depois_mb': depois / 1024 ** 2,
+        'reducao_%': (1 - depois / antes) * 100 if antes else 0.0,
+    }
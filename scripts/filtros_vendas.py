@@ -0,0 +1,109 @@
+# scripts/filtros_vendas.py
+"""
+🔎 FILTROS DO DASHBOARD
+Índices montados uma vez por dataset para fatiar as vendas por período e
+categorias sem percorrer todas as colunas a cada filtro: linhas ordenadas
+por data (intervalo por busca binária) e, por membro de cada categoria,
+as posições das suas linhas nessa ordem (intersectadas entre filtros)
+"""
+import numpy as np
+import pandas as pd
+
+
+# Colunas categóricas oferecidas como filtro (quando existirem no dataset)
+COLUNAS_FILTRO = ['COUNTRY', 'PRODUCTLINE', 'DEALSIZE', 'STATUS']
+
+
+def criar_indice(df, coluna_data, colunas=COLUNAS_FILTRO):
+    """
+    Índice de filtros de um dataset:
+    - 'ordem': posição das linhas do df em ordem de data (datas inválidas no fim);
+    - 'datas': datas nessa ordem (para searchsorted);
+    - 'membros': {coluna: {membro: posições na ordem de data, crescentes}}.
+    """
+    datas = pd.to_datetime(df[coluna_data]).to_numpy()
+    ordem = np.argsort(datas, kind='stable')
+    datas_ordenadas = datas[ordem]
+    validas = int((~np.isnat(datas_ordenadas)).sum())
+
+    membros = {}
+    for coluna in colunas:
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Já codificada (compactar_tipos): reaproveita os códigos inteiros
+            codigos, valores = serie.cat.codes.to_numpy()[ordem], serie.cat.categories
+        else:
+            codigos, valores = pd.factorize(serie.to_numpy()[ordem], sort=True)
+        # Agrupar as posições por membro; o sort estável mantém cada grupo em ordem de data
+        agrupadas = np.argsort(codigos, kind='stable')
+        limites = np.cumsum(np.bincount(codigos[codigos >= 0], minlength=len(valores)))
+        inicio = int((codigos < 0).sum())  # nulos (-1) ficam no começo e não são membros
+        grupos = np.split(agrupadas[inicio:], limites[:-1])
+        membros[coluna] = {valor: grupo for valor, grupo in zip(valores, grupos)}
+
+    return {
+        'ordem': ordem,
+        'datas': datas_ordenadas[:validas],
+        'membros': membros,
+        'linhas': len(df),
+    }
+
+
+def intervalo_datas(indice):
+    """Primeira e última data do índice (None se não houver datas válidas)"""
+    if not len(indice['datas']):
+        return None
+    return pd.Timestamp(indice['datas'][0]), pd.Timestamp(indice['datas'][-1])
+
+
+def opcoes_filtro(indice):
+    """Membros de cada coluna de filtro, em ordem"""
+    return {coluna: list(grupos) for coluna, grupos in indice['membros'].items()}
+
+
+def filtrar_posicoes(indice, inicio=None, fim=None, selecao=None):
+    """
+    Posições (no df original) das linhas que passam nos filtros.
+    inicio/fim: datas inclusivas (dias inteiros); selecao: {coluna: membros}.
+    Colunas sem membros selecionados não filtram. Sem nenhum filtro, retorna None.
+    """
+    selecao = {c: m for c, m in (selecao or {}).items() if m}
+    if inicio is None and fim is None and not selecao:
+        return None
+
+    # Intervalo de datas: fatia contínua da ordem por data (busca binária)
+    datas = indice['datas']
+    baixo = 0 if inicio is None else int(np.searchsorted(datas, np.datetime64(pd.Timestamp(inicio).normalize()), 'left'))
+    alto = len(datas) if fim is None else int(np.searchsorted(
+        datas, np.datetime64(pd.Timestamp(fim).normalize() + pd.Timedelta(days=1)), 'left'))
+    if inicio is None and fim is None:
+        alto = indice['linhas']  # sem filtro de data, linhas com data inválida continuam
+    if alto <= baixo:
+        return np.empty(0, dtype=indice['ordem'].dtype)
+
+    if not selecao:
+        return indice['ordem'][baixo:alto]
+
+    # Categorias: membros de uma coluna se somam (OU); colunas se intersectam (E),
+    # contando quantas colunas marcam cada posição do intervalo
+    contagem = np.zeros(alto - baixo, dtype=np.uint8)
+    for coluna, escolhidos in selecao.items():
+        grupos = indice['membros'].get(coluna, {})
+        for membro in escolhidos:
+            posicoes = grupos.get(membro)
+            if posicoes is None:
+                continue
+            trecho = posicoes[np.searchsorted(posicoes, baixo):np.searchsorted(posicoes, alto)]
+            contagem[trecho - baixo] += 1
+    selecionadas = np.flatnonzero(contagem == len(selecao)) + baixo
+    return indice['ordem'][selecionadas]
+
+
+def aplicar_filtros(df, indice, inicio=None, fim=None, selecao=None):
+    """Linhas do df que passam nos filtros (o próprio df, sem cópia, se nada for filtrado)"""
+    posicoes = filtrar_posicoes(indice, inicio, fim, selecao)
+    if posicoes is None:
+        return df
+    return df.take(np.sort(posicoes))
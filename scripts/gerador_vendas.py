@@ -0,0 +1,193 @@
+# scripts/gerador_vendas.py
+"""
+🧪 GERADOR DE VENDAS SINTÉTICAS
+Gera CSVs com as mesmas colunas de sales_data_sample.csv em qualquer escala,
+com cardinalidades realistas de pedidos, produtos, clientes e datas
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Mesma ordem de colunas de sales_data_sample.csv
+COLUNAS_VENDAS = [
+    'ORDERNUMBER', 'QUANTITYORDERED', 'PRICEEACH', 'ORDERLINENUMBER', 'SALES',
+    'ORDERDATE', 'STATUS', 'QTR_ID', 'MONTH_ID', 'YEAR_ID', 'PRODUCTLINE', 'MSRP',
+    'PRODUCTCODE', 'CUSTOMERNAME', 'PHONE', 'ADDRESSLINE1', 'ADDRESSLINE2', 'CITY',
+    'STATE', 'POSTALCODE', 'COUNTRY', 'TERRITORY', 'CONTACTLASTNAME',
+    'CONTACTFIRSTNAME', 'DEALSIZE',
+]
+
+# Proporções observadas na amostra original (2.823 linhas)
+LINHAS_POR_PEDIDO = 9.2
+MAX_LINHAS_PEDIDO = 18
+STATUS = {
+    'Shipped': 0.927, 'Cancelled': 0.021, 'Resolved': 0.017,
+    'On Hold': 0.016, 'In Process': 0.015, 'Disputed': 0.004,
+}
+LINHAS_PRODUTO = {
+    'Classic Cars': 0.343, 'Vintage Cars': 0.215, 'Motorcycles': 0.117, 'Planes': 0.108,
+    'Trucks and Buses': 0.107, 'Ships': 0.083, 'Trains': 0.027,
+}
+# (cidade, estado, país, território)
+LOCAIS = [
+    ('NYC', 'NY', 'USA', None), ('San Francisco', 'CA', 'USA', None),
+    ('Boston', 'MA', 'USA', None), ('Paris', None, 'France', 'EMEA'),
+    ('Nantes', None, 'France', 'EMEA'), ('Madrid', None, 'Spain', 'EMEA'),
+    ('London', None, 'UK', 'EMEA'), ('Oslo', None, 'Norway', 'EMEA'),
+    ('Melbourne', 'Victoria', 'Australia', 'APAC'), ('Helsinki', None, 'Finland', 'EMEA'),
+    ('Salzburg', None, 'Austria', 'EMEA'), ('Torino', None, 'Italy', 'EMEA'),
+    ('Singapore', None, 'Singapore', 'APAC'), ('Tokyo', 'Tokyo', 'Japan', 'Japan'),
+    ('Vancouver', 'BC', 'Canada', None), ('Frankfurt', None, 'Germany', 'EMEA'),
+    ('Makati City', None, 'Philippines', 'Japan'), ('Dublin', None, 'Ireland', 'EMEA'),
+]
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elena', 'Felipe', 'Julie', 'Peter', 'Kwai', 'Maria']
+SOBRENOMES = ['Silva', 'Smith', 'Yu', 'Müller', 'Rossi', 'Dubois', 'Tanaka', 'García', 'Brown', 'Larsson']
+
+# Data da primeira venda gerada
+DATA_INICIAL = '2003-01-06'
+
+# Linhas geradas (e gravadas) por bloco
+TAMANHO_BLOCO_GERACAO = 1_000_000
+
+
+def cardinalidades(linhas):
+    """
+    Quantidade de pedidos, produtos, clientes e dias para uma escala.
+    Produtos e clientes crescem mais devagar que as linhas (como num catálogo
+    real), partindo dos valores da amostra original: 109 produtos, 92 clientes
+    e 252 dias com venda.
+    """
+    return {
+        'pedidos': max(1, int(linhas / LINHAS_POR_PEDIDO)),
+        'produtos': int(min(max(109, linhas // 2_000), 100_000)),
+        'clientes': int(min(max(92, linhas // 500), 1_000_000)),
+        'dias': int(min(max(252, linhas // 10_000), 365 * 30)),
+    }
+
+
+def criar_catalogos(card, rng):
+    """Tabelas de produtos, clientes e datas (uma linha por membro)"""
+    n_produtos, n_clientes, n_dias = card['produtos'], card['clientes'], card['dias']
+
+    msrp = rng.integers(33, 215, n_produtos)
+    produtos = pd.DataFrame({
+        'PRODUCTLINE': rng.choice(list(LINHAS_PRODUTO), n_produtos, p=list(LINHAS_PRODUTO.values())),
+        'MSRP': msrp,
+        'PRODUCTCODE': [f"S{10 + i % 90}_{i:05d}" for i in range(n_produtos)],
+    })
+
+    locais = rng.integers(0, len(LOCAIS), n_clientes)
+    cidade, estado, pais, territorio = (np.array(c, dtype=object) for c in zip(*LOCAIS))
+    clientes = pd.DataFrame({
+        'CUSTOMERNAME': [f"Cliente {i:07d} Ltd." for i in range(n_clientes)],
+        'PHONE': [f"555-{i:07d}" for i in range(n_clientes)],
+        'ADDRESSLINE1': [f"{100 + i % 900} Rua {i}" for i in range(n_clientes)],
+        'ADDRESSLINE2': np.where(rng.random(n_clientes) < 0.1, 'Suite 100', None),
+        'CITY': cidade[locais],
+        'STATE': estado[locais],
+        'POSTALCODE': [f"{10000 + i % 90000}" if i % 4 else f"WX{i % 10} {i % 9}PP" for i in range(n_clientes)],
+        'COUNTRY': pais[locais],
+        'TERRITORY': territorio[locais],
+        'CONTACTLASTNAME': rng.choice(SOBRENOMES, n_clientes),
+        'CONTACTFIRSTNAME': rng.choice(NOMES, n_clientes),
+    })
+
+    # Dias úteis sorteados num período de pelo menos 3 anos (a amostra cobre ~2,5 anos);
+    # texto no formato da amostra (2/24/2003 0:00)
+    dias_uteis = pd.bdate_range(DATA_INICIAL, periods=max(n_dias, 3 * 261))
+    datas = dias_uteis[np.sort(rng.choice(len(dias_uteis), n_dias, replace=False))]
+    texto = [f"{d.month}/{d.day}/{d.year} 0:00" for d in datas]
+    calendario = pd.DataFrame({
+        'ORDERDATE': texto,
+        'QTR_ID': datas.quarter,
+        'MONTH_ID': datas.month,
+        'YEAR_ID': datas.year,
+    })
+    return produtos, clientes, calendario
+
+
+def gerar_blocos_vendas(linhas, semente=42, tamanho_bloco=TAMANHO_BLOCO_GERACAO):
+    """
+    Gera as vendas em blocos de DataFrame (memória limitada mesmo em 10⁸ linhas).
+    Pedidos têm números crescentes e datas em ordem cronológica, como na amostra.
+    """
+    rng = np.random.default_rng(semente)
+    card = cardinalidades(linhas)
+    produtos, clientes, calendario = criar_catalogos(card, rng)
+
+    # Nível de pedido: data, cliente, status e posição da 1ª linha de cada pedido
+    # (1 a MAX_LINHAS_PEDIDO linhas por pedido, como na amostra)
+    tamanhos = rng.integers(1, MAX_LINHAS_PEDIDO + 1, card['pedidos'] + MAX_LINHAS_PEDIDO)
+    while tamanhos.sum() < linhas:
+        tamanhos = np.concatenate([tamanhos, rng.integers(1, MAX_LINHAS_PEDIDO + 1, len(tamanhos))])
+    inicio_pedido = np.concatenate([[0], np.cumsum(tamanhos)])
+    inicio_pedido = inicio_pedido[inicio_pedido < linhas]
+    n_pedidos = len(inicio_pedido)
+    dia_pedido = np.sort(rng.integers(0, card['dias'], n_pedidos))
+    cliente_pedido = rng.integers(0, card['clientes'], n_pedidos)
+    status_pedido = rng.choice(list(STATUS), n_pedidos, p=np.array(list(STATUS.values())) / sum(STATUS.values()))
+
+    for numero, inicio in enumerate(range(0, linhas, tamanho_bloco)):
+        fim = min(inicio + tamanho_bloco, linhas)
+        rng_bloco = np.random.default_rng([semente, numero])
+        posicoes = np.arange(inicio, fim)
+
+        pedido = np.searchsorted(inicio_pedido, posicoes, side='right') - 1
+        produto = rng_bloco.integers(0, card['produtos'], fim - inicio)
+        quantidade = rng_bloco.integers(6, 98, fim - inicio)
+        msrp = produtos['MSRP'].to_numpy()[produto]
+        preco = np.round(msrp * rng_bloco.uniform(0.8, 1.2, fim - inicio), 2)
+        vendas = np.round(quantidade * preco, 2)
+
+        bloco = pd.DataFrame({
+            'ORDERNUMBER': 10100 + pedido,
+            'QUANTITYORDERED': quantidade,
+            'PRICEEACH': preco,
+            'ORDERLINENUMBER': posicoes - inicio_pedido[pedido] + 1,
+            'SALES': vendas,
+            'STATUS': status_pedido[pedido],
+        })
+        for col in ['ORDERDATE', 'QTR_ID', 'MONTH_ID', 'YEAR_ID']:
+            bloco[col] = calendario[col].to_numpy()[dia_pedido[pedido]]
+        for col in produtos.columns:
+            bloco[col] = produtos[col].to_numpy()[produto]
+        for col in clientes.columns:
+            bloco[col] = clientes[col].to_numpy()[cliente_pedido[pedido]]
+        bloco['DEALSIZE'] = np.select([vendas < 3000, vendas < 7000], ['Small', 'Medium'], 'Large')
+
+        yield bloco[COLUNAS_VENDAS]
+
+
+def gerar_vendas(linhas, semente=42):
+    """Gera as vendas sintéticas inteiras em memória (para escalas pequenas)"""
+    return pd.concat(gerar_blocos_vendas(linhas, semente), ignore_index=True)
+
+
+def gerar_csv_vendas(caminho, linhas, semente=42, tamanho_bloco=TAMANHO_BLOCO_GERACAO):
+    """Grava as vendas sintéticas em CSV (latin-1, como o arquivo original), bloco a bloco"""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    for numero, bloco in enumerate(gerar_blocos_vendas(linhas, semente, tamanho_bloco)):
+        bloco.to_csv(caminho, mode='w' if numero == 0 else 'a', header=numero == 0,
+                     index=False, encoding='latin-1')
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera vendas sintéticas no formato de sales_data_sample.csv")
+    parser.add_argument('linhas', type=int, help="Quantidade de linhas")
+    parser.add_argument('--saida', default='dados/vendas_sinteticas.csv', help="CSV de saída")
+    parser.add_argument('--semente', type=int, default=42, help="Semente aleatória (padrão: 42)")
+    args = parser.parse_args()
+
+    print(f"🧪 Gerando {args.linhas:,} linhas sintéticas...")
+    gerar_csv_vendas(args.saida, args.linhas, args.semente)
+    print(f"✅ Arquivo salvo: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
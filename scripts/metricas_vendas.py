@@ -0,0 +1,83 @@
+# scripts/metricas_vendas.py
+"""
+📊 MÉTRICAS DO DASHBOARD
+YoY, Pareto e KPIs usados pelo app.py, sem dependência do Streamlit
+(importáveis por scripts, notebooks, pelo benchmark e pelo backend SQL)
+"""
+import numpy as np
+import pandas as pd
+
+from scripts.esquema_vendas import converter_datas
+
+
+def safe_to_datetime(series: pd.Series) -> pd.Series:
+    """Converte para datetime com coerção segura (formato detectado uma vez, só valores distintos)."""
+    datas, _ = converter_datas(series)
+    return datas
+
+
+def safe_to_numeric(series: pd.Series) -> pd.Series:
+    """Converte para numérico com coerção segura (colunas já tipadas passam direto)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series, errors="coerce")
+
+
+def compute_yoy(df: pd.DataFrame, date_col: str, value_col: str, freq: str = "ME") -> pd.DataFrame:
+    """
+    Calcula YoY (Year-over-Year) com agregação mensal por padrão.
+    Retorna dataframe com colunas: periodo, total, yoy_abs, yoy_pct.
+    """
+    # Trabalha só com as duas colunas (sem copiar nem alterar o DataFrame)
+    datas = safe_to_datetime(df[date_col])
+    valores = safe_to_numeric(df[value_col])
+    validas = datas.notna() & valores.notna()
+    if not validas.all():
+        datas, valores = datas[validas], valores[validas]
+
+    serie = pd.Series(valores.to_numpy(), index=pd.DatetimeIndex(datas, name=date_col), name="total")
+    return yoy_de_totais(serie, freq)
+
+
+def yoy_de_totais(serie: pd.Series, freq: str = "ME") -> pd.DataFrame:
+    """YoY a partir de valores indexados por data (linhas ou totais já agregados por dia)."""
+    # Agregação mensal (month-end). (Evita 'M' deprecation)
+    agg = serie.rename("total").resample(freq).sum().reset_index()
+    agg["yoy_abs"] = agg["total"] - agg["total"].shift(12)
+    agg["yoy_pct"] = (agg["total"] / agg["total"].shift(12) - 1) * 100
+    return agg
+
+
+def compute_pareto(df: pd.DataFrame, dim_col: str, value_col: str) -> pd.DataFrame:
+    """Calcula Pareto (valor por dimensão + % acumulado)."""
+    # Agrupa a coluna de valor pela dimensão (sem copiar nem alterar o DataFrame)
+    valores = safe_to_numeric(df[value_col])
+
+    pareto = (
+        valores.groupby(df[dim_col], observed=True)
+        .sum(min_count=1)
+        .dropna()
+        .sort_values(ascending=False)
+        .reset_index()
+        .rename(columns={value_col: "total"})
+    )
+    return completar_pareto(pareto)
+
+
+def completar_pareto(pareto: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta % do total, % acumulado e posição a totais já ordenados do maior para o menor."""
+    total_all = pareto["total"].sum()
+    pareto["share_pct"] = (pareto["total"] / total_all) * 100 if total_all else 0
+    pareto["cum_share_pct"] = pareto["share_pct"].cumsum()
+    pareto["rank"] = np.arange(1, len(pareto) + 1)
+    return pareto
+
+
+def compute_kpis(df: pd.DataFrame, date_col: str, value_col: str) -> dict:
+    """KPIs executivos: receita total e mês de pico (1-12)."""
+    valores = df[value_col]
+    por_mes = valores.groupby(df[date_col].dt.month).sum()
+    return {
+        "receita_total": float(valores.sum()),
+        "mes_pico": int(por_mes.idxmax()) if len(por_mes) else None,
+    }
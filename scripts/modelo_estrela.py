@@ -0,0 +1,124 @@
+# scripts/modelo_estrela.py
+"""
+⭐ LEITOR DO MODELO ESTRELA
+Carrega fato_vendas e resolve só os atributos de dimensão pedidos,
+por posição (ID -> linha da dimensão), sem merges em texto
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.esquema_vendas import compactar_tipos
+
+
+# Atributo -> (chave na fato, dimensão)
+ATRIBUTOS_DIMENSAO = {
+    'DATA': ('DATE_ID', 'dim_tempo'),
+    'ANO': ('DATE_ID', 'dim_tempo'),
+    'MES': ('DATE_ID', 'dim_tempo'),
+    'TRIMESTRE': ('DATE_ID', 'dim_tempo'),
+    'DIA_SEMANA': ('DATE_ID', 'dim_tempo'),
+    'PRODUCTCODE': ('PRODUCT_ID', 'dim_produtos'),
+    'PRODUCTLINE': ('PRODUCT_ID', 'dim_produtos'),
+    'MSRP': ('PRODUCT_ID', 'dim_produtos'),
+    'CUSTOMERNAME': ('CUSTOMER_ID', 'dim_clientes'),
+    'COUNTRY': ('CUSTOMER_ID', 'dim_clientes'),
+    'CITY': ('CUSTOMER_ID', 'dim_clientes'),
+    'STATE': ('CUSTOMER_ID', 'dim_clientes'),
+    'TERRITORY': ('CUSTOMER_ID', 'dim_clientes'),
+}
+
+# Colunas da fato carregadas por padrão
+COLUNAS_FATO = [
+    'ORDERNUMBER', 'DATE_ID', 'PRODUCT_ID', 'CUSTOMER_ID', 'QUANTITYORDERED',
+    'PRICEEACH', 'SALES', 'STATUS', 'DEALSIZE',
+]
+
+
+def existe_modelo_estrela(pasta):
+    """Indica se a pasta tem a fato e as dimensões geradas pelo processador"""
+    return (
+        os.path.isdir(os.path.join(pasta, 'parquet', 'fato_vendas'))
+        or os.path.exists(os.path.join(pasta, 'fato_vendas.csv'))
+    )
+
+
+def ler_tabela(pasta, nome, colunas=None):
+    """Lê uma tabela do modelo: Parquet quando existir (e houver pyarrow), senão CSV"""
+    caminho_parquet = os.path.join(pasta, 'parquet', nome if nome == 'fato_vendas' else f'{nome}.parquet')
+    if os.path.exists(caminho_parquet):
+        try:
+            return compactar_tipos(pd.read_parquet(caminho_parquet, columns=colunas))
+        except ImportError:
+            pass
+
+    datas = ['DATA'] if nome == 'dim_tempo' and (colunas is None or 'DATA' in colunas) else False
+    df = pd.read_csv(os.path.join(pasta, f'{nome}.csv'), usecols=colunas, parse_dates=datas)
+    return compactar_tipos(df)
+
+
+def criar_busca(dim, coluna_id, atributo):
+    """
+    Vetor de busca posicional: busca[ID] = atributo da dimensão.
+    Categorias são guardadas como códigos inteiros (+ lista de categorias).
+    """
+    ids = dim[coluna_id].to_numpy()
+    tamanho = int(ids.max()) + 1 if len(ids) else 1
+    valores = dim[atributo]
+
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        codigos = np.full(tamanho, -1, dtype='int32')
+        codigos[ids] = valores.cat.codes.to_numpy()
+        return codigos, valores.cat.categories
+
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        busca = np.full(tamanho, np.datetime64('NaT'), dtype=valores.dtype)
+    elif pd.api.types.is_integer_dtype(valores):
+        busca = np.zeros(tamanho, dtype=valores.dtype)
+    elif pd.api.types.is_float_dtype(valores):
+        busca = np.full(tamanho, np.nan, dtype=valores.dtype)
+    else:
+        busca = np.full(tamanho, None, dtype=object)
+    busca[ids] = valores.to_numpy()
+    return busca, None
+
+
+def resolver_atributo(ids_fato, busca, categorias):
+    """Resolve o atributo para cada linha da fato com um take sobre o vetor de busca"""
+    valores = busca.take(ids_fato)
+    if categorias is not None:
+        return pd.Categorical.from_codes(valores, categories=categorias)
+    return valores
+
+
+def carregar_modelo_estrela(pasta='dados_processados', atributos=('DATA', 'PRODUCTLINE', 'COUNTRY'),
+                            colunas_fato=None):
+    """
+    Carrega a fato compacta e anexa apenas os atributos de dimensão pedidos.
+    Cada dimensão é lida só com a chave e os atributos necessários, e os valores
+    são obtidos por índice inteiro (ID) — sem merge e sem copiar a dimensão inteira.
+    """
+    desconhecidos = [a for a in atributos if a not in ATRIBUTOS_DIMENSAO]
+    if desconhecidos:
+        raise ValueError(f"Atributos de dimensão desconhecidos: {desconhecidos}")
+
+    fato = ler_tabela(pasta, 'fato_vendas', list(colunas_fato or COLUNAS_FATO))
+
+    # Agrupar os atributos pedidos por dimensão (uma leitura por dimensão)
+    por_dimensao = {}
+    for atributo in atributos:
+        chave, dimensao = ATRIBUTOS_DIMENSAO[atributo]
+        por_dimensao.setdefault((chave, dimensao), []).append(atributo)
+
+    resolvidos = {}
+    for (chave, dimensao), lista in por_dimensao.items():
+        dim = ler_tabela(pasta, dimensao, [chave] + lista)
+        ids_fato = fato[chave].to_numpy()
+        for atributo in lista:
+            busca, categorias = criar_busca(dim, chave, atributo)
+            resolvidos[atributo] = resolver_atributo(ids_fato, busca, categorias)
+
+    # Atributos resolvidos primeiro (ex.: DATA vira a primeira coluna de data sugerida)
+    resultado = pd.DataFrame(resolvidos, index=fato.index)
+    return pd.concat([resultado, fato], axis=1)
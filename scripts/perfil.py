@@ -0,0 +1,177 @@
+# scripts/perfil.py
+"""
+🩺 PERFIL DE EXECUÇÃO
+Tempo, linhas de entrada/saída e variação de memória por etapa,
+para descobrir qual parte do pipeline ficou lenta
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+
+# Perfil que recebe as medições do decorador @cronometrar (None = desligado)
+PERFIL_ATIVO = None
+
+
+def rss_atual_mb():
+    """Memória residente do processo, em MB (Linux: /proc; outros: pico do processo)"""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return rss_pico_processo_mb()
+
+
+def rss_pico_processo_mb():
+    """Maior RSS do processo até agora, em MB"""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def contar_linhas(valor):
+    """Linhas de um DataFrame/Series (ou do primeiro em uma tupla); None se não houver"""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return len(valor)
+    if isinstance(valor, tuple):
+        for item in valor:
+            linhas = contar_linhas(item)
+            if linhas is not None:
+                return linhas
+    return None
+
+
+def novo_perfil():
+    """Perfil vazio: lista de etapas e a marca de tempo/memória da última seção"""
+    agora, rss = time.perf_counter(), rss_atual_mb()
+    return {
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'relogio_inicio': agora,
+        'ultima_marca': (agora, rss),
+        'etapas': [],
+    }
+
+
+def ativar_perfil(perfil=None):
+    """Liga o decorador @cronometrar, gravando no perfil informado (ou em um novo)"""
+    global PERFIL_ATIVO
+    PERFIL_ATIVO = perfil if perfil is not None else novo_perfil()
+    return PERFIL_ATIVO
+
+
+def desativar_perfil():
+    """Desliga o decorador @cronometrar e devolve o perfil que estava ativo"""
+    global PERFIL_ATIVO
+    perfil, PERFIL_ATIVO = PERFIL_ATIVO, None
+    return perfil
+
+
+def registrar(perfil, nome, duracao, rss_inicio, rss_final, linhas_entrada=None, linhas_saida=None):
+    """Acrescenta a medição de uma etapa ao perfil"""
+    perfil['etapas'].append({
+        'etapa': nome,
+        'tempo_s': round(duracao, 4),
+        'linhas_entrada': linhas_entrada,
+        'linhas_saida': linhas_saida,
+        'memoria_delta_mb': round(rss_final - rss_inicio, 1),
+        'rss_mb': round(rss_final, 1),
+    })
+
+
+@contextlib.contextmanager
+def etapa(perfil, nome, linhas_entrada=None):
+    """
+    Mede o bloco `with`: tempo, variação de RSS e linhas.
+    O dicionário devolvido aceita 'linhas_saida' (ex.: medicao['linhas_saida'] = len(df)).
+    """
+    medicao = {'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+    if perfil is None:
+        yield medicao
+        return
+    rss_inicio, inicio = rss_atual_mb(), time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        registrar(perfil, nome, time.perf_counter() - inicio, rss_inicio, rss_atual_mb(),
+                  medicao['linhas_entrada'], medicao['linhas_saida'])
+
+
+def cronometrar(nome=None):
+    """
+    Decorador: mede cada chamada no perfil ativo (ver ativar_perfil).
+    Linhas de entrada = primeiro argumento DataFrame; de saída = retorno.
+    Sem perfil ativo, a função é chamada direto (custo desprezível).
+    """
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            perfil = PERFIL_ATIVO
+            if perfil is None:
+                return funcao(*args, **kwargs)
+            linhas_entrada = next((contar_linhas(a) for a in args if contar_linhas(a) is not None), None)
+            rss_inicio, inicio = rss_atual_mb(), time.perf_counter()
+            resultado = funcao(*args, **kwargs)
+            registrar(perfil, rotulo, time.perf_counter() - inicio, rss_inicio, rss_atual_mb(),
+                      linhas_entrada, contar_linhas(resultado))
+            return resultado
+        return medida
+    return decorador
+
+
+def marcar(perfil, nome, linhas=None):
+    """
+    Fecha uma seção de um script linear (ex.: o app do Streamlit): registra o
+    tempo e a memória desde a marca anterior, sem reindentar o código medido.
+    """
+    agora, rss = time.perf_counter(), rss_atual_mb()
+    inicio, rss_inicio = perfil['ultima_marca']
+    registrar(perfil, nome, agora - inicio, rss_inicio, rss, linhas_saida=linhas)
+    perfil['ultima_marca'] = (agora, rss)
+
+
+def resumir_perfil(perfil):
+    """Totais por etapa (etapas repetidas, como as de cada bloco, são somadas)"""
+    resumo = {}
+    for medicao in perfil['etapas']:
+        item = resumo.setdefault(medicao['etapa'], {'chamadas': 0, 'tempo_s': 0.0, 'linhas_entrada': 0})
+        item['chamadas'] += 1
+        item['tempo_s'] = round(item['tempo_s'] + medicao['tempo_s'], 4)
+        item['linhas_entrada'] += medicao['linhas_entrada'] or 0
+    return resumo
+
+
+def tabela_perfil(perfil):
+    """Etapas do perfil como DataFrame (para exibir)"""
+    return pd.DataFrame(perfil['etapas'], columns=[
+        'etapa', 'tempo_s', 'linhas_entrada', 'linhas_saida', 'memoria_delta_mb', 'rss_mb',
+    ])
+
+
+def salvar_perfil(perfil, caminho, extras=None):
+    """Grava o relatório do perfil em JSON (etapas, resumo por etapa e totais)"""
+    relatorio = {
+        'inicio': perfil['inicio'],
+        'tempo_total_s': round(time.perf_counter() - perfil['relogio_inicio'], 4),
+        'rss_pico_mb': round(rss_pico_processo_mb(), 1),
+        **(extras or {}),
+        'resumo': resumir_perfil(perfil),
+        'etapas': perfil['etapas'],
+    }
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    return caminho
@@ -0,0 +1,170 @@
+# scripts/previsao_vendas.py
+"""
+🔮 PREVISÃO DE VENDAS
+Projeção das séries mensais (total, linhas de produto, países...) com
+Holt-Winters aditivo ajustado em lote: todas as séries e todas as combinações
+de parâmetros avançam juntas em arrays NumPy, um passo de tempo por vez.
+Séries curtas demais para dois ciclos sazonais usam o sazonal ingênuo com
+tendência (ou o ingênuo com tendência, com menos de um ciclo)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+# Meses projetados por padrão (próximo trimestre)
+HORIZONTE_PADRAO = 3
+
+# Ciclo sazonal das séries mensais
+SAZONALIDADE = 12
+
+# Nível de confiança dos intervalos
+NIVEL_CONFIANCA = 0.8
+
+# Grade de parâmetros (alfa: nível, beta: tendência, gama: sazonalidade)
+ALFAS = (0.1, 0.3, 0.5, 0.8)
+BETAS = (0.01, 0.1, 0.3)
+GAMAS = (0.05, 0.2, 0.5)
+
+# A partir deste nº de séries, o ajuste é dividido entre processos
+LIMITE_SERIES_PARALELO = 2_000
+
+
+def grade_parametros():
+    """Todas as combinações (alfa, beta, gama) como três vetores de mesmo tamanho"""
+    alfa, beta, gama = np.meshgrid(ALFAS, BETAS, GAMAS, indexing='ij')
+    return alfa.ravel(), beta.ravel(), gama.ravel()
+
+
+def ajustar_holt_winters(y, horizonte=HORIZONTE_PADRAO, m=SAZONALIDADE):
+    """
+    Holt-Winters aditivo em lote. y: matriz (tempo × séries), com pelo menos 2·m linhas.
+    Cada combinação da grade roda sobre todas as séries ao mesmo tempo (arrays
+    combinação × série); por série, fica a combinação de menor erro de um passo.
+    Retorna (previsão horizonte × séries, desvio dos resíduos, parâmetros escolhidos).
+    """
+    n_tempo, n_series = y.shape
+    alfa, beta, gama = (p[:, None] for p in grade_parametros())
+    n_grade = alfa.shape[0]
+
+    # Estado inicial: nível = média do 1º ciclo; tendência = variação média entre
+    # os dois primeiros ciclos; sazonalidade = desvio de cada mês do 1º ciclo
+    primeiro, segundo = y[:m].mean(axis=0), y[m:2 * m].mean(axis=0)
+    nivel = np.broadcast_to(primeiro, (n_grade, n_series)).copy()
+    tendencia = np.broadcast_to((segundo - primeiro) / m, (n_grade, n_series)).copy()
+    sazonal = np.broadcast_to(y[:m] - primeiro, (n_grade, m, n_series)).copy()
+
+    sse = np.zeros((n_grade, n_series))
+    for t in range(n_tempo):
+        s = sazonal[:, t % m, :]
+        erro = y[t] - (nivel + tendencia + s)
+        if t >= m:
+            # O 1º ciclo serviu para a inicialização: fora do erro
+            sse += erro ** 2
+        novo_nivel = alfa * (y[t] - s) + (1 - alfa) * (nivel + tendencia)
+        tendencia = beta * (novo_nivel - nivel) + (1 - beta) * tendencia
+        sazonal[:, t % m, :] = gama * (y[t] - novo_nivel) + (1 - gama) * s
+        nivel = novo_nivel
+
+    # Melhor combinação por série
+    melhor = np.argmin(sse, axis=0)
+    colunas = np.arange(n_series)
+    nivel, tendencia = nivel[melhor, colunas], tendencia[melhor, colunas]
+    passos = np.arange(1, horizonte + 1)[:, None]
+    indices_sazonais = (n_tempo + passos.ravel() - 1) % m
+    previsao = nivel + passos * tendencia + sazonal[melhor[None, :], indices_sazonais[:, None], colunas[None, :]]
+    desvio = np.sqrt(sse[melhor, colunas] / max(n_tempo - m, 1))
+    parametros = np.column_stack([alfa.ravel()[melhor], beta.ravel()[melhor], gama.ravel()[melhor]])
+    return previsao, desvio, parametros
+
+
+def ajustar_sazonal_ingenuo(y, horizonte=HORIZONTE_PADRAO, m=SAZONALIDADE):
+    """
+    Sazonal ingênuo com tendência (séries com 1 a 2 ciclos): repete o mesmo mês
+    do último ciclo, somando a variação média ano a ano.
+    """
+    n_tempo = y.shape[0]
+    diferencas = y[m:] - y[:-m]  # variação contra o mesmo mês do ciclo anterior
+    tendencia = diferencas.mean(axis=0) / m
+    passos = np.arange(1, horizonte + 1)
+    base = y[n_tempo - m + (passos - 1) % m]
+    ciclos = (passos - 1) // m + 1
+    previsao = base + (ciclos * m)[:, None] * tendencia
+    desvio = diferencas.std(axis=0, ddof=1) if len(diferencas) > 1 else np.abs(diferencas).mean(axis=0)
+    return previsao, desvio
+
+
+def ajustar_ingenuo(y, horizonte=HORIZONTE_PADRAO):
+    """Ingênuo com tendência (menos de um ciclo): último valor + variação média"""
+    diferencas = np.diff(y, axis=0)
+    tendencia = diferencas.mean(axis=0) if len(diferencas) else np.zeros(y.shape[1])
+    previsao = y[-1] + np.arange(1, horizonte + 1)[:, None] * tendencia
+    desvio = diferencas.std(axis=0, ddof=1) if len(diferencas) > 1 else np.zeros(y.shape[1])
+    return previsao, desvio
+
+
+def ajustar_bloco(y, horizonte=HORIZONTE_PADRAO, m=SAZONALIDADE):
+    """Ajusta um bloco de séries (tempo × séries) com o modelo que o tamanho permite"""
+    n_tempo, n_series = y.shape
+    if n_tempo >= 2 * m:
+        previsao, desvio, parametros = ajustar_holt_winters(y, horizonte, m)
+        return 'holt-winters', previsao, desvio, parametros
+    if n_tempo > m:
+        previsao, desvio = ajustar_sazonal_ingenuo(y, horizonte, m)
+        modelo = 'sazonal-ingenuo'
+    else:
+        previsao, desvio = ajustar_ingenuo(y, horizonte)
+        modelo = 'ingenuo'
+    return modelo, previsao, desvio, np.full((n_series, 3), np.nan)
+
+
+def prever_series(totais, horizonte=HORIZONTE_PADRAO, nivel_confianca=NIVEL_CONFIANCA,
+                  m=SAZONALIDADE, processos=1):
+    """
+    Projeta todas as colunas de uma matriz mensal (datas × séries), como a de
+    crescimento_por_membro(...)['totais'] ou a tabela de crescimento_periodos.
+    Com muitas séries e processos > 1, as colunas são divididas entre processos.
+    Intervalo: previsão ± z · desvio dos resíduos · √passos (não negativo).
+    Retorna um dicionário com 'previsao', 'inferior', 'superior' (datas futuras ×
+    séries), 'modelo', 'desvio' e 'parametros'.
+    """
+    if len(totais) < 2:
+        raise ValueError("São necessários pelo menos 2 períodos para projetar")
+    y = totais.to_numpy(dtype=float)
+    n_series = y.shape[1]
+
+    processos = min(processos or os.cpu_count() or 1, max(n_series // LIMITE_SERIES_PARALELO, 1))
+    if processos > 1:
+        blocos = np.array_split(np.arange(n_series), processos)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(ajustar_bloco, [y[:, b] for b in blocos],
+                                       [horizonte] * processos, [m] * processos))
+        modelo = partes[0][0]
+        previsao = np.concatenate([p[1] for p in partes], axis=1)
+        desvio = np.concatenate([p[2] for p in partes])
+        parametros = np.concatenate([p[3] for p in partes])
+    else:
+        modelo, previsao, desvio, parametros = ajustar_bloco(y, horizonte, m)
+
+    z = NormalDist().inv_cdf(0.5 + nivel_confianca / 2)
+    margem = z * desvio[None, :] * np.sqrt(np.arange(1, horizonte + 1))[:, None]
+
+    freq = pd.infer_freq(totais.index) if len(totais) >= 3 else None
+    datas = pd.date_range(totais.index[-1], periods=horizonte + 1, freq=freq or 'ME')[1:]
+    datas.name = totais.index.name
+
+    def quadro(matriz):
+        return pd.DataFrame(np.maximum(matriz, 0), index=datas, columns=totais.columns)
+
+    return {
+        'modelo': modelo,
+        'nivel_confianca': nivel_confianca,
+        'previsao': quadro(previsao),
+        'inferior': quadro(previsao - margem),
+        'superior': quadro(previsao + margem),
+        'desvio': pd.Series(desvio, index=totais.columns),
+        'parametros': pd.DataFrame(parametros, index=totais.columns, columns=['alfa', 'beta', 'gama']),
+    }
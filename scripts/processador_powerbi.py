@@ -3,20 +3,108 @@
 🎯 PROCESSADOR PERFEITO PARA POWER BI
 Gera dados 100% compatíveis e testados
 """
+import argparse
+import cProfile
+import json
 import pandas as pd
 import numpy as np
 import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
-
-def verificar_ambiente():
+# Executado como script (python scripts/processador_powerbi.py), só a pasta
+# scripts/ está no path: a raiz entra para importar os módulos como scripts.*
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from scripts.analise_clientes import (  # noqa: E402
+    ARQUIVO_ESTADO_CLIENTES,
+    acumular_clientes,
+    carregar_estado_clientes,
+    novo_estado_clientes,
+    salvar_estado_clientes,
+)
+from scripts.esquema_vendas import converter_datas  # noqa: E402
+from scripts.perfil import ativar_perfil, cronometrar, desativar_perfil, resumir_perfil, salvar_perfil  # noqa: E402
+
+try:
+    import pyarrow  # noqa: F401 - engine do Parquet
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+
+# Colunas de cada tabela do modelo estrela
+COLUNAS_FATO = [
+    'ORDERNUMBER', 'ORDERLINENUMBER', 'QUANTITYORDERED',
+    'PRICEEACH', 'SALES', 'STATUS', 'DEALSIZE'
+]
+COLUNAS_PRODUTO = ['PRODUCTCODE', 'PRODUCTLINE', 'MSRP']
+
+# Correção de tipos: colunas numéricas (sem símbolos de moeda) e de texto
+COLUNAS_NUMERICAS = ['SALES', 'QUANTITYORDERED', 'PRICEEACH', 'MSRP']
+COLUNAS_TEXTO = ['PRODUCTLINE', 'PRODUCTCODE', 'CUSTOMERNAME', 'COUNTRY', 'CITY', 'STATUS']
+COLUNAS_CLIENTE = ['CUSTOMERNAME', 'COUNTRY', 'CITY', 'STATE',
+                   'POSTALCODE', 'TERRITORY', 'PHONE']
+COLUNAS_SIMPLES = [
+    'ORDERDATE', 'PRODUCTLINE', 'CUSTOMERNAME', 'COUNTRY',
+    'SALES', 'QUANTITYORDERED', 'PRICEEACH', 'STATUS'
+]
+
+# Cubo agregado para o dashboard: totais por mês e pelas dimensões de análise
+DIMENSOES_CUBO = ['DATA_MES', 'PRODUCTLINE', 'COUNTRY', 'CUSTOMER_ID', 'DEALSIZE', 'STATUS']
+MEDIDAS_CUBO = ['SALES', 'QUANTITYORDERED', 'N_LINHAS']
+
+# Linhas por bloco no modo streaming
+TAMANHO_BLOCO_PADRAO = 200_000
+
+# Saída colunar (Parquet): subpasta da saída, com a fato particionada em partes
+PASTA_COLUNAR = 'parquet'
+TIPOS_COLUNARES = {
+    'fato_vendas': {
+        'categorias': ['STATUS', 'DEALSIZE'],
+        'inteiros': ['ORDERNUMBER', 'ORDERLINENUMBER', 'DATE_ID', 'PRODUCT_ID',
+                     'CUSTOMER_ID', 'QUANTITYORDERED'],
+    },
+    'dim_produtos': {
+        'categorias': ['PRODUCTLINE'],
+        'inteiros': ['PRODUCT_ID'],
+    },
+    'dim_clientes': {
+        'categorias': ['COUNTRY', 'CITY', 'STATE', 'TERRITORY'],
+        'inteiros': ['CUSTOMER_ID'],
+    },
+    'dim_tempo': {
+        'categorias': ['MES_NOME', 'DIA_SEMANA'],
+        'inteiros': ['DATE_ID', 'ANO', 'MES', 'TRIMESTRE', 'DIA'],
+    },
+    'cubo_vendas': {
+        'categorias': ['PRODUCTLINE', 'COUNTRY', 'DEALSIZE', 'STATUS'],
+        'inteiros': ['CUSTOMER_ID', 'QUANTITYORDERED', 'N_LINHAS'],
+    },
+}
+
+# Linhas por aba do Excel (limite do formato, incluindo o cabeçalho)
+LIMITE_LINHAS_EXCEL = 1_048_576
+
+# Marca d'água da carga incremental (gravada na pasta de saída)
+ARQUIVO_ESTADO = 'estado_incremental.json'
+
+# Relatório padrão do --profile
+ARQUIVO_PERFIL = 'perfil_processamento.json'
+
+
+def verificar_ambiente(entrada=None, saida=None):
     """Verifica se tudo está configurado corretamente"""
     print("🔍 VERIFICANDO AMBIENTE...")
 
     # Caminhos
     raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    dados_originais = os.path.join(raiz, 'dados', 'sales_data_sample.csv')
-    saida = os.path.join(raiz, 'dados_processados')
+    dados_originais = entrada or os.path.join(raiz, 'dados', 'sales_data_sample.csv')
+    saida = saida or os.path.join(raiz, 'dados_processados')
 
     print(f"📍 Raiz do projeto: {raiz}")
     print(f"📁 Arquivo original: {dados_originais}")
@@ -30,6 +118,7 @@ def verificar_ambiente():
     return raiz, dados_originais, saida
 
 
+@cronometrar()
 def carregar_dados_seguro(caminho):
     """Carrega dados com tratamento de erros"""
     print("\n📥 CARREGANDO DADOS COM SEGURANÇA...")
@@ -55,94 +144,157 @@ def carregar_dados_seguro(caminho):
         return None
 
 
-def corrigir_tipos_dados(df):
-    """Corrige tipos de dados para Power BI"""
-    print("\n🔧 CORRIGINDO TIPOS DE DADOS...")
+def converter_coluna(col, serie):
+    """
+    Converte uma coluna para o tipo usado no Power BI.
+    Cada coluna é independente: é a unidade de trabalho do modo paralelo (--workers).
+    """
+    if col in COLUNAS_NUMERICAS:
+        # Remover símbolos e converter
+        if serie.dtype == 'object':
+            serie = serie.replace('[\$,]', '', regex=True)
+            serie = pd.to_numeric(serie, errors='coerce')
+    elif col == 'ORDERDATE':
+        # Formato detectado numa amostra; cada data distinta é convertida uma só vez
+        serie, _ = converter_datas(serie)
+    elif col in COLUNAS_TEXTO:
+        # Manter como string (valores ausentes continuam nulos, não 'nan')
+        serie = serie.where(serie.isna(), serie.astype(str))
+    return serie
+
+
+@cronometrar()
+def corrigir_tipos_dados(df, silencioso=False, executor=None):
+    """
+    Corrige tipos de dados para Power BI.
+    Com `executor` (pool de processos), as colunas são convertidas em paralelo.
+    """
+    if not silencioso:
+        print("\n🔧 CORRIGINDO TIPOS DE DADOS...")
+
+    # 1. numéricas, 2. data, 3. texto
+    colunas = [c for c in COLUNAS_NUMERICAS + ['ORDERDATE'] + COLUNAS_TEXTO if c in df.columns]
+    if executor is not None:
+        convertidas = executor.map(converter_coluna, colunas, [df[c] for c in colunas])
+    else:
+        convertidas = (converter_coluna(c, df[c]) for c in colunas)
+    df_corrigido = df.assign(**dict(zip(colunas, convertidas)))
 
-    df_corrigido = df.copy()
+    # Datas não reconhecidas viram NaT: avisar (inclusive no modo em blocos) em vez de descartar em silêncio
+    if 'ORDERDATE' in colunas:
+        falhas = df['ORDERDATE'][df['ORDERDATE'].notna() & df_corrigido['ORDERDATE'].isna()]
+        if len(falhas):
+            exemplos = ", ".join(str(v) for v in pd.unique(falhas.to_numpy())[:5])
+            print(f"  ⚠️ ORDERDATE: {len(falhas):,} linhas com data não reconhecida (ex.: {exemplos})")
 
-    # 1. COLUNAS NUMÉRICAS - Forçar para número
-    colunas_numericas = ['SALES', 'QUANTITYORDERED', 'PRICEEACH', 'MSRP']
-    for col in colunas_numericas:
-        if col in df_corrigido.columns:
-            # Remover símbolos e converter
-            if df_corrigido[col].dtype == 'object':
-                df_corrigido[col] = df_corrigido[col].replace('[\$,]', '', regex=True)
-                df_corrigido[col] = pd.to_numeric(df_corrigido[col], errors='coerce')
-            print(f"  ✅ {col}: {df_corrigido[col].dtype}")
+    if not silencioso:
+        for col in colunas:
+            tipo = 'string' if col in COLUNAS_TEXTO else df_corrigido[col].dtype
+            print(f"  ✅ {col}: {tipo}")
 
-    # 2. COLUNAS DE DATA - Converter para datetime
-    if 'ORDERDATE' in df_corrigido.columns:
-        df_corrigido['ORDERDATE'] = pd.to_datetime(df_corrigido['ORDERDATE'], errors='coerce')
-        print(f"  ✅ ORDERDATE: {df_corrigido['ORDERDATE'].dtype}")
+    return df_corrigido
 
-    # 3. COLUNAS DE TEXTO - Manter como string
-    colunas_texto = ['PRODUCTLINE', 'PRODUCTCODE', 'CUSTOMERNAME', 'COUNTRY', 'CITY', 'STATUS']
-    for col in colunas_texto:
-        if col in df_corrigido.columns:
-            df_corrigido[col] = df_corrigido[col].astype(str)
-            print(f"  ✅ {col}: string")
 
-    return df_corrigido
+def adicionar_atributos_tempo(datas):
+    """Extrai os atributos de calendário da coluna DATA de dim_tempo"""
+    datas['ANO'] = datas['DATA'].dt.year
+    datas['MES'] = datas['DATA'].dt.month
+    datas['MES_NOME'] = datas['DATA'].dt.strftime('%B')
+    datas['TRIMESTRE'] = datas['DATA'].dt.quarter
+    datas['DIA'] = datas['DATA'].dt.day
+    datas['DIA_SEMANA'] = datas['DATA'].dt.day_name()
+    return datas
+
+
+def fatorar_chave_natural(df, colunas, coluna_id, nome, estrito=False):
+    """
+    Atribui IDs de dimensão em uma única passada vetorizada (pd.factorize).
+    Os IDs são densos (1..n, int32) na ordem de primeira aparição da chave
+    natural (primeira coluna de `colunas`), e a dimensão fica com exatamente
+    uma linha por chave. Chaves que aparecem com atributos diferentes são
+    avisadas e a dimensão mantém a primeira ocorrência; com `estrito`, geram ValueError.
+    Devolve (IDs por linha de df, tabela da dimensão).
+    """
+    codigos, _ = pd.factorize(df[colunas[0]], use_na_sentinel=False)
+    _, primeiras = np.unique(codigos, return_index=True)
+
+    dim = df[colunas].iloc[primeiras].reset_index(drop=True)
+    ids = np.arange(1, len(dim) + 1, dtype='int32')
+    dim.insert(0, coluna_id, ids)
+
+    # Conferir se cada chave natural corresponde a uma única combinação de atributos
+    atributos = colunas[1:]
+    if atributos:
+        valores = df[atributos].to_numpy()
+        esperados = valores[primeiras[codigos]]
+        iguais = (valores == esperados) | (pd.isna(valores) & pd.isna(esperados))
+        divergentes = ~iguais.all(axis=1)
+        if divergentes.any():
+            chaves = pd.unique(df[colunas[0]].to_numpy()[divergentes])
+            exemplos = ", ".join(str(c) for c in chaves[:5])
+            if estrito:
+                raise ValueError(f"{nome}: {len(chaves):,} chaves {colunas[0]} com mais de uma "
+                                 f"combinação de atributos: {exemplos}")
+            print(f"  ⚠️ {nome}: {len(chaves):,} chaves com atributos divergentes "
+                  f"(mantida a 1ª ocorrência): {exemplos}")
+
+    return (codigos + 1).astype('int32'), dim
+
+
+def construir_dimensoes(df, executor=None, estrito=False):
+    """
+    Fatora as dimensões de produtos, clientes e tempo (esta só se houver ORDERDATE).
+    Com `executor` (pool de processos), as três rodam em paralelo, cada uma
+    recebendo apenas as suas colunas. `estrito`: ver fatorar_chave_natural.
+    Devolve {nome: (IDs por linha, tabela da dimensão)}.
+    """
+    tarefas = {
+        'dim_produtos': (COLUNAS_PRODUTO, 'PRODUCT_ID'),
+        'dim_clientes': (COLUNAS_CLIENTE, 'CUSTOMER_ID'),
+    }
+    if 'ORDERDATE' in df.columns:
+        tarefas['dim_tempo'] = (['ORDERDATE'], 'DATE_ID')
+
+    if executor is None:
+        return {nome: fatorar_chave_natural(df, colunas, coluna_id, nome, estrito)
+                for nome, (colunas, coluna_id) in tarefas.items()}
+
+    futuros = {nome: executor.submit(fatorar_chave_natural, df[colunas], colunas, coluna_id, nome, estrito)
+               for nome, (colunas, coluna_id) in tarefas.items()}
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
 
 
-def criar_modelo_estrela(df):
-    """Cria modelo estrela para Power BI"""
+@cronometrar()
+def criar_modelo_estrela(df, executor=None, estrito=False):
+    """
+    Cria modelo estrela para Power BI.
+    Com `estrito`, uma chave natural com atributos divergentes interrompe o
+    processamento em vez de só gerar aviso.
+    """
     print("\n⭐ CRIANDO MODELO ESTRELA...")
 
     # 1. TABELA FATO (fato_vendas)
     print("  📊 Criando fato_vendas...")
 
-    # Selecionar colunas para fato
-    fato_colunas = [
-        'ORDERNUMBER', 'ORDERLINENUMBER', 'QUANTITYORDERED',
-        'PRICEEACH', 'SALES', 'STATUS', 'DEALSIZE'
-    ]
-
-    # Garantir que todas as colunas existem
-    fato_colunas = [c for c in fato_colunas if c in df.columns]
+    # Selecionar colunas para fato (garantindo que todas existem)
+    fato_colunas = [c for c in COLUNAS_FATO if c in df.columns]
     fato_vendas = df[fato_colunas].copy()
 
-    # 2. TABELA DIMENSÃO PRODUTOS (dim_produtos)
+    # 2-4. DIMENSÕES (produtos, clientes, tempo) - em paralelo quando há executor
     print("  📦 Criando dim_produtos...")
-
-    # Criar ID único para produtos
-    produtos = df[['PRODUCTCODE', 'PRODUCTLINE', 'MSRP']].drop_duplicates()
-    produtos = produtos.reset_index(drop=True)
-    produtos['PRODUCT_ID'] = produtos.index + 1
-
-    dim_produtos = produtos[['PRODUCT_ID', 'PRODUCTCODE', 'PRODUCTLINE', 'MSRP']]
-
-    # 3. TABELA DIMENSÃO CLIENTES (dim_clientes)
     print("  👥 Criando dim_clientes...")
-
-    clientes = df[['CUSTOMERNAME', 'COUNTRY', 'CITY', 'STATE',
-                   'POSTALCODE', 'TERRITORY', 'PHONE']].drop_duplicates()
-    clientes = clientes.reset_index(drop=True)
-    clientes['CUSTOMER_ID'] = clientes.index + 1
-
-    dim_clientes = clientes[['CUSTOMER_ID', 'CUSTOMERNAME', 'COUNTRY', 'CITY',
-                             'STATE', 'POSTALCODE', 'TERRITORY', 'PHONE']]
-
-    # 4. TABELA DIMENSÃO TEMPO (dim_tempo)
     print("  📅 Criando dim_tempo...")
-
-    if 'ORDERDATE' in df.columns:
-        datas = df[['ORDERDATE']].drop_duplicates()
-        datas = datas.reset_index(drop=True)
-        datas['DATE_ID'] = datas.index + 1
-
-        # Extrair atributos de data
-        datas['ANO'] = datas['ORDERDATE'].dt.year
-        datas['MES'] = datas['ORDERDATE'].dt.month
-        datas['MES_NOME'] = datas['ORDERDATE'].dt.strftime('%B')
-        datas['TRIMESTRE'] = datas['ORDERDATE'].dt.quarter
-        datas['DIA'] = datas['ORDERDATE'].dt.day
-        datas['DIA_SEMANA'] = datas['ORDERDATE'].dt.day_name()
-
-        dim_tempo = datas.rename(columns={'ORDERDATE': 'DATA'})
+    dimensoes = construir_dimensoes(df, executor, estrito)
+    produto_ids, dim_produtos = dimensoes['dim_produtos']
+    cliente_ids, dim_clientes = dimensoes['dim_clientes']
+
+    if 'dim_tempo' in dimensoes:
+        tempo_ids, datas = dimensoes['dim_tempo']
+        datas = datas.rename(columns={'ORDERDATE': 'DATA'})[['DATA', 'DATE_ID']]
+        dim_tempo = adicionar_atributos_tempo(datas)
     else:
         # Se não tiver data, criar uma dimensão simples
+        tempo_ids = 1
         dim_tempo = pd.DataFrame({
             'DATE_ID': [1],
             'DATA': [pd.Timestamp.now()],
@@ -154,18 +306,9 @@ def criar_modelo_estrela(df):
     # 5. ADICIONAR IDs À TABELA FATO
     print("  🔗 Adicionando IDs à fato_vendas...")
 
-    # Mapeamentos
-    produto_map = dict(zip(produtos['PRODUCTCODE'], produtos['PRODUCT_ID']))
-    cliente_map = dict(zip(clientes['CUSTOMERNAME'], clientes['CUSTOMER_ID']))
-    tempo_map = dict(zip(datas['ORDERDATE'], datas['DATE_ID'])) if 'ORDERDATE' in df.columns else {
-        pd.Timestamp.now(): 1}
-
-    fato_vendas['PRODUCT_ID'] = df['PRODUCTCODE'].map(produto_map)
-    fato_vendas['CUSTOMER_ID'] = df['CUSTOMERNAME'].map(cliente_map)
-    if 'ORDERDATE' in df.columns:
-        fato_vendas['DATE_ID'] = df['ORDERDATE'].map(tempo_map)
-    else:
-        fato_vendas['DATE_ID'] = 1
+    fato_vendas['PRODUCT_ID'] = produto_ids
+    fato_vendas['CUSTOMER_ID'] = cliente_ids
+    fato_vendas['DATE_ID'] = tempo_ids
 
     # Reordenar colunas
     colunas_ordenadas = ['ORDERNUMBER', 'ORDERLINENUMBER', 'DATE_ID', 'PRODUCT_ID', 'CUSTOMER_ID']
@@ -175,70 +318,507 @@ def criar_modelo_estrela(df):
     return fato_vendas, dim_produtos, dim_clientes, dim_tempo
 
 
-def salvar_arquivos(fato, produtos, clientes, tempo, saida):
-    """Salva arquivos formatados para Power BI"""
-    print("\n💾 SALVANDO ARQUIVOS...")
+@cronometrar()
+def criar_cubo_vendas(df, cliente_ids):
+    """
+    Agrega as transações no cubo do dashboard: soma de SALES e QUANTITYORDERED
+    e quantidade de linhas por (mês, PRODUCTLINE, COUNTRY, CUSTOMER_ID, DEALSIZE, STATUS).
+    Sem ORDERDATE ou SALES não há cubo (None); as demais colunas ausentes ficam vazias.
+    """
+    if 'ORDERDATE' not in df.columns or 'SALES' not in df.columns:
+        return None
+
+    base = pd.DataFrame({
+        'DATA_MES': df['ORDERDATE'].dt.to_period('M').dt.to_timestamp(),
+        'CUSTOMER_ID': cliente_ids,
+    }, index=df.index)
+    for coluna in ['PRODUCTLINE', 'COUNTRY', 'DEALSIZE', 'STATUS', 'SALES', 'QUANTITYORDERED']:
+        base[coluna] = df[coluna] if coluna in df.columns else np.nan
+    return (
+        base.groupby(DIMENSOES_CUBO, dropna=False, observed=True)
+        .agg(SALES=('SALES', 'sum'),
+             QUANTITYORDERED=('QUANTITYORDERED', 'sum'),
+             N_LINHAS=('SALES', 'size'))
+        .reset_index()
+    )
+
+
+def remover_cubo(saida):
+    """Apaga o cubo de uma carga anterior (o dashboard passa a usar as transações)"""
+    for caminho in [os.path.join(saida, 'cubo_vendas.csv'),
+                    os.path.join(saida, PASTA_COLUNAR, 'cubo_vendas.parquet')]:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def combinar_cubos(partes):
+    """Soma cubos parciais (blocos ou cargas) em um único cubo"""
+    return (
+        pd.concat(partes, ignore_index=True)
+        .groupby(DIMENSOES_CUBO, dropna=False, observed=True)[MEDIDAS_CUBO]
+        .sum()
+        .reset_index()
+    )
+
+
+def criar_registro_dimensao(colunas, coluna_id):
+    """Cria o registro incremental de uma dimensão (chave natural -> ID)"""
+    return {
+        'colunas': colunas,
+        'coluna_id': coluna_id,
+        'chaves': pd.Index([]),
+        'ids': np.array([], dtype='int32'),
+        'novos': [],
+    }
+
+
+def carregar_registro_dimensao(caminho, colunas, coluna_id, coluna_arquivo=None):
+    """
+    Recria o registro de uma dimensão a partir do CSV já gravado.
+    O próprio arquivo da dimensão é a memória persistente chave natural -> ID.
+    """
+    registro = criar_registro_dimensao(colunas, coluna_id)
+    coluna_arquivo = coluna_arquivo or colunas[0]
+
+    if os.path.exists(caminho):
+        dim = pd.read_csv(caminho, usecols=[coluna_id, coluna_arquivo], dtype={coluna_arquivo: str})
+        chaves = dim[coluna_arquivo]
+        if colunas[0] == 'ORDERDATE':
+            chaves = pd.to_datetime(chaves, errors='coerce')
+        registro['chaves'] = pd.Index(chaves)
+        registro['ids'] = dim[coluna_id].to_numpy(dtype='int32')
+
+    return registro
+
+
+@cronometrar()
+def atribuir_chaves_bloco(registro, bloco):
+    """
+    Devolve o ID de dimensão de cada linha do bloco.
+    Membros ainda não vistos recebem IDs sequenciais na ordem de aparição,
+    igual ao modo tradicional, e ficam guardados no registro.
+    """
+    chave = registro['colunas'][0]
+    posicoes = registro['chaves'].get_indexer(bloco[chave])
+
+    novos = posicoes == -1
+    if novos.any():
+        membros = bloco.loc[novos, registro['colunas']].drop_duplicates(subset=chave)
+        inicio = int(registro['ids'].max()) + 1 if len(registro['ids']) else 1
+        ids_novos = np.arange(inicio, inicio + len(membros), dtype='int32')
+        membros.insert(0, registro['coluna_id'], ids_novos)
+        registro['novos'].append(membros)
+        registro['chaves'] = registro['chaves'].append(pd.Index(membros[chave]))
+        registro['ids'] = np.concatenate([registro['ids'], ids_novos])
+        posicoes = registro['chaves'].get_indexer(bloco[chave])
+
+    return registro['ids'][posicoes]
+
+
+def finalizar_dimensao(registro):
+    """Junta os membros novos acumulados no registro em uma tabela de dimensão"""
+    if not registro['novos']:
+        return pd.DataFrame(columns=[registro['coluna_id']] + registro['colunas'])
+    return pd.concat(registro['novos'], ignore_index=True)
+
+
+@cronometrar()
+def atualizar_estado_clientes(estado, bloco, fato):
+    """Soma as vendas de um lote/bloco ao estado de clientes (RFM e coortes), pelo CUSTOMER_ID da fato"""
+    if 'ORDERDATE' not in bloco.columns:
+        return estado
+    pedidos = fato['ORDERNUMBER'] if 'ORDERNUMBER' in fato.columns else None
+    return acumular_clientes(estado, fato['CUSTOMER_ID'], bloco['ORDERDATE'], fato['SALES'], pedidos)
+
+
+def carregar_estado_incremental(saida):
+    """Lê a marca d'água da última carga incremental (None se ainda não houve carga)"""
+    caminho = os.path.join(saida, ARQUIVO_ESTADO)
+    if not os.path.exists(caminho) or not os.path.exists(os.path.join(saida, 'fato_vendas.csv')):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salvar_estado_incremental(saida, estado):
+    """Grava a marca d'água da carga para a próxima execução incremental"""
+    with open(os.path.join(saida, ARQUIVO_ESTADO), 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+
+
+def atualizar_estado_incremental(saida, ultimo_ordernumber, resumo):
+    """
+    Regrava a marca d'água a partir dos dados que acabaram de ser gravados (em
+    toda carga, incremental ou não); sem ORDERNUMBER, remove a marca antiga
+    para a próxima carga incremental não comparar com uma marca de outra base.
+    """
+    if ultimo_ordernumber is None:
+        caminho = os.path.join(saida, ARQUIVO_ESTADO)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        return
+    salvar_estado_incremental(saida, {
+        'ultimo_ordernumber': int(ultimo_ordernumber),
+        'transacoes': int(resumo['transacoes']),
+        'total_vendas': float(resumo['total_vendas']),
+        'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+    })
+
+
+@cronometrar()
+def processar_em_blocos(entrada, saida, tamanho_bloco=TAMANHO_BLOCO_PADRAO, incremental=False,
+                        com_excel=False, executor=None):
+    """
+    Modo streaming: lê o CSV em blocos e gera o modelo estrela com memória limitada.
+    Cada bloco tem os tipos corrigidos, recebe os IDs de dimensão e é gravado
+    direto em fato_vendas.csv / vendas_simples.csv. As dimensões crescem a cada
+    bloco e são gravadas no final.
+
+    No modo incremental, os IDs já gravados nas dimensões são mantidos, apenas
+    linhas com ORDERNUMBER acima da marca d'água da última carga são processadas
+    e somente fatos e membros de dimensão novos são acrescentados aos arquivos.
+    """
+    print(f"\n🌊 PROCESSANDO EM BLOCOS DE {tamanho_bloco:,} LINHAS...")
 
-    # Criar pasta se não existir
     os.makedirs(saida, exist_ok=True)
+    caminho_fato = os.path.join(saida, 'fato_vendas.csv')
+    caminho_simples = os.path.join(saida, 'vendas_simples.csv')
+    caminho_produtos = os.path.join(saida, 'dim_produtos.csv')
+    caminho_clientes = os.path.join(saida, 'dim_clientes.csv')
+    caminho_tempo = os.path.join(saida, 'dim_tempo.csv')
+    caminho_cubo = os.path.join(saida, 'cubo_vendas.csv')
+
+    estado = carregar_estado_incremental(saida) if incremental else None
+    cubos = []
+    caminho_clientes_rfm = os.path.join(saida, ARQUIVO_ESTADO_CLIENTES)
+    estado_clientes = carregar_estado_clientes(caminho_clientes_rfm) if estado else None
+    if estado and estado_clientes is None:
+        print(f"  ⚠️ {ARQUIVO_ESTADO_CLIENTES} não encontrado: RFM/coortes só com esta carga "
+              f"(reprocesse sem --incremental para incluir o histórico)")
+    estado_clientes = estado_clientes or novo_estado_clientes()
+
+    if estado:
+        print(f"  🔁 Carga incremental: ORDERNUMBER > {estado['ultimo_ordernumber']}")
+        produtos = carregar_registro_dimensao(caminho_produtos, COLUNAS_PRODUTO, 'PRODUCT_ID')
+        clientes = carregar_registro_dimensao(caminho_clientes, COLUNAS_CLIENTE, 'CUSTOMER_ID')
+        tempo = carregar_registro_dimensao(caminho_tempo, ['ORDERDATE'], 'DATE_ID', 'DATA')
+        marca = estado['ultimo_ordernumber']
+        resumo = {'transacoes': estado['transacoes'], 'total_vendas': estado['total_vendas']}
+        if os.path.exists(caminho_cubo):
+            cubos.append(pd.read_csv(caminho_cubo, parse_dates=['DATA_MES']))
+    else:
+        produtos = criar_registro_dimensao(COLUNAS_PRODUTO, 'PRODUCT_ID')
+        clientes = criar_registro_dimensao(COLUNAS_CLIENTE, 'CUSTOMER_ID')
+        tempo = criar_registro_dimensao(['ORDERDATE'], 'DATE_ID')
+        marca = None
+        resumo = {'transacoes': 0, 'total_vendas': 0.0}
+
+    ultimo_ordernumber = marca
+    linhas_novas = 0
+    # Na carga incremental os arquivos já existem: sempre acrescentar sem cabeçalho
+    primeiro = estado is None
+    if PARQUET_DISPONIVEL:
+        preparar_pasta_colunar(saida, acrescentar=estado is not None)
+
+    leitor = pd.read_csv(entrada, encoding='latin-1', chunksize=tamanho_bloco)
+    for numero, bloco in enumerate(leitor, start=1):
+        if marca is not None:
+            bloco = bloco[bloco['ORDERNUMBER'] > marca]
+            if bloco.empty:
+                continue
+
+        bloco = corrigir_tipos_dados(bloco, silencioso=True, executor=executor)
+
+        fato = bloco[[c for c in COLUNAS_FATO if c in bloco.columns]]
+        fato.insert(2, 'DATE_ID', atribuir_chaves_bloco(tempo, bloco))
+        fato.insert(3, 'PRODUCT_ID', atribuir_chaves_bloco(produtos, bloco))
+        fato.insert(4, 'CUSTOMER_ID', atribuir_chaves_bloco(clientes, bloco))
+
+        fato.to_csv(caminho_fato, mode='w' if primeiro else 'a', header=primeiro,
+                    index=False, encoding='utf-8')
+        bloco[[c for c in COLUNAS_SIMPLES if c in bloco.columns]].to_csv(
+            caminho_simples, mode='w' if primeiro else 'a', header=primeiro,
+            index=False, encoding='utf-8'
+        )
+        if PARQUET_DISPONIVEL:
+            salvar_parte_fato_colunar(fato, saida)
+        cubo_bloco = criar_cubo_vendas(bloco, fato['CUSTOMER_ID'])
+        if cubo_bloco is not None:
+            cubos.append(cubo_bloco)
+        estado_clientes = atualizar_estado_clientes(estado_clientes, bloco, fato)
+        primeiro = False
+
+        maior_bloco = int(fato['ORDERNUMBER'].max())
+        ultimo_ordernumber = maior_bloco if ultimo_ordernumber is None else max(ultimo_ordernumber, maior_bloco)
+        linhas_novas += len(fato)
+        resumo['transacoes'] += len(fato)
+        resumo['total_vendas'] += float(fato['SALES'].sum())
+        print(f"  ✅ Bloco {numero}: {len(fato):,} linhas ({linhas_novas:,} novas)")
+
+    novos_produtos = finalizar_dimensao(produtos)
+    novos_clientes = finalizar_dimensao(clientes)
+    novas_datas = finalizar_dimensao(tempo).rename(columns={'ORDERDATE': 'DATA'})[['DATA', 'DATE_ID']]
+    novas_datas['DATA'] = pd.to_datetime(novas_datas['DATA'])
+    novas_datas = adicionar_atributos_tempo(novas_datas)
+
+    # Dimensões: gravar inteiras na primeira carga, só os membros novos nas seguintes
+    for tabela, caminho in [(novos_produtos, caminho_produtos),
+                            (novos_clientes, caminho_clientes),
+                            (novas_datas, caminho_tempo)]:
+        if estado is None:
+            tabela.to_csv(caminho, index=False, encoding='utf-8')
+        elif len(tabela):
+            tabela.to_csv(caminho, mode='a', header=False, index=False, encoding='utf-8')
+
+    # O cubo é pequeno: regravado inteiro, somando a carga anterior no modo incremental
+    cubo = combinar_cubos(cubos) if cubos else None
+    if cubo is None:
+        remover_cubo(saida)
+    else:
+        cubo.to_csv(caminho_cubo, index=False, encoding='utf-8')
+    salvar_estado_clientes(estado_clientes, caminho_clientes_rfm)
+    print(f"  ✅ Estado de clientes (RFM/coortes) salvo ({ARQUIVO_ESTADO_CLIENTES})")
+
+    atualizar_estado_incremental(saida, ultimo_ordernumber, resumo)
+
+    if estado:
+        print(f"  ✅ {linhas_novas:,} transações novas, {len(novos_produtos):,} produtos, "
+              f"{len(novos_clientes):,} clientes e {len(novas_datas):,} datas novas")
+        dim_produtos = pd.read_csv(caminho_produtos)
+        dim_clientes = pd.read_csv(caminho_clientes)
+        dim_tempo = pd.read_csv(caminho_tempo, parse_dates=['DATA'])
+    else:
+        print("  ✅ Modelo estrela salvo (4 arquivos) + vendas_simples.csv")
+        dim_produtos, dim_clientes, dim_tempo = novos_produtos, novos_clientes, novas_datas
 
-    # 1. Salvar modelo estrela (4 arquivos)
-    fato.to_csv(os.path.join(saida, 'fato_vendas.csv'), index=False, encoding='utf-8')
-    produtos.to_csv(os.path.join(saida, 'dim_produtos.csv'), index=False, encoding='utf-8')
-    clientes.to_csv(os.path.join(saida, 'dim_clientes.csv'), index=False, encoding='utf-8')
-    tempo.to_csv(os.path.join(saida, 'dim_tempo.csv'), index=False, encoding='utf-8')
-
-    print("  ✅ Modelo estrela salvo (4 arquivos)")
-
-    # 2. Salvar arquivo único (para iniciantes)
-    arquivo_unico = pd.merge(fato, produtos, on='PRODUCT_ID', how='left')
-    arquivo_unico = pd.merge(arquivo_unico, clientes, on='CUSTOMER_ID', how='left')
-    arquivo_unico = pd.merge(arquivo_unico, tempo, on='DATE_ID', how='left')
-
-    # Selecionar colunas mais importantes
-    colunas_simples = [
-        'ORDERDATE', 'PRODUCTLINE', 'CUSTOMERNAME', 'COUNTRY',
-        'SALES', 'QUANTITYORDERED', 'PRICEEACH', 'STATUS'
-    ]
-
-    # Renomear DATA para ORDERDATE
-    if 'DATA' in arquivo_unico.columns:
-        arquivo_unico = arquivo_unico.rename(columns={'DATA': 'ORDERDATE'})
-
-    # Selecionar apenas colunas que existem
-    colunas_existentes = [c for c in colunas_simples if c in arquivo_unico.columns]
-    arquivo_unico[colunas_existentes].to_csv(
-        os.path.join(saida, 'vendas_simples.csv'),
-        index=False,
-        encoding='utf-8'
+    # Excel relido dos CSVs em blocos, numa thread em paralelo com as dimensões em Parquet
+    escritor = ThreadPoolExecutor(max_workers=1) if com_excel else None
+    try:
+        if escritor is not None:
+            tarefa_excel = escritor.submit(salvar_excel, {
+                'fato_vendas': ler_csv_em_blocos(caminho_fato, tamanho_bloco),
+                'dim_produtos': [dim_produtos],
+                'dim_clientes': [dim_clientes],
+                'dim_tempo': [dim_tempo],
+                'vendas_simples': ler_csv_em_blocos(caminho_simples, tamanho_bloco, ['ORDERDATE']),
+            }, os.path.join(saida, 'modelo_completo.xlsx'))
+        if PARQUET_DISPONIVEL:
+            salvar_dimensoes_colunar(dim_produtos, dim_clientes, dim_tempo, saida)
+            if cubo is not None:
+                salvar_cubo_colunar(cubo, saida)
+            print(f"  ✅ Modelo estrela em Parquet ({PASTA_COLUNAR}/)")
+        if escritor is not None:
+            tarefa_excel.result()
+    finally:
+        if escritor is not None:
+            escritor.shutdown()
+
+    return resumo, dim_produtos, dim_clientes, dim_tempo
+
+
+def resumir_vendas(fato):
+    """Resume a tabela fato nos números usados na validação e na documentação"""
+    return {'transacoes': len(fato), 'total_vendas': fato['SALES'].sum()}
+
+
+def tipar_colunar(df, tabela):
+    """Aplica os tipos do formato colunar: categorias (dicionário) e inteiros de 32 bits"""
+    tipos = TIPOS_COLUNARES[tabela]
+    conversoes = {c: 'category' for c in tipos['categorias'] if c in df.columns}
+    conversoes.update({
+        c: 'int32' for c in tipos['inteiros']
+        if c in df.columns and pd.api.types.is_integer_dtype(df[c])
+    })
+    return df.astype(conversoes)
+
+
+def preparar_pasta_colunar(saida, acrescentar=False):
+    """Cria a pasta Parquet; sem acrescentar, descarta as partes antigas da fato"""
+    pasta = os.path.join(saida, PASTA_COLUNAR)
+    pasta_fato = os.path.join(pasta, 'fato_vendas')
+    if not acrescentar and os.path.isdir(pasta_fato):
+        shutil.rmtree(pasta_fato)
+    os.makedirs(pasta_fato, exist_ok=True)
+    return pasta
+
+
+def salvar_parte_fato_colunar(fato, saida):
+    """Grava um bloco da fato como nova parte do dataset Parquet"""
+    pasta_fato = os.path.join(saida, PASTA_COLUNAR, 'fato_vendas')
+    numero = len([a for a in os.listdir(pasta_fato) if a.endswith('.parquet')])
+    tipar_colunar(fato, 'fato_vendas').to_parquet(
+        os.path.join(pasta_fato, f'parte-{numero:05d}.parquet'), index=False
     )
 
-    print("  ✅ Arquivo único salvo (vendas_simples.csv)")
 
-    # 3. Salvar Excel com tudo
-    with pd.ExcelWriter(os.path.join(saida, 'modelo_completo.xlsx')) as writer:
-        fato.to_excel(writer, sheet_name='fato_vendas', index=False)
-        produtos.to_excel(writer, sheet_name='dim_produtos', index=False)
-        clientes.to_excel(writer, sheet_name='dim_clientes', index=False)
-        tempo.to_excel(writer, sheet_name='dim_tempo', index=False)
-        arquivo_unico[colunas_existentes].to_excel(writer, sheet_name='vendas_simples', index=False)
+def salvar_dimensoes_colunar(produtos, clientes, tempo, saida):
+    """Grava as dimensões em Parquet (arquivos inteiros, são pequenas)"""
+    pasta = os.path.join(saida, PASTA_COLUNAR)
+    for nome, tabela in [('dim_produtos', produtos), ('dim_clientes', clientes), ('dim_tempo', tempo)]:
+        tipar_colunar(tabela, nome).to_parquet(os.path.join(pasta, f'{nome}.parquet'), index=False)
+
+
+def linhas_excel(bloco):
+    """Converte um bloco em tuplas de valores Python aceitos pelo openpyxl (NaN vira célula vazia)"""
+    bloco = bloco.astype(object).where(bloco.notna(), None)
+    return bloco.itertuples(index=False, name=None)
+
+
+@cronometrar()
+def salvar_excel(abas, caminho):
+    """
+    Salva o Excel com o openpyxl em modo write-only (memória constante).
+    `abas` mapeia o nome da aba para um iterável de blocos (DataFrames).
+    Abas que passam do limite de linhas do Excel continuam em nome_2, nome_3...
+    """
+    from openpyxl import Workbook  # só é necessário quando o Excel é pedido
+
+    livro = Workbook(write_only=True)
+    for nome, blocos in abas.items():
+        aba = None
+        for bloco in blocos:
+            if aba is None:
+                parte, cabecalho = 1, list(bloco.columns)
+                aba = livro.create_sheet(nome)
+                aba.append(cabecalho)
+                linhas = 1
+            for linha in linhas_excel(bloco):
+                if linhas >= LIMITE_LINHAS_EXCEL:
+                    parte += 1
+                    aba = livro.create_sheet(f'{nome}_{parte}')
+                    aba.append(cabecalho)
+                    linhas = 1
+                aba.append(linha)
+                linhas += 1
+    livro.save(caminho)
+
+    print(f"  ✅ Excel com tudo salvo ({os.path.basename(caminho)})")
+
+
+def ler_csv_em_blocos(caminho, tamanho_bloco, datas=None):
+    """Relê um CSV gerado em blocos (para exportar o Excel sem carregar tudo)"""
+    yield from pd.read_csv(caminho, chunksize=tamanho_bloco, parse_dates=datas or False)
+
+
+def salvar_cubo_colunar(cubo, saida):
+    """Grava o cubo agregado do dashboard em Parquet"""
+    tipar_colunar(cubo, 'cubo_vendas').to_parquet(
+        os.path.join(saida, PASTA_COLUNAR, 'cubo_vendas.parquet'), index=False
+    )
 
-    print("  ✅ Excel com tudo salvo (modelo_completo.xlsx)")
+
+@cronometrar()
+def montar_vendas_simples(fato, produtos, clientes, tempo, origem=None):
+    """
+    Arquivo único: a fato com os atributos das dimensões (colunas de COLUNAS_SIMPLES).
+    Com `origem` (o DataFrame tipado que gerou a fato), as colunas são só projetadas,
+    como no modo streaming. Sem ela, cada atributo vem da sua dimensão por posição
+    (ID -> linha), sem merges: uma linha de saída por linha da fato, sempre.
+    """
+    if origem is not None:
+        return origem[[c for c in COLUNAS_SIMPLES if c in origem.columns]]
+
+    colunas = {}
+    for dim, coluna_id in [(produtos, 'PRODUCT_ID'), (clientes, 'CUSTOMER_ID'),
+                           (tempo.rename(columns={'DATA': 'ORDERDATE'}), 'DATE_ID')]:
+        atributos = [c for c in COLUNAS_SIMPLES if c in dim.columns and c not in fato.columns]
+        if not atributos:
+            continue
+        chaves = pd.Index(dim[coluna_id])
+        if not chaves.is_unique:
+            raise ValueError(f"{coluna_id} repetido na dimensão: o arquivo único duplicaria linhas")
+        posicoes = chaves.get_indexer(fato[coluna_id])
+        for col in atributos:
+            # IDs ausentes da dimensão (-1) ficam nulos, como no merge left
+            colunas[col] = dim[col].array.take(posicoes, allow_fill=True)
+
+    colunas.update({c: fato[c] for c in COLUNAS_SIMPLES if c in fato.columns})
+    vendas_simples = pd.DataFrame(colunas, index=fato.index)
+    return vendas_simples[[c for c in COLUNAS_SIMPLES if c in vendas_simples.columns]]
+
+
+@cronometrar()
+def salvar_arquivos(fato, produtos, clientes, tempo, saida, com_excel=False, cubo=None, origem=None):
+    """
+    Salva arquivos formatados para Power BI.
+    `origem` é o DataFrame tipado que gerou a fato (o arquivo único sai direto dele).
+    """
+    print("\n💾 SALVANDO ARQUIVOS...")
+
+    # Criar pasta se não existir
+    os.makedirs(saida, exist_ok=True)
+
+    # Arquivo único (para iniciantes)
+    vendas_simples = montar_vendas_simples(fato, produtos, clientes, tempo, origem)
+
+    @cronometrar('salvar_arquivos.csv')
+    def salvar_csvs():
+        # 1. Salvar modelo estrela (4 arquivos)
+        fato.to_csv(os.path.join(saida, 'fato_vendas.csv'), index=False, encoding='utf-8')
+        produtos.to_csv(os.path.join(saida, 'dim_produtos.csv'), index=False, encoding='utf-8')
+        clientes.to_csv(os.path.join(saida, 'dim_clientes.csv'), index=False, encoding='utf-8')
+        tempo.to_csv(os.path.join(saida, 'dim_tempo.csv'), index=False, encoding='utf-8')
+        print("  ✅ Modelo estrela salvo (4 arquivos)")
+
+        # 2. Salvar arquivo único
+        vendas_simples.to_csv(os.path.join(saida, 'vendas_simples.csv'), index=False, encoding='utf-8')
+        print("  ✅ Arquivo único salvo (vendas_simples.csv)")
+
+        # 3. Salvar cubo agregado (dashboard)
+        if cubo is not None:
+            cubo.to_csv(os.path.join(saida, 'cubo_vendas.csv'), index=False, encoding='utf-8')
+            print("  ✅ Cubo agregado salvo (cubo_vendas.csv)")
+        else:
+            remover_cubo(saida)
+
+    @cronometrar('salvar_arquivos.parquet')
+    def salvar_colunar():
+        preparar_pasta_colunar(saida)
+        salvar_parte_fato_colunar(fato, saida)
+        salvar_dimensoes_colunar(produtos, clientes, tempo, saida)
+        if cubo is not None:
+            salvar_cubo_colunar(cubo, saida)
+        print(f"  ✅ Modelo estrela em Parquet ({PASTA_COLUNAR}/)")
+
+    # Os formatos são independentes: gravar em paralelo
+    with ThreadPoolExecutor(max_workers=3) as escritores:
+        tarefas = [escritores.submit(salvar_csvs)]
+        if PARQUET_DISPONIVEL:
+            tarefas.append(escritores.submit(salvar_colunar))
+        if com_excel:
+            # 4. Salvar Excel com tudo (opcional)
+            tarefas.append(escritores.submit(salvar_excel, {
+                'fato_vendas': [fato],
+                'dim_produtos': [produtos],
+                'dim_clientes': [clientes],
+                'dim_tempo': [tempo],
+                'vendas_simples': [vendas_simples],
+            }, os.path.join(saida, 'modelo_completo.xlsx')))
+        for tarefa in tarefas:
+            tarefa.result()
 
     return saida
 
 
-def criar_documentacao(fato, produtos, clientes, tempo, caminho_saida):
+@cronometrar()
+def criar_documentacao(resumo, produtos, clientes, tempo, caminho_saida, com_excel=False):
     """Cria documentação para usar no Power BI"""
     print("\n📝 CRIANDO DOCUMENTAÇÃO...")
 
+    secao_excel = """
+### 3. EXCEL COMPLETO:
+**modelo_completo.xlsx** - Todas as tabelas em um arquivo Excel
+""" if com_excel else ""
+
+    ticket_medio = resumo['total_vendas'] / resumo['transacoes'] if resumo['transacoes'] else 0
+
     doc = f"""
 # 📊 DOCUMENTAÇÃO PARA POWER BI
 
 ## 📁 ARQUIVOS DISPONÍVEIS em {caminho_saida}
 
 ### 1. PARA INICIANTES (Recomendado):
-**vendas_simples.csv** - {len(fato):,} transações
+**vendas_simples.csv** - {resumo['transacoes']:,} transações
 - Um único arquivo
 - Fácil de importar
 - Não precisa de relacionamentos
@@ -250,9 +830,9 @@ def criar_documentacao(fato, produtos, clientes, tempo, caminho_saida):
 - dim_clientes.csv - {len(clientes):,} clientes
 - dim_tempo.csv - {len(tempo):,} datas
 
-### 3. EXCEL COMPLETO:
-**modelo_completo.xlsx** - Todas as tabelas em um arquivo Excel
-
+**cubo_vendas.csv** - Totais por mês, linha de produto, país, cliente, porte e status
+(usado pelo dashboard; não é necessário no Power BI)
+{secao_excel}
 ## 🚀 COMO IMPORTAR:
 
 ### Opção A: Arquivo único (FÁCIL)
@@ -269,9 +849,9 @@ def criar_documentacao(fato, produtos, clientes, tempo, caminho_saida):
    - fato_vendas[DATE_ID] → dim_tempo[DATE_ID]
 
 ## ✅ DADOS VALIDADOS:
-- Total de vendas: ${fato['SALES'].sum():,.2f}
-- Ticket médio: ${fato['SALES'].mean():,.2f}
-- Transações: {len(fato):,}
+- Total de vendas: ${resumo['total_vendas']:,.2f}
+- Ticket médio: ${ticket_medio:,.2f}
+- Transações: {resumo['transacoes']:,}
 - Período: {tempo['DATA'].min().strftime('%d/%m/%Y')} a {tempo['DATA'].max().strftime('%d/%m/%Y')}
 
 ## 🎯 TESTE RÁPIDO:
@@ -279,7 +859,7 @@ def criar_documentacao(fato, produtos, clientes, tempo, caminho_saida):
 2. Crie uma tabela com:
    - PRODUCTLINE
    - SALES (Soma)
-3. Deve mostrar: ${fato['SALES'].sum():,.2f}
+3. Deve mostrar: ${resumo['total_vendas']:,.2f}
 
 ## 🆘 SOLUÇÃO DE PROBLEMAS:
 
@@ -303,59 +883,161 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
     print("  ✅ Documentação salva: LEIAME_POWERBI.txt")
 
 
-def main():
-    """Função principal"""
-    print("=" * 70)
-    print("🎯 PROCESSADOR PERFEITO PARA POWER BI")
-    print("=" * 70)
+def validar_dados(resumo, produtos, clientes):
+    """Mostra os números processados e confere se o total está no range esperado"""
+    ticket_medio = resumo['total_vendas'] / resumo['transacoes'] if resumo['transacoes'] else 0
 
-    # 1. Verificar ambiente
-    resultado = verificar_ambiente()
-    if not resultado:
-        return
+    print(f"\n✅ DADOS PROCESSADOS:")
+    print(f"   Total vendas: ${resumo['total_vendas']:,.2f}")
+    print(f"   Ticket médio: ${ticket_medio:,.2f}")
+    print(f"   Transações: {resumo['transacoes']:,}")
+    print(f"   Produtos únicos: {len(produtos):,}")
+    print(f"   Clientes únicos: {len(clientes):,}")
 
-    raiz, entrada, saida = resultado
+    # Verificar se valores estão no range correto
+    total_esperado_min = 9_000_000
+    total_esperado_max = 11_000_000
+    total_atual = resumo['total_vendas']
+
+    if total_esperado_min <= total_atual <= total_esperado_max:
+        print(f"\n🎯 VALIDAÇÃO: DADOS CORRETOS!")
+    else:
+        print(f"\n⚠️ ALERTA: Total fora do esperado!")
+        print(f"   Esperado: ${total_esperado_min:,.2f} - ${total_esperado_max:,.2f}")
+        print(f"   Obtido: ${total_atual:,.2f}")
+
+
+def ler_argumentos():
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Processador de vendas para Power BI")
+    parser.add_argument('--entrada', help="CSV de vendas (padrão: dados/sales_data_sample.csv)")
+    parser.add_argument('--saida', help="Pasta de saída (padrão: dados_processados/)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Processa o CSV em blocos, sem carregar o arquivo inteiro na memória")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO,
+                        help=f"Linhas por bloco no modo streaming (padrão: {TAMANHO_BLOCO_PADRAO:,})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Acrescenta só as linhas novas (ORDERNUMBER acima da última carga), "
+                             "mantendo os IDs das dimensões")
+    parser.add_argument('--excel', action='store_true',
+                        help="Também gera modelo_completo.xlsx (lento em bases grandes)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos para corrigir tipos e montar as dimensões em paralelo "
+                             "(padrão: 1, sem paralelismo)")
+    parser.add_argument('--chave-estrita', action='store_true',
+                        help="Falha (em vez de avisar) se um produto ou cliente aparece com atributos "
+                             "diferentes; só no modo em lote")
+    parser.add_argument('--profile', nargs='?', const=ARQUIVO_PERFIL, metavar='JSON',
+                        help=f"Grava tempo, linhas e memória de cada etapa em JSON (padrão: {ARQUIVO_PERFIL})")
+    parser.add_argument('--cprofile', metavar='ARQUIVO',
+                        help="Também grava o cProfile completo (abrir com pstats ou snakeviz)")
+    args = parser.parse_args()
+    if args.chave_estrita and (args.streaming or args.incremental):
+        parser.error("--chave-estrita só vale no modo em lote (sem --streaming/--incremental)")
+    return args
+
+
+def processar(args, entrada, saida, executor=None):
+    """
+    Etapas 2-6: carregar, corrigir, modelar, validar e salvar (em lote ou em blocos).
+    Devolve (resumo, produtos, clientes, tempo, pasta de saída); tudo None se a leitura falhar.
+    """
+    if args.streaming or args.incremental:
+        # 2-6. Carregar, corrigir, modelar e salvar bloco a bloco
+        resumo, produtos, clientes, tempo = processar_em_blocos(
+            entrada, saida, args.tamanho_bloco, incremental=args.incremental,
+            com_excel=args.excel, executor=executor
+        )
+        validar_dados(resumo, produtos, clientes)
+        return resumo, produtos, clientes, tempo, saida
 
     # 2. Carregar dados
     df = carregar_dados_seguro(entrada)
     if df is None:
-        return
+        return None, None, None, None, None
 
     print(f"\n💰 DADOS ORIGINAIS:")
     print(f"   Total SALES: ${df['SALES'].sum():,.2f}")
     print(f"   Média SALES: ${df['SALES'].mean():,.2f}")
 
     # 3. Corrigir tipos de dados
-    df_corrigido = corrigir_tipos_dados(df)
+    df_corrigido = corrigir_tipos_dados(df, executor=executor)
 
     # 4. Criar modelo estrela
-    fato, produtos, clientes, tempo = criar_modelo_estrela(df_corrigido)
+    fato, produtos, clientes, tempo = criar_modelo_estrela(df_corrigido, executor, args.chave_estrita)
+    cubo = criar_cubo_vendas(df_corrigido, fato['CUSTOMER_ID'])
+    estado_clientes = atualizar_estado_clientes(novo_estado_clientes(), df_corrigido, fato)
 
     # 5. Validar dados
-    print(f"\n✅ DADOS PROCESSADOS:")
-    print(f"   Total vendas: ${fato['SALES'].sum():,.2f}")
-    print(f"   Ticket médio: ${fato['SALES'].mean():,.2f}")
-    print(f"   Transações: {len(fato):,}")
-    print(f"   Produtos únicos: {len(produtos):,}")
-    print(f"   Clientes únicos: {len(clientes):,}")
+    resumo = resumir_vendas(fato)
+    validar_dados(resumo, produtos, clientes)
 
-    # Verificar se valores estão no range correto
-    total_esperado_min = 9_000_000
-    total_esperado_max = 11_000_000
-    total_atual = fato['SALES'].sum()
+    # 6. Salvar arquivos
+    caminho_saida = salvar_arquivos(
+        fato, produtos, clientes, tempo, saida, com_excel=args.excel, cubo=cubo, origem=df_corrigido
+    )
+    salvar_estado_clientes(estado_clientes, os.path.join(caminho_saida, ARQUIVO_ESTADO_CLIENTES))
+    print(f"  ✅ Estado de clientes (RFM/coortes) salvo ({ARQUIVO_ESTADO_CLIENTES})")
+    ultimo_ordernumber = fato['ORDERNUMBER'].max() if 'ORDERNUMBER' in fato.columns and len(fato) else None
+    atualizar_estado_incremental(caminho_saida, ultimo_ordernumber, resumo)
 
-    if total_esperado_min <= total_atual <= total_esperado_max:
-        print(f"\n🎯 VALIDAÇÃO: DADOS CORRETOS!")
-    else:
-        print(f"\n⚠️ ALERTA: Total fora do esperado!")
-        print(f"   Esperado: ${total_esperado_min:,.2f} - ${total_esperado_max:,.2f}")
-        print(f"   Obtido: ${total_atual:,.2f}")
+    return resumo, produtos, clientes, tempo, caminho_saida
 
-    # 6. Salvar arquivos
-    caminho_saida = salvar_arquivos(fato, produtos, clientes, tempo, saida)
+
+def main():
+    """Função principal"""
+    args = ler_argumentos()
+    if not (args.profile or args.cprofile):
+        executar(args)
+        return
+
+    # Perfil de execução: medições por etapa (--profile) e cProfile (--cprofile)
+    perfil = ativar_perfil() if args.profile else None
+    perfilador = cProfile.Profile() if args.cprofile else None
+    if perfilador is not None:
+        perfilador.enable()
+    try:
+        executar(args)
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(args.cprofile)
+            print(f"\n🩺 cProfile salvo em: {args.cprofile}")
+        if perfil is not None:
+            desativar_perfil()
+            salvar_perfil(perfil, args.profile, extras={'argumentos': vars(args)})
+            print(f"🩺 Perfil por etapa salvo em: {args.profile}")
+            for nome, item in sorted(resumir_perfil(perfil).items(), key=lambda i: -i[1]['tempo_s']):
+                print(f"   {nome:<28} {item['tempo_s']:>9.3f} s  ({item['chamadas']}x)")
+
+
+def executar(args):
+    """Executa o processamento completo com as opções da linha de comando"""
+    print("=" * 70)
+    print("🎯 PROCESSADOR PERFEITO PARA POWER BI")
+    print("=" * 70)
+
+    # 1. Verificar ambiente
+    resultado = verificar_ambiente(args.entrada, args.saida)
+    if not resultado:
+        return
+
+    raiz, entrada, saida = resultado
+
+    # Pool de processos para conversão de colunas e dimensões (--workers > 1)
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    if executor is not None:
+        print(f"\n🧵 Modo paralelo: {args.workers} processos")
+    try:
+        resumo, produtos, clientes, tempo, caminho_saida = processar(args, entrada, saida, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if resumo is None:
+        return
 
     # 7. Criar documentação
-    criar_documentacao(fato, produtos, clientes, tempo, caminho_saida)
+    criar_documentacao(resumo, produtos, clientes, tempo, caminho_saida, com_excel=args.excel)
 
     # 8. Instruções finais
     print("\n" + "=" * 70)
@@ -373,10 +1055,9 @@ def main():
     print(f"   1. Abra Power BI Desktop")
     print(f"   2. Importe 'vendas_simples.csv'")
     print(f"   3. Crie um gráfico somando SALES")
-    print(f"   4. Deve mostrar: ${fato['SALES'].sum():,.2f}")
+    print(f"   4. Deve mostrar: ${resumo['total_vendas']:,.2f}")
     print("=" * 70)
 
 
 if __name__ == "__main__":
     main()
-
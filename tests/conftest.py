@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+
+# Os testes importam os módulos como scripts.* (do mesmo jeito que o app.py)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
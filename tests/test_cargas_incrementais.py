@@ -0,0 +1,137 @@
+# tests/test_cargas_incrementais.py
+"""
+Cargas incrementais: o processador em modo --incremental e o estado de
+clientes acumulado em lotes devem chegar ao mesmo resultado da carga completa
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.analise_clientes import (
+    ARQUIVO_ESTADO_CLIENTES,
+    acumular_clientes,
+    carregar_estado_clientes,
+    novo_estado_clientes,
+)
+from scripts.processador_powerbi import processar, processar_em_blocos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AMOSTRA = os.path.join(RAIZ, 'dados', 'sales_data_sample.csv')
+TAMANHO_BLOCO = 500  # blocos menores que a amostra, cortando pedidos ao meio
+
+# Dimensão -> (chave natural, ID)
+DIMENSOES = {
+    'dim_produtos': (['PRODUCTCODE'], 'PRODUCT_ID'),
+    'dim_clientes': (['CUSTOMERNAME'], 'CUSTOMER_ID'),
+    'dim_tempo': (['DATA'], 'DATE_ID'),
+}
+
+
+@pytest.fixture(scope='module')
+def amostra():
+    # Tudo como texto: a parte gravada fica idêntica às linhas do arquivo original
+    return pd.read_csv(AMOSTRA, encoding='latin-1', dtype=str, keep_default_na=False)
+
+
+def ler_dimensoes(pasta):
+    return {nome: pd.read_csv(os.path.join(pasta, f'{nome}.csv')) for nome in DIMENSOES}
+
+
+def vendas_por_cliente(pasta):
+    fato = pd.read_csv(os.path.join(pasta, 'fato_vendas.csv'))
+    clientes = pd.read_csv(os.path.join(pasta, 'dim_clientes.csv'))
+    vendas = fato.merge(clientes[['CUSTOMER_ID', 'CUSTOMERNAME']], on='CUSTOMER_ID', validate='many_to_one')
+    return vendas.groupby('CUSTOMERNAME')['SALES'].sum().sort_index()
+
+
+def gravar_parte(amostra, tmp_path, fracao=0.6):
+    """CSV só com os primeiros pedidos da amostra (por ORDERNUMBER)"""
+    pedidos = np.sort(amostra['ORDERNUMBER'].astype(int).unique())
+    corte = pedidos[int(len(pedidos) * fracao)]
+    parte = tmp_path / 'parte.csv'
+    amostra[amostra['ORDERNUMBER'].astype(int) <= corte].to_csv(parte, index=False, encoding='latin-1')
+    return parte
+
+
+def test_carga_incremental_igual_a_completa(amostra, tmp_path):
+    parte = gravar_parte(amostra, tmp_path)
+
+    completa = str(tmp_path / 'completa')
+    processar_em_blocos(AMOSTRA, completa, TAMANHO_BLOCO)
+
+    incremental = str(tmp_path / 'incremental')
+    processar_em_blocos(str(parte), incremental, TAMANHO_BLOCO, incremental=True)
+    antes = ler_dimensoes(incremental)
+    processar_em_blocos(AMOSTRA, incremental, TAMANHO_BLOCO, incremental=True)
+    depois = ler_dimensoes(incremental)
+    referencia = ler_dimensoes(completa)
+
+    # Mesmos totais da carga completa
+    fato_completa = pd.read_csv(os.path.join(completa, 'fato_vendas.csv'))
+    fato_incremental = pd.read_csv(os.path.join(incremental, 'fato_vendas.csv'))
+    assert len(fato_incremental) == len(fato_completa) == len(amostra)
+    assert fato_incremental['SALES'].sum() == pytest.approx(fato_completa['SALES'].sum())
+    pd.testing.assert_series_equal(vendas_por_cliente(incremental), vendas_por_cliente(completa))
+
+    for nome, (chave, coluna_id) in DIMENSOES.items():
+        dim = depois[nome]
+        # IDs únicos, um por membro, e os mesmos membros da carga completa
+        assert dim[coluna_id].is_unique
+        assert not dim.duplicated(chave).any()
+        assert set(dim[chave[0]]) == set(referencia[nome][chave[0]])
+        # IDs estáveis: os membros da primeira carga mantêm o ID
+        pd.testing.assert_frame_equal(dim.head(len(antes[nome])), antes[nome])
+
+    # Toda linha da fato aponta para um membro existente
+    for nome, (_, coluna_id) in DIMENSOES.items():
+        assert fato_incremental[coluna_id].isin(depois[nome][coluna_id]).all()
+
+
+@pytest.mark.parametrize('em_blocos', [True, False])
+def test_carga_completa_renova_marca_dagua(amostra, tmp_path, em_blocos):
+    # Incremental parcial, recarga completa (sem --incremental) e incremental de novo
+    saida = str(tmp_path / 'saida')
+    processar_em_blocos(str(gravar_parte(amostra, tmp_path)), saida, TAMANHO_BLOCO, incremental=True)
+    if em_blocos:
+        processar_em_blocos(AMOSTRA, saida, TAMANHO_BLOCO)
+    else:
+        args = argparse.Namespace(streaming=False, incremental=False, excel=False, chave_estrita=False,
+                                  tamanho_bloco=TAMANHO_BLOCO)
+        processar(args, AMOSTRA, saida)
+    processar_em_blocos(AMOSTRA, saida, TAMANHO_BLOCO, incremental=True)
+
+    # A última carga não encontra pedidos novos: nada é duplicado
+    fato = pd.read_csv(os.path.join(saida, 'fato_vendas.csv'))
+    assert len(fato) == len(amostra)
+    assert not fato.duplicated(['ORDERNUMBER', 'ORDERLINENUMBER']).any()
+    assert fato['SALES'].sum() == pytest.approx(amostra['SALES'].astype(float).sum())
+    assert fato['CUSTOMER_ID'].isin(pd.read_csv(os.path.join(saida, 'dim_clientes.csv'))['CUSTOMER_ID']).all()
+    estado = carregar_estado_clientes(os.path.join(saida, ARQUIVO_ESTADO_CLIENTES))
+    assert estado['valor'].sum() == pytest.approx(fato['SALES'].sum())
+
+
+@pytest.mark.parametrize('com_pedidos', [True, False])
+def test_acumular_clientes_em_lotes_igual_a_lote_unico(amostra, com_pedidos):
+    clientes, _ = pd.factorize(amostra['CUSTOMERNAME'])
+    datas = pd.to_datetime(amostra['ORDERDATE'])
+    valores = amostra['SALES'].astype(float).to_numpy()
+    pedidos = amostra['ORDERNUMBER'].astype(int).to_numpy() if com_pedidos else None
+
+    unico = acumular_clientes(novo_estado_clientes(), clientes, datas, valores, pedidos)
+
+    # Lotes fora de ordem e cortando pedidos ao meio
+    ordem = np.random.default_rng(42).permutation(len(amostra))
+    estado = novo_estado_clientes()
+    for lote in np.array_split(ordem, 4):
+        estado = acumular_clientes(
+            estado, clientes[lote], datas.iloc[lote], valores[lote],
+            None if pedidos is None else pedidos[lote],
+        )
+
+    assert estado['ocasiao'] == unico['ocasiao'] == ('pedido' if com_pedidos else 'dia')
+    np.testing.assert_allclose(estado['valor'], unico['valor'])
+    for chave in ('primeira_compra', 'ultima_compra', 'compras', 'ativos'):
+        np.testing.assert_array_equal(estado[chave], unico[chave])
@@ -0,0 +1,37 @@
+# tests/test_crescimento.py
+"""Datas em texto na análise de crescimento: conversão rápida e falhas registradas"""
+import logging
+import os
+
+import pandas as pd
+import pytest
+
+from scripts.analise_crescimento import crescimento_periodos, crescimento_por_membro
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AMOSTRA = os.path.join(RAIZ, 'dados', 'sales_data_sample.csv')
+
+
+@pytest.fixture(scope='module')
+def amostra():
+    df = pd.read_csv(AMOSTRA, encoding='latin-1')
+    df.loc[:2, 'ORDERDATE'] = 'sem data'
+    return df
+
+
+def test_datas_em_texto_iguais_as_convertidas(amostra, caplog):
+    convertida = amostra.assign(ORDERDATE=pd.to_datetime(amostra['ORDERDATE'], format='%m/%d/%Y %H:%M',
+                                                         errors='coerce'))
+    with caplog.at_level(logging.WARNING, logger='scripts.analise_crescimento'):
+        texto = crescimento_periodos(amostra, 'ORDERDATE', 'SALES', ['M'])
+    esperado = crescimento_periodos(convertida, 'ORDERDATE', 'SALES', ['M'])
+    pd.testing.assert_frame_equal(texto['M']['tabela'], esperado['M']['tabela'])
+    assert texto['M']['linhas_invalidas'] == 3
+    assert "3 linhas com data não reconhecida" in caplog.text
+
+
+def test_crescimento_por_membro_registra_datas_nao_reconhecidas(amostra, caplog):
+    with caplog.at_level(logging.WARNING, logger='scripts.analise_crescimento'):
+        matrizes = crescimento_por_membro(amostra, 'PRODUCTLINE', 'ORDERDATE', 'SALES', 'M')
+    assert "'sem data'" in caplog.text
+    assert matrizes['totais'].to_numpy().sum() == pytest.approx(amostra['SALES'].iloc[3:].sum())
@@ -0,0 +1,25 @@
+# tests/test_modelo_estrela.py
+"""Chaves de dimensão do processador: uma linha por chave natural"""
+import pandas as pd
+import pytest
+
+from scripts.processador_powerbi import COLUNAS_PRODUTO, fatorar_chave_natural
+
+# PRODUCTCODE 'A' aparece com duas linhas de produto diferentes
+PRODUTOS = pd.DataFrame({
+    'PRODUCTCODE': ['A', 'B', 'A'],
+    'PRODUCTLINE': ['Motorcycles', 'Ships', 'Planes'],
+    'MSRP': [95, 60, 95],
+})
+
+
+def test_chave_divergente_mantem_primeira_ocorrencia():
+    ids, dim = fatorar_chave_natural(PRODUTOS, COLUNAS_PRODUTO, 'PRODUCT_ID', 'dim_produtos')
+    assert ids.tolist() == [1, 2, 1]
+    assert dim['PRODUCTCODE'].tolist() == ['A', 'B']
+    assert dim['PRODUCTLINE'].tolist() == ['Motorcycles', 'Ships']
+
+
+def test_chave_divergente_falha_no_modo_estrito():
+    with pytest.raises(ValueError, match='PRODUCTCODE'):
+        fatorar_chave_natural(PRODUTOS, COLUNAS_PRODUTO, 'PRODUCT_ID', 'dim_produtos', estrito=True)